@@ -7,6 +7,7 @@ from . import (
     anndata,
     clusters,
     dev,
+    engines,
     evaluations,
     gene_selection,
     models,
@@ -19,6 +20,7 @@ __all__ = [
     "anndata",
     "clusters",
     "dev",
+    "engines",
     "evaluations",
     "gene_selection",
     "models",
@@ -2,13 +2,80 @@
 Abstract class for wrapper classes of pgmpy.estimators
 """
 
-from itertools import combinations
+from typing import List, Union
 
+import anndata as ad
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 from grnet.dev import typechecker, valchecker
 
+BACKED_CHUNK = 2**14
+
+
+def _as_frame(
+    data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+    genes: List[str] = None,
+) -> pd.DataFrame:
+    """
+    function to convert input data into a (sparse) DataFrame without densifying it
+
+    Parameters
+    ----------
+    data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+        NxD matrix of data; AnnData may be backed, and then its `X` is read into
+        a CSR matrix in chunks of rows
+
+    genes: List[str], default: None
+        names of the columns of a scipy.sparse matrix (if None, 0, ..., D-1 are used)
+
+    Returns
+    -------
+    data: pandas.DataFrame
+        the input itself for a DataFrame, otherwise a DataFrame named after
+        `obs_names` and `var_names` (AnnData) or `genes` (scipy.sparse),
+        whose columns are pandas.SparseDtype if the matrix is sparse
+    """
+    typechecker(
+        data, (pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray), "data"
+    )
+    if isinstance(data, pd.DataFrame):
+        return data
+    index, columns, matrix = None, genes, data
+    if isinstance(data, ad.AnnData):
+        index, columns, matrix = data.obs_names, data.var_names, data.X
+        if data.isbacked:
+            chunks = [
+                sparse.csr_matrix(matrix[slice(start, start + BACKED_CHUNK)])
+                for start in range(0, data.n_obs, BACKED_CHUNK)
+            ]
+            matrix = sparse.vstack(chunks, format="csr", dtype=matrix.dtype)
+    if columns is not None:
+        valchecker(
+            len(columns) == matrix.shape[1],
+            "Length of `genes` should be equal to the number of columns of `data`",
+        )
+    if not sparse.issparse(matrix):
+        return pd.DataFrame(np.asarray(matrix), index=index, columns=columns)
+    if matrix.dtype == bool:
+        # SparseDtype of bool cannot hold 0 as a fill value
+        matrix = matrix.astype(np.int8)
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=columns)
+
+
+def _astype(data: pd.DataFrame, dtype: str = None) -> pd.DataFrame:
+    """
+    function to cast the values of (sparse) data into dtype (if None, data are returned)
+    """
+    if dtype is None or all(
+        getattr(v, "subtype", v) == np.dtype(dtype) for v in data.dtypes
+    ):
+        return data
+    if data.shape[1] > 0 and all(isinstance(v, pd.SparseDtype) for v in data.dtypes):
+        return data.astype(pd.SparseDtype(dtype, 0))
+    return data.astype(dtype)
+
 
 class Estimator:
     """
@@ -20,7 +87,11 @@ class Estimator:
         self,
         data: pandas.DataFrame,
         n: int,
-        random_state: int
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        dtype: str,
+        rows: numpy.ndarray
     ) -> None:
         initialize attributes
 
@@ -30,6 +101,12 @@ class Estimator:
     ) -> None:
         estimate network and save edges (a list of tuples) as self.edges
 
+    partial_fit(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix]
+    ) -> None:
+        append new samples to self.data (subclasses update their statistics too)
+
     get_matrix(
         self
     ) -> pandas.DataFrame:
@@ -39,20 +116,48 @@ class Estimator:
     ----------
     data: pandas.DataFrame
         input data or resampled data
-        (data will be resampled if `n` is specified in `self.__init__`)
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True);
+        columns are pandas.SparseDtype for sparse input (see Notes)
+
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
+
+    dtype: str
+        data type into which `self.data` and new samples of `self.partial_fit`
+        are cast (None if the input is kept as it is)
 
     edges: List[tuple]
         information of edges are saved as a list of tuples
         after `self.estimate` was run
+
+    estimate_stats: grnet.engines.EstimateStats
+        CI tests, time, and edges removed per level, peak memory, cache hit rate,
+        and worker utilization of the last `self.estimate`
+        (None before it was run; `to_dict()` or `to_frame()` exports them)
+
+    Notes
+    -----
+    * anndata.AnnData (possibly backed) and scipy.sparse matrices are accepted
+      as `data`; sparse matrices are kept as a sparse DataFrame, from which
+      the native engines compute their statistics block by block
     """
 
     def __init__(
-        self, data: pd.DataFrame, n: int = None, random_state: int = 0
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        dtype: str = None,
+        rows: np.ndarray = None,
     ) -> None:
         """
         Parameters
         ----------
-        data: pandas.DataFrame
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
             NxD matrix (N: number of samples, D: number of genes) of data
 
         n: int, default: None
@@ -60,21 +165,63 @@ class Estimator:
             if None, resampling will not be performed
 
         random_state: int, default: 0
-            random seed for random sampling
+            random seed for random sampling (the global random state is untouched)
+
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows`
+            and `self.data` refers to the input data (no copy is made), \
+            so that estimators of the same data share one buffer
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        dtype: str, default: None
+            "float32" or "float64" into which the values are cast once
+            (if None, the input is kept as it is)
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class
+            or a resample); only the indices are kept as `self.rows`, and `self.data`
+            refers to the input data (if `n` is specified, the resample is drawn
+            from these rows)
 
         Returns
         -------
         None
         """
-        typechecker(data, pd.DataFrame, "data")
+        if dtype is not None:
+            typechecker(dtype, str, "dtype")
+            valchecker(
+                dtype in ("float32", "float64"),
+                f"dtype should be 'float32' or 'float64', got {dtype}",
+            )
+        data = _astype(_as_frame(data, genes), dtype)
         if n is not None:
             typechecker(n, int, "n")
             valchecker(n > 0, "n should be a positive integer")
         typechecker(random_state, int, "random_state")
-        np.random.seed(random_state)
-        self.data = data if n is None else data.sample(n=min(n, len(data)))
+        typechecker(copy, bool, "copy")
+        if rows is not None:
+            typechecker(rows, np.ndarray, "rows")
+        self.data, self.rows = data, rows
+        self.dtype = dtype
+        self.estimate_stats = None
+        if n is not None:
+            size = len(data) if rows is None else len(rows)
+            # same rows as data.sample(n=n, random_state=random_state)
+            sample = np.random.RandomState(random_state).choice(
+                size, size=min(n, size), replace=False
+            )
+            sample = sample if rows is None else rows[sample]
+            self.data, self.rows = (data.iloc[sample], None) if copy else (data, sample)
         pass
 
+    def _gather(self, dense: bool = False) -> pd.DataFrame:
+        data = self.data if self.rows is None else self.data.iloc[self.rows]
+        if dense and any(isinstance(v, pd.SparseDtype) for v in data.dtypes):
+            return data.sparse.to_dense()
+        return data
+
     def estimate(self, **kwargs) -> None:
         """
         Parameters
@@ -90,6 +237,29 @@ class Estimator:
         typechecker(self.edges, list, "self.edges")
         pass
 
+    def partial_fit(
+        self, data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            MxD matrix of new samples with the same columns as `self.data`
+            (scipy.sparse matrices are named after `self.data.columns`)
+
+        Returns
+        -------
+        None
+        """
+        data = _astype(_as_frame(data, self.data.columns), self.dtype)
+        valchecker(
+            data.columns.equals(self.data.columns),
+            "columns of data should be the same as self.data",
+        )
+        self.data = pd.concat([self._gather(), data])
+        self.rows = None
+        pass
+
     def get_matrix(self) -> pd.DataFrame:
         """
         Parameters
@@ -101,13 +271,14 @@ class Estimator:
         GRNMatrix: pandas.DataFrame
             edge information of the GRN will be returned as a DxD matrix
         """
-        df = pd.DataFrame(
-            np.eye(self.data.shape[1]),
-            index=self.data.columns,
-            columns=self.data.columns,
-        )
-        for i, v in combinations(df.columns, 2):
-            df.loc[i, v] = 1 if (i, v) in self.edges or (v, i) in self.edges else 0
+        matrix = np.eye(self.data.shape[1])
+        if len(self.edges) > 0:
+            sources, targets = zip(*self.edges)
+            i = self.data.columns.get_indexer(list(sources))
+            v = self.data.columns.get_indexer(list(targets))
+            known = (i >= 0) & (v >= 0)
+            matrix[i[known], v[known]] = matrix[v[known], i[known]] = 1
+        df = pd.DataFrame(matrix, index=self.data.columns, columns=self.data.columns)
 
         typechecker(df, pd.DataFrame, "df")
         return df
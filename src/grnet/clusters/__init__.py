@@ -1,5 +1,7 @@
 from ._cellclasses import CellClasses
+from ._estimate_by_group import estimate_by_group
 
 __all__ = [
     "CellClasses",
+    "estimate_by_group",
 ]
@@ -0,0 +1,150 @@
+"""
+function to estimate GRNs of all cell classes at once
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple, Union
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from grnet.abstract import Estimator
+from grnet.abstract._estimator import _as_frame
+from grnet.dev import typechecker, valchecker
+from grnet.engines._threads import (
+    _enter_worker,
+    _n_workers,
+    _nested_kwargs,
+    _worker_budget,
+)
+from grnet.models import PC
+
+from ._cellclasses import CellClasses
+
+_WORKER = {}
+
+
+def _initializer(
+    data: pd.DataFrame, model: type, kwargs: Dict[str, Any], budget: Dict[str, int]
+) -> None:
+    _enter_worker(budget)
+    _WORKER.update(data=data, model=model, kwargs=kwargs)
+
+
+def _fit(
+    data: pd.DataFrame, model: type, kwargs: Dict[str, Any], rows: np.ndarray
+) -> Estimator:
+    fit = model(data, rows=rows)
+    fit.estimate(**kwargs)
+    return fit
+
+
+def _fit_in_worker(rows: np.ndarray) -> Estimator:
+    fit = _fit(_WORKER["data"], _WORKER["model"], _WORKER["kwargs"], rows)
+    # the parent process already holds the data
+    fit.data = None
+    return fit
+
+
+def estimate_by_group(
+    data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+    labels: Union[pd.Series, np.ndarray, List[Union[str, int]]],
+    model: type = PC,
+    colors: Union[List[Union[Tuple[float], str]], str] = None,
+    n_jobs: int = -1,
+    **kwargs,
+) -> CellClasses:
+    """
+    function to estimate GRNs of all cell classes at once
+
+    Parameters
+    ----------
+    data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+        NxD matrix (N: number of samples, D: number of genes) of data
+        (converted as in `grnet.abstract.Estimator`, so that sparse matrices stay sparse)
+
+    labels: Union[pandas.Series, numpy.ndarray, List[Union[str, int]]]
+        cell class of each row of `data` (a pandas.Series is aligned to `data.index`).
+        rows labeled with NaN are ignored
+
+    model: type, default: grnet.models.PC
+        subclass of `grnet.abstract.Estimator`
+
+    colors: Union[List[Union[Tuple[float], str]], str], default: None
+        colors of the cell classes (see `grnet.clusters.CellClasses`)
+
+    n_jobs: int, default: -1
+        number of worker processes over cell classes (-1 means the cores of
+        `grnet.engines.get_thread_budget`)
+
+    **kwargs
+        kwargs for `model.estimate` (if cell classes are fitted by several
+        workers, n_jobs=1 is used unless specified, to avoid nested worker processes)
+
+    Returns
+    -------
+    cell classes: grnet.clusters.CellClasses
+        cell classes named after sorted unique labels
+
+    Notes
+    -----
+    * rows are partitioned once with a single groupby, and each model is built
+      with only row indices of its cell class (see `rows` of `grnet.abstract.Estimator`),
+      e.g., grnet.models.BinPC packs the bits of the cell class only
+    * worker processes receive the data once, and the largest cell classes
+      are scheduled first
+    * each worker gets its share of the cores (see `grnet.engines.set_thread_budget`)
+      for its BLAS threads, and `model.estimate` runs with n_jobs=1 in the workers
+      (if it takes n_jobs); without workers, it keeps its own n_jobs over all the cores
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pandas as pd
+    >>> from grnet.clusters import estimate_by_group
+    >>> data = pd.DataFrame(np.random.default_rng(0).normal(size=(60, 4)))
+    >>> classes = estimate_by_group(data, ["a", "b"] * 30, engine="native")
+    >>> classes.names
+    {0: 'a', 1: 'b'}
+    """
+    data = _as_frame(data)
+    typechecker(labels, (pd.Series, np.ndarray, list), "labels")
+    valchecker(
+        isinstance(model, type) and issubclass(model, Estimator),
+        f"model should be a subclass of grnet.abstract.Estimator, got {model}",
+    )
+    typechecker(n_jobs, int, "n_jobs")
+    valchecker(n_jobs > 0 or n_jobs == -1, "n_jobs should be positive or -1")
+    if isinstance(labels, pd.Series):
+        labels = labels.reindex(data.index)
+    labels = np.asarray(labels)
+    valchecker(
+        len(labels) == len(data),
+        "Length of `labels` should be equal to the number of rows of `data`",
+    )
+    groups = pd.Series(labels).groupby(labels, sort=True).indices
+    names = [v.item() if isinstance(v, np.generic) else v for v in groups]
+    names = [v if isinstance(v, (str, int)) else f"{v}" for v in names]
+    rows = list(groups.values())
+    n_jobs = min(len(rows), _n_workers(n_jobs))
+    if n_jobs <= 1:
+        models = [_fit(data, model, kwargs, v) for v in rows]
+    else:
+        order = sorted(range(len(rows)), key=lambda i: -len(rows[i]))
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_initializer,
+            initargs=(
+                data,
+                model,
+                _nested_kwargs(model.estimate, kwargs),
+                _worker_budget(n_jobs),
+            ),
+        ) as executor:
+            futures = {i: executor.submit(_fit_in_worker, rows[i]) for i in order}
+            models = [futures[i].result() for i in range(len(rows))]
+        for v in models:
+            v.data = data
+    return CellClasses(models, names=names, colors=colors)
@@ -0,0 +1,33 @@
+from ._binary import BinaryMatrix
+from ._contingency import ContingencyTest
+from ._glasso import graphical_lasso, neighborhood_selection
+from ._mmpc import mmpc
+from ._parallel import SharedMemoryPool
+from ._partial_corr import PartialCorrelationTest
+from ._partition import PartitionedSearch
+from ._ranks import rank_transform
+from ._results import ResultStore
+from ._screening import marginal_screen
+from ._skeleton import SkeletonSearch, orient_skeleton
+from ._stats import EstimateStats
+from ._threads import get_thread_budget, set_thread_budget, thread_budget
+
+__all__ = [
+    "BinaryMatrix",
+    "ContingencyTest",
+    "EstimateStats",
+    "get_thread_budget",
+    "graphical_lasso",
+    "marginal_screen",
+    "mmpc",
+    "neighborhood_selection",
+    "PartialCorrelationTest",
+    "PartitionedSearch",
+    "rank_transform",
+    "ResultStore",
+    "set_thread_budget",
+    "SharedMemoryPool",
+    "SkeletonSearch",
+    "orient_skeleton",
+    "thread_budget",
+]
@@ -0,0 +1,241 @@
+"""
+bit-packed binarized data matrix with cached per-gene counts
+"""
+
+import os
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from grnet.dev import typechecker, valchecker
+
+from ._rows import _row_blocks, _rows_per_block
+from ._store import _dump_arrays, _load_arrays, _open_store
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """
+    pack a NxD boolean matrix into a DxW matrix of uint64 words (one row per gene)
+    """
+    packed = np.packbits(np.atleast_2d(mask.T), axis=1)
+    pad = -packed.shape[1] % 8
+    packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """
+    number of set bits in the last axis of an array of uint64 words
+    """
+    return _POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class BinaryMatrix:
+    """
+    bit-packed binarized data matrix with cached per-gene counts
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: pandas.DataFrame,
+        rows: numpy.ndarray,
+        store: str
+    ) -> None:
+        pack `data != 0` of each gene into uint64 words and count detected samples
+
+    update(
+        self,
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix]
+    ) -> None:
+        append the bits of new samples (with the same columns)
+
+    copy(
+        self,
+        store: str
+    ) -> grnet.engines.BinaryMatrix:
+        copy of the matrix (memory-mapped in `store` if specified)
+
+    coverage(
+        self
+    ) -> pandas.Series:
+        fraction of samples in which each gene is detected
+
+    to_frame(
+        self
+    ) -> pandas.DataFrame:
+        unpack the bits into a NxD DataFrame of 0 or 1 (int8)
+
+    Attributes
+    ----------
+    variables: pandas.Index
+        names of the variables (i.e., columns of the input data)
+
+    n_samples: int
+        number of samples
+
+    bits: numpy.ndarray
+        DxW matrix of uint64 words; bits of each row are `data != 0` of a gene
+        (numpy.memmap if `store` is given)
+
+    valid: numpy.ndarray
+        W words whose bits mark actual samples (the others are padding)
+
+    counts: numpy.ndarray
+        number of detected samples of each gene (popcount of each row of `bits`)
+
+    Notes
+    -----
+    * one bit per element is 64 times smaller than a float64 or int64 matrix,
+      and the data are packed in blocks of rows (sparse data stay sparse)
+    * appended samples start a new word, and the padding bits between old and
+      new words are zero in `bits` and masked out by `valid`
+    """
+
+    def __init__(
+        self, data: pd.DataFrame, rows: np.ndarray = None, store: str = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: pandas.DataFrame
+            NxD matrix (N: number of samples, D: number of genes) of data,
+            non-zero elements are regarded as detected
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a resample)
+
+        store: str, default: None
+            directory of the memory-mapped bits (if None, they are kept in memory)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(data, pd.DataFrame, "data")
+        if rows is not None:
+            typechecker(rows, np.ndarray, "rows")
+        self.variables = data.columns
+        self.n_samples = data.shape[0] if rows is None else len(rows)
+        self.bits = self._pack_rows(data, rows, store)
+        self.valid = _pack(np.ones((self.n_samples, 1), dtype=bool))[0]
+        self.counts = _popcount(self.bits)
+        pass
+
+    @staticmethod
+    def _pack_rows(
+        data: pd.DataFrame,
+        rows: np.ndarray = None,
+        store: str = None,
+        out: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        pack (the rows of) data into DxW words, written to `out` or a new array
+        """
+        n_rows = data.shape[0] if rows is None else len(rows)
+        shape = (data.shape[1], -(-n_rows // 64))
+        if out is None:
+            out = (
+                np.zeros(shape, np.uint64)
+                if store is None
+                else _open_store(store, shape, np.uint64)
+            )
+        block_size = _rows_per_block(data.shape[1])
+        for k, block in enumerate(_row_blocks(data, rows, block_size)):
+            mask = block != 0
+            words = _pack(mask.toarray() if sparse.issparse(mask) else mask)
+            start = k * block_size // 64
+            out[:, slice(start, start + words.shape[1])] = words
+        return out
+
+    def __getstate__(self) -> dict:
+        return _dump_arrays(self.__dict__)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(_load_arrays(state))
+
+    def update(self, data: Union[pd.DataFrame, "BinaryMatrix"]) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix]
+            MxD matrix of new samples with the same columns as `self.variables`
+
+        Returns
+        -------
+        None
+        """
+        typechecker(data, (pd.DataFrame, BinaryMatrix), "data")
+        columns = data.variables if isinstance(data, BinaryMatrix) else data.columns
+        valchecker(
+            columns.equals(self.variables),
+            "columns of data should be the same as self.variables",
+        )
+        new = data if isinstance(data, BinaryMatrix) else BinaryMatrix(data)
+        n_vars, width = self.bits.shape
+        shape = (n_vars, width + new.bits.shape[1])
+        if isinstance(self.bits, np.memmap):
+            bits = _open_store(os.path.dirname(self.bits.filename), shape, np.uint64)
+        else:
+            bits = np.zeros(shape, np.uint64)
+        bits[:, :width] = self.bits
+        bits[:, width:] = new.bits
+        self.bits = bits
+        self.valid = np.concatenate([self.valid, new.valid])
+        self.counts = self.counts + new.counts
+        self.n_samples += new.n_samples
+        pass
+
+    def copy(self, store: str = None) -> "BinaryMatrix":
+        """
+        Parameters
+        ----------
+        store: str, default: None
+            directory of the memory-mapped bits of the copy (if None, in memory)
+
+        Returns
+        -------
+        matrix: grnet.engines.BinaryMatrix
+            copy of the matrix
+        """
+        ret = BinaryMatrix.__new__(BinaryMatrix)
+        ret.__dict__.update(self.__dict__)
+        if store is None:
+            ret.bits = np.array(self.bits)
+        else:
+            ret.bits = _open_store(store, self.bits.shape, np.uint64)
+            ret.bits[...] = self.bits
+        ret.valid, ret.counts = self.valid.copy(), self.counts.copy()
+        return ret
+
+    def coverage(self) -> pd.Series:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        coverage: pandas.Series
+            fraction of samples in which each gene is detected (indexed by genes)
+        """
+        return pd.Series(self.counts / max(self.n_samples, 1), index=self.variables)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        data: pandas.DataFrame
+            NxD matrix of 0 or 1 (int8) named after `self.variables`
+        """
+        keep = np.unpackbits(self.valid.view(np.uint8)).astype(bool)
+        unpacked = np.unpackbits(self.bits.view(np.uint8), axis=1)[:, keep]
+        return pd.DataFrame(unpacked.T.astype(np.int8), columns=self.variables)
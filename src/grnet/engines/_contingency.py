@@ -0,0 +1,701 @@
+"""
+chi-square / G-test CI test on bit-packed binarized data
+"""
+
+from collections import OrderedDict
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from grnet.dev import typechecker, valchecker
+
+from ._binary import BinaryMatrix, _popcount
+from ._permutation import _permutation_pvalues
+from ._results import ResultStore, _cached_pvalues, _fingerprint, _flush_results
+from ._store import _dump_arrays, _load_arrays
+
+
+class ContingencyTest:
+    """
+    chi-square / G-test CI test on bit-packed binarized data
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix],
+        method: str,
+        cache_bytes: int,
+        rows: numpy.ndarray,
+        store: str,
+        permutations: int,
+        significance_level: float,
+        random_state: int,
+        result_cache: str
+    ) -> None:
+        initialize attributes and pack the detection vector of each gene into bits
+
+    joint_counts(
+        self,
+        variables: Tuple[int]
+    ) -> numpy.ndarray:
+        counts of all 2^m joint states of the variables (memoized)
+
+    counts(
+        self,
+        x: int,
+        y: int,
+        z: Tuple[int]
+    ) -> numpy.ndarray:
+        2x2x2^k contingency table of x, y, and the strata of z
+
+    test(
+        self,
+        x: int,
+        y: int,
+        z: Tuple[int]
+    ) -> Tuple[float, float]:
+        returns the test statistic and p-value for x _|_ y | z
+
+    marginal_pvalues(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray
+    ) -> numpy.ndarray:
+        p-values of x _|_ y for all pairs of two sets of variables at once
+
+    conditional_pvalues(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        z: Tuple[int]
+    ) -> numpy.ndarray:
+        p-values of x[k] _|_ y[k] | z for pairs sharing one conditioning set at once
+
+    mutual_information(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray
+    ) -> numpy.ndarray:
+        mutual information of all pairs of two sets of variables at once
+
+    cache_info(
+        self
+    ) -> Dict[str, int]:
+        hits, misses, number of entries, and bytes of the cache
+
+    update(
+        self,
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix]
+    ) -> None:
+        append the bits of new samples (with the same columns) and clear the cache
+
+    Attributes
+    ----------
+    variables: pandas.Index
+        names of the variables (i.e., columns of the input data)
+
+    n_samples: int
+        number of samples
+
+    method: str
+        "chi_square" or "g_sq"
+
+    bits: numpy.ndarray
+        DxW matrix of uint64 words; bits of each row are `data != 0` of a gene
+        (numpy.memmap if `store` is given)
+
+    cache_bytes: int
+        memory ceiling of the cache of joint counts
+
+    permutations: int
+        maximum number of permutations of the p-values (None for the asymptotic ones)
+
+    result_cache: grnet.engines.ResultStore
+        persistent cache of the results of `self.test` (None if not given)
+
+    shared_arrays: Tuple[str]
+        names of the array attributes to be placed in shared memory by
+        `grnet.engines.SharedMemoryPool`
+
+    Notes
+    -----
+    * counts are obtained with bitwise AND and popcount over the strata of z,
+      so that no integer copy of the data is needed
+    * joint counts are cached with the sorted variable set as a key, so that
+      (x, y | z), (y, x | z) and (x, z[0] | y, z[1:]) share one table;
+      the least recently used tables are evicted beyond `cache_bytes`
+    * copies sent to worker processes start with an empty cache of their own
+      (see `grnet.engines.SkeletonSearch.cache_info` for the total counts)
+    * `conditional_pvalues` splits the valid samples into the strata of z once
+      (one bit mask per stratum) and counts the tables of all pairs by AND and
+      popcount against the masks; tables found in the cache of joint counts are
+      reused (hits), and the counted ones are added to it (misses)
+    * statistics reproduce pgmpy.estimators.CITests.chi_square and g_sq for
+      binarized data (Yates' correction for each 2x2 stratum, strata with a
+      constant variable are skipped)
+    * the data are packed by `grnet.engines.BinaryMatrix` (in blocks of rows);
+      a BinaryMatrix given as `data` is used as it is, so that its bits and
+      per-gene counts are shared with the caller instead of being rebuilt
+    * with `store`, words are written to a memory-mapped file, so that neither
+      the bits nor a dense boolean copy of the data has to fit in memory,
+      and worker processes map the same file
+    * with `permutations`, p-values are calibrated by permuting x within the
+      strata of z; the bits of the tested variables are unpacked once, and the
+      tables of all permutations in a batch are counted by one `numpy.bincount`
+      (marginal tests by one product of the permuted bits), so that small
+      clusters are not tested by the asymptotic chi-square distribution;
+      permutations stop early once the p-value is clearly above or below
+      `significance_level` and are seeded by the tested variables
+    """
+
+    shared_arrays = ("bits",)
+
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, BinaryMatrix],
+        method: str = "chi_square",
+        cache_bytes: int = 2**28,
+        rows: np.ndarray = None,
+        store: str = None,
+        permutations: int = None,
+        significance_level: float = 0.01,
+        random_state: int = 0,
+        result_cache: str = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix]
+            NxD matrix (N: number of samples, D: number of genes) of data,
+            non-zero elements are regarded as detected
+
+        method: str, default: "chi_square"
+            "chi_square" or "g_sq"
+
+        cache_bytes: int, default: 2**28
+            memory ceiling of the cache of joint counts (0 disables the cache)
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a resample);
+            rows are gathered and packed block by block, so that no copy of `data`
+            is made (should be None for a BinaryMatrix)
+
+        store: str, default: None
+            directory of the memory-mapped bits (if None, they are kept in memory);
+            a BinaryMatrix is copied into it
+
+        permutations: int, default: None
+            maximum number of permutations of each test; if None, p-values are
+            asymptotic (chi-square distributions)
+
+        significance_level: float, default: 0.01
+            permutations stop once the p-value is clearly above or below it
+            (if None, all permutations are evaluated)
+
+        random_state: int, default: 0
+            random seed of the permutations
+
+        result_cache: str, default: None
+            SQLite file in which results of `self.test` are stored and reused
+            across instances and sessions with the same data and arguments
+            (see `grnet.engines.ResultStore`)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(data, (pd.DataFrame, BinaryMatrix), "data")
+        typechecker(method, str, "method")
+        valchecker(
+            method in ("chi_square", "g_sq"),
+            f"method should be 'chi_square' or 'g_sq', got {method}",
+        )
+        typechecker(cache_bytes, int, "cache_bytes")
+        valchecker(cache_bytes >= 0, "cache_bytes should be a non-negative integer")
+        if permutations is not None:
+            typechecker(permutations, int, "permutations")
+            valchecker(permutations > 0, "permutations should be a positive integer")
+        if significance_level is not None:
+            typechecker(significance_level, float, "significance_level")
+        typechecker(random_state, int, "random_state")
+        if isinstance(data, BinaryMatrix):
+            valchecker(rows is None, "rows should be None for a BinaryMatrix")
+            matrix = data if store is None else data.copy(store)
+        else:
+            matrix = BinaryMatrix(data, rows, store)
+        self.method = method
+        self._adopt(matrix)
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self.permutations = permutations
+        self.significance_level = significance_level
+        self.random_state = random_state
+        self._result_path = result_cache
+        self.result_cache = self._open_results()
+        pass
+
+    def _open_results(self) -> ResultStore:
+        if self._result_path is None:
+            return None
+        # early stopping makes permutation p-values depend on significance_level
+        fingerprint = _fingerprint(
+            (self.bits, self._valid),
+            test="ContingencyTest",
+            method=self.method,
+            n_samples=self.n_samples,
+            permutations=self.permutations,
+            random_state=self.random_state,
+            significance_level=(
+                None if self.permutations is None else self.significance_level
+            ),
+        )
+        return ResultStore(self._result_path, fingerprint)
+
+    def __getstate__(self) -> dict:
+        return _dump_arrays({**self.__dict__, "_cache": OrderedDict(), "_nbytes": 0})
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(_load_arrays(state))
+
+    def _adopt(self, matrix: BinaryMatrix) -> None:
+        self.variables = matrix.variables
+        self.n_samples = matrix.n_samples
+        self.bits = matrix.bits
+        self._valid = matrix.valid
+        self._counts = matrix.counts
+
+    def _matrix(self) -> BinaryMatrix:
+        matrix = BinaryMatrix.__new__(BinaryMatrix)
+        matrix.variables, matrix.n_samples = self.variables, self.n_samples
+        matrix.bits, matrix.valid, matrix.counts = self.bits, self._valid, self._counts
+        return matrix
+
+    def update(self, data: Union[pd.DataFrame, BinaryMatrix]) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, grnet.engines.BinaryMatrix]
+            MxD matrix of new samples with the same columns as `self.variables`
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        * new samples are packed into words of their own, and the padding bits
+          between the old and new words are masked out by the valid bits
+        """
+        matrix = self._matrix()
+        matrix.update(data)
+        self._adopt(matrix)
+        self._cache = OrderedDict()
+        self._nbytes = 0
+        # results of the new data are stored under a new fingerprint
+        _flush_results(self)
+        self.result_cache = self._open_results()
+        pass
+
+    def joint_counts(self, variables: Tuple[int]) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        variables: Tuple[int]
+            sorted column indices of the variables
+
+        Returns
+        -------
+        joint counts: numpy.ndarray
+            array of 2^m counts; the s-th element is the number of samples in
+            the joint state s = sum(variables[k] * 2 ** k)
+        """
+        if variables in self._cache:
+            self._hits += 1
+            self._cache.move_to_end(variables)
+            return self._cache[variables]
+        self._misses += 1
+        strata = self._valid[None, :]
+        for v in variables:
+            strata = np.vstack([strata & ~self.bits[v], strata & self.bits[v]])
+        ret = _popcount(strata)
+        self._store(variables, ret)
+        return ret
+
+    def _store(self, variables: Tuple[int], joint: np.ndarray) -> None:
+        """
+        add joint counts to the cache and evict the least recently used ones
+        """
+        if joint.nbytes <= self.cache_bytes:
+            self._cache[variables] = joint
+            self._nbytes += joint.nbytes
+            while self._nbytes > self.cache_bytes:
+                self._nbytes -= self._cache.popitem(last=False)[1].nbytes
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        cache information: Dict[str, int]
+            {"hits": int, "misses": int, "entries": int, "nbytes": int}
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(self._cache),
+            "nbytes": self._nbytes,
+        }
+
+    def counts(self, x: int, y: int, z: Tuple[int] = ()) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: int
+            column index of the first variable
+
+        y: int
+            column index of the second variable
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables
+
+        Returns
+        -------
+        contingency table: numpy.ndarray
+            2x2x2^k array of counts; `table[i, j, s]` is the number of samples with
+            x=i, y=j in the s-th stratum of z, where s = sum(z[k] * 2 ** k)
+        """
+        z = tuple(z)
+        variables = tuple(sorted((x, y) + z))
+        axes = [variables.index(v) for v in (x, y) + z[::-1]]
+        joint = self.joint_counts(variables).reshape((2,) * len(variables)).transpose()
+        return joint.transpose(axes).reshape(2, 2, -1)
+
+    @staticmethod
+    def _joint(table: np.ndarray, x: int, y: int, z: Tuple[int]) -> np.ndarray:
+        """
+        inverse of `counts`, i.e., joint counts of the sorted variables of a table
+        """
+        variables = tuple(sorted((x, y) + z))
+        axes = [variables.index(v) for v in (x, y) + z[::-1]]
+        joint = table.reshape((2,) * len(variables)).transpose(np.argsort(axes))
+        return np.ascontiguousarray(joint.transpose()).ravel()
+
+    def _statistics(self, observed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        statistics and numbers of valid strata of (...)xSx2x2 tables
+        """
+        observed = observed.astype(np.float64)
+        rows, cols = observed.sum(axis=-1), observed.sum(axis=-2)
+        valid = np.all(rows > 0, axis=-1) & np.all(cols > 0, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total = rows.sum(axis=-1)[..., None, None]
+            expected = rows[..., :, None] * cols[..., None, :] / total
+            diff = expected - observed
+            observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+            if self.method == "chi_square":
+                terms = (observed - expected) ** 2 / expected
+            else:
+                terms = 2 * special.xlogy(observed, observed / expected)
+        terms = np.where(valid[..., None, None], terms, 0.0)
+        return terms.sum(axis=(-3, -2, -1)), valid.sum(axis=-1)
+
+    def _statistic(self, table: np.ndarray) -> Tuple[float, int]:
+        stat, dof = self._statistics(np.moveaxis(table, -1, 0))
+        return float(stat), int(dof)
+
+    def test(self, x: int, y: int, z: Tuple[int] = ()) -> Tuple[float, float]:
+        """
+        Parameters
+        ----------
+        x: int
+            column index of the first variable
+
+        y: int
+            column index of the second variable
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables
+
+        Returns
+        -------
+        (statistic, p_value): Tuple[float, float]
+            test statistic and its p-value
+            (p-value is `nan` when all strata of a non-empty z are skipped)
+        """
+        if self.result_cache is None:
+            return self._test(x, y, z)
+        ret = self.result_cache.get(x, y, z)
+        if ret is None:
+            ret = self._test(x, y, z)
+            self.result_cache.put(x, y, z, ret)
+        return ret
+
+    def _test(self, x: int, y: int, z: Tuple[int]) -> Tuple[float, float]:
+        stat, dof = self._statistic(self.counts(x, y, z))
+        if dof > 0 and self.permutations is not None:
+            return stat, self._permutation_pvalue(x, y, z, stat)
+        return stat, float(self._pvalues(stat, dof, z))
+
+    def _pvalues(self, stat: np.ndarray, dof: np.ndarray, z: Tuple[int]) -> np.ndarray:
+        """
+        vectorized p-values of `_test`
+        """
+        if len(z) == 0:
+            return np.where(dof == 0, 1.0, special.chdtrc(np.maximum(dof, 1), stat))
+        return np.where(dof == 0, np.nan, 1 - special.chdtr(np.maximum(dof, 1), stat))
+
+    def conditional_pvalues(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int] = ()
+    ) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: numpy.ndarray
+            column indices of the first variables of the pairs
+
+        y: numpy.ndarray
+            column indices of the second variables of the pairs (same length as x)
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables shared by the pairs
+
+        Returns
+        -------
+        p_values: numpy.ndarray
+            p-values of the pairs, same as `self.test(x[k], y[k], z)[1]`
+            (results are read from and written to `self.result_cache`)
+        """
+        return _cached_pvalues(self, x, y, tuple(sorted(z)), self._conditional)
+
+    def _conditional(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.permutations is not None or len(x) == 0:
+            # permutations are drawn for each pair
+            results = [self._test(i, j, z) for i, j in zip(x.tolist(), y.tolist())]
+            results = np.array(results, dtype=np.float64).reshape(-1, 2)
+            return results[:, 0], results[:, 1]
+        # tables[k, s, i, j]: samples with x=i and y=j in the s-th stratum of z
+        observed = np.zeros((len(x), 2 ** len(z), 2, 2), dtype=np.int64)
+        pairs = list(zip(x.tolist(), y.tolist()))
+        cached = np.array(
+            [tuple(sorted((i, j) + z)) in self._cache for i, j in pairs], dtype=bool
+        )
+        for k in np.flatnonzero(cached):
+            observed[k] = np.moveaxis(self.counts(*pairs[k], z), -1, 0)
+        missing = np.flatnonzero(~cached)
+        if len(missing) > 0:
+            observed[missing] = self._stratum_counts(x[missing], y[missing], z)
+            self._misses += len(missing)
+            for k in missing.tolist():
+                i, j = pairs[k]
+                table = np.moveaxis(observed[k], 0, -1)
+                self._store(tuple(sorted((i, j) + z)), self._joint(table, i, j, z))
+        stat, dof = self._statistics(observed)
+        return stat, self._pvalues(stat, dof, z)
+
+    def _stratum_counts(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int]
+    ) -> np.ndarray:
+        """
+        len(x) x 2^|z| x 2 x 2 tables of the pairs counted against one bit mask
+        per stratum of z
+        """
+        masks = self._valid[None, :]
+        for v in z:
+            masks = np.vstack([masks & ~self.bits[v], masks & self.bits[v]])
+        union, index = np.unique(np.concatenate([x, y]), return_inverse=True)
+        n_s = _popcount(masks)
+        n_v = self._masked_counts(self.bits[union], masks)
+        i, j = np.split(index, [len(x)])
+        n_x, n_y = n_v[i], n_v[j]
+        n11 = self._masked_counts(self.bits[x] & self.bits[y], masks)
+        return np.stack(
+            [n_s - n_x - n_y + n11, n_y - n11, n_x - n11, n11], axis=-1
+        ).reshape(len(x), len(n_s), 2, 2)
+
+    @staticmethod
+    def _masked_counts(words: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """
+        len(words) x len(masks) popcounts of each row of words AND each mask
+        """
+        ret = np.zeros((len(words), len(masks)), dtype=np.int64)
+        step = max(1, 2**22 // max(masks.size, 1))
+        for i in range(0, len(words), step):
+            stop = i + step
+            ret[i:stop] = _popcount(words[i:stop, None, :] & masks)
+        return ret
+
+    def _unpack(self, idx: np.ndarray) -> np.ndarray:
+        """
+        unpack the bits of the variables into a len(idx) x (64W) float32 matrix
+        """
+        return np.unpackbits(self.bits[idx].view(np.uint8), axis=1).astype(np.float32)
+
+    def _samples(self, idx: np.ndarray) -> np.ndarray:
+        """
+        len(idx) x N 0/1 matrix of the variables over the valid samples
+        """
+        valid = np.unpackbits(self._valid.view(np.uint8)).astype(bool)
+        return np.unpackbits(self.bits[idx].view(np.uint8), axis=1)[:, valid]
+
+    def _rng(self, *key: int) -> np.random.Generator:
+        return np.random.default_rng([self.random_state, *key])
+
+    def _permutation_pvalue(
+        self, x: int, y: int, z: Tuple[int], observed: float
+    ) -> float:
+        x, y = sorted((x, y))
+        z = tuple(sorted(z))
+        samples = self._samples(np.array((x, y) + z, dtype=np.intp)).astype(np.intp)
+        strata = (samples[2:] << np.arange(len(z))[:, None]).sum(axis=0)
+        size = 4 << len(z)
+        codes = strata * 4 + samples[1]
+
+        def statistic(perm: np.ndarray) -> np.ndarray:
+            # one bincount of (permutation, stratum, x, y) for the whole batch
+            offsets = np.arange(len(perm))[:, None] * size
+            tables = np.bincount(
+                (codes + 2 * samples[0][perm] + offsets).ravel(),
+                minlength=len(perm) * size,
+            )
+            return self._statistics(tables.reshape(len(perm), -1, 2, 2))[0]
+
+        p_value, _ = _permutation_pvalues(
+            statistic,
+            observed,
+            self.n_samples,
+            self.permutations,
+            self._rng(x, y, *z),
+            strata=strata.astype(np.float64),
+            significance_level=self.significance_level,
+        )
+        return float(p_value)
+
+    def _marginal_statistics(
+        self, n11: np.ndarray, n_x: np.ndarray, n_y: np.ndarray
+    ) -> np.ndarray:
+        """
+        statistics of 2x2 tables given by the counts of (1, 1) and the margins
+        """
+        n = float(self.n_samples)
+        # cells on the last axis broadcast over leading axes of permutations
+        observed = np.stack(
+            np.broadcast_arrays(n11, n_x - n11, n_y - n11, n - n_x - n_y + n11), axis=-1
+        )
+        rows = np.stack(np.broadcast_arrays(n_x, n_x, n - n_x, n - n_x), axis=-1)
+        cols = np.stack(np.broadcast_arrays(n_y, n - n_y, n_y, n - n_y), axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = rows * cols / n
+            diff = expected - observed
+            observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+            if self.method == "chi_square":
+                terms = (observed - expected) ** 2 / expected
+            else:
+                terms = 2 * special.xlogy(observed, observed / expected)
+        return terms.sum(axis=-1)
+
+    def marginal_pvalues(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: numpy.ndarray
+            column indices of the first variables
+
+        y: numpy.ndarray
+            column indices of the second variables
+
+        Returns
+        -------
+        p_values: numpy.ndarray
+            len(x) x len(y) matrix of p-values, same as `self.test(x[i], y[j])[1]`
+            (except for the random permutations with `self.permutations`)
+
+        Notes
+        -----
+        * counts of (1, 1) are obtained by a product of unpacked binary matrices,
+          and the other cells follow from the cached popcounts of each variable
+        * permutations keep the margins, so that a batch of B permutations only
+          needs the counts of (1, 1), i.e., one B x len(x) x N by N x len(y) product
+        """
+        n = float(self.n_samples)
+        observed, n_x, n_y = self._pair_counts(x, y)
+        valid = (n_x > 0) & (n_x < n) & (n_y > 0) & (n_y < n)
+        stat = np.where(valid, self._marginal_statistics(observed[0], n_x, n_y), 0.0)
+        if self.permutations is None:
+            return np.where(valid, special.chdtrc(1, stat), 1.0)
+        samples_x = self._samples(x).astype(np.float32)
+        samples_y = self._samples(y).astype(np.float32)
+        batch = max(1, min(128, 2**24 // max(len(x) * (self.n_samples + len(y)), 1)))
+
+        def statistic(perm: np.ndarray) -> np.ndarray:
+            n11 = np.matmul(samples_x[:, perm].transpose(1, 0, 2), samples_y.T)
+            stat = self._marginal_statistics(n11.astype(np.float64), n_x, n_y)
+            return np.where(valid, stat, 0.0)
+
+        p_values, _ = _permutation_pvalues(
+            statistic,
+            stat,
+            self.n_samples,
+            self.permutations,
+            self._rng(int(x[0]), int(y[0]), len(x), len(y)),
+            significance_level=self.significance_level,
+            batch_size=batch,
+        )
+        return np.where(valid, p_values, 1.0)
+
+    def _pair_counts(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        4 x len(x) x len(y) counts of (1, 1), (1, 0), (0, 1), and (0, 0),
+        with the counts of x (column vector) and y (row vector)
+        """
+        n = float(self.n_samples)
+        unpacked_x = self._unpack(x)
+        unpacked_y = unpacked_x if np.array_equal(x, y) else self._unpack(y)
+        n11 = (unpacked_x @ unpacked_y.T).astype(np.float64)
+        n_x = self._counts[x].astype(np.float64)[:, None]
+        n_y = self._counts[y].astype(np.float64)[None, :]
+        observed = np.stack([n11, n_x - n11, n_y - n11, n - n_x - n_y + n11])
+        return observed, n_x, n_y
+
+    def mutual_information(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: numpy.ndarray
+            column indices of the first variables
+
+        y: numpy.ndarray
+            column indices of the second variables
+
+        Returns
+        -------
+        mutual information: numpy.ndarray
+            len(x) x len(y) matrix of the empirical mutual information (in nats)
+            of the detection of the variables (0 for constant variables)
+
+        Notes
+        -----
+        * computed from the same counts as `self.marginal_pvalues`
+          (without Yates' correction); 2N times the mutual information is the
+          G statistic of the marginal test
+        """
+        n = float(self.n_samples)
+        observed, n_x, n_y = self._pair_counts(x, y)
+        rows = np.stack([n_x, n_x, n - n_x, n - n_x])
+        cols = np.stack([n_y, n - n_y, n_y, n - n_y])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = special.xlogy(observed, observed * n / (rows * cols))
+        return np.clip(np.nan_to_num(terms.sum(axis=0) / max(n, 1)), 0, None)
@@ -0,0 +1,206 @@
+"""
+max-min parents and children (MMPC) search of every variable
+"""
+
+import time
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from grnet.dev import typechecker, valchecker
+
+from ._parallel import SharedMemoryPool
+from ._results import _flush_results
+from ._screening import marginal_screen
+from ._stats import EstimateStats
+
+
+class _Counter:
+    """
+    CI test wrapper counting tests, time, and rejected candidates per level
+    """
+
+    def __init__(self, ci_test: Any) -> None:
+        self.ci_test = ci_test
+        self.levels = {}
+
+    def test(self, x: int, y: int, z: Tuple[int]) -> float:
+        wall, cpu = time.perf_counter(), time.process_time()
+        p_value = self.ci_test.test(x, y, z)[1]
+        row = self.levels.setdefault(len(z), [0, 0.0, 0.0, 0])
+        row[0] += 1
+        row[1] += time.perf_counter() - wall
+        row[2] += time.process_time() - cpu
+        return p_value
+
+    def reject(self, level: int) -> None:
+        self.levels.setdefault(level, [0, 0.0, 0.0, 0])[3] += 1
+
+
+def _mmpc_target(ci_test: Any, task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    function to find the parents and children of one target variable
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object with `test(x, y, z) -> (statistic, p_value)`
+
+    task: Dict[str, Any]
+        {"target": variable index, "candidates": indices of the candidates,
+        "p_values": marginal p-values of the candidates, "significance_level",
+        "max_cond_vars"}
+
+    Returns
+    -------
+    result: Dict[str, Any]
+        {"target", "pc": sorted indices of parents and children,
+        "levels": {level: [n_tests, wall_time, cpu_time, rejected]}}
+    """
+    counter = _Counter(ci_test)
+    target, alpha = task["target"], task["significance_level"]
+    max_cond_vars = task["max_cond_vars"]
+    # the largest p-value over the conditioning sets tested so far,
+    # i.e., the minimum association of each candidate with the target
+    worst = dict(zip(task["candidates"], task["p_values"]))
+    pc = []
+    while len(worst) > 0:
+        best = min(worst, key=lambda v: (worst[v], v))
+        if not worst.pop(best) < alpha:
+            break
+        pc.append(best)
+        for v in list(worst):
+            # only conditioning sets including the new member are untested
+            for size in range(1, min(len(pc), max_cond_vars) + 1):
+                for z in combinations(pc[:-1], size - 1):
+                    p_value = counter.test(v, target, tuple(sorted(z + (best,))))
+                    worst[v] = max(worst[v], p_value)
+                    if not worst[v] < alpha:
+                        break
+                if not worst[v] < alpha:
+                    counter.reject(size)
+                    del worst[v]
+                    break
+    for v in list(pc):
+        others = [u for u in pc if u != v]
+        for size in range(1, min(len(others), max_cond_vars) + 1):
+            if any(
+                not counter.test(v, target, z) < alpha
+                for z in combinations(others, size)
+            ):
+                counter.reject(size)
+                pc.remove(v)
+                break
+    return {"target": target, "pc": sorted(pc), "levels": counter.levels}
+
+
+def mmpc(
+    ci_test: Any,
+    significance_level: float = 0.01,
+    max_cond_vars: int = 3,
+    n_jobs: int = 1,
+    block_size: int = 1024,
+) -> Tuple[List[List[int]], EstimateStats]:
+    """
+    function to find the parents and children of every variable by MMPC
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object with `variables`, `test(x, y, z)`, and `marginal_pvalues(x, y)`
+        (e.g., grnet.engines.ContingencyTest)
+
+    significance_level: float, default: 0.01
+        x and y are regarded as independent given z when p-value >= significance_level
+
+    max_cond_vars: int, default: 3
+        maximum size of conditioning sets
+
+    n_jobs: int, default: 1
+        number of worker processes over targets (-1 means all CPUs)
+
+    block_size: int, default: 1024
+        number of variables in one block of the marginal screening
+
+    Returns
+    -------
+    (parents_children, stats): Tuple[List[List[int]], grnet.engines.EstimateStats]
+        sorted indices of the parents and children of each variable (not yet
+        symmetric), and the tests of the screening and each level
+
+    Notes
+    -----
+    * all pairs are tested marginally at once by `grnet.engines.marginal_screen`,
+      and candidates of each target are its marginally dependent variables
+    * in the forward phase, the candidate with the smallest maximum p-value over
+      the tested subsets of the current set is added, and candidates are tested
+      only with the subsets including the newly added variable; the backward
+      phase removes members separated by a subset of the others
+    * targets are searched independently over `grnet.engines.SharedMemoryPool`
+      for `n_jobs != 1`, and the level of `stats` is the size of the conditioning
+      sets, whose `edges_removed` counts the candidates rejected at the level
+
+    References
+    ----------
+    * Tsamardinos, Aliferis and Statnikov (2003) Time and sample efficient discovery
+      of Markov blankets and direct causal relations. KDD: 673-678
+    """
+    typechecker(significance_level, float, "significance_level")
+    typechecker(max_cond_vars, int, "max_cond_vars")
+    valchecker(max_cond_vars >= 0, "max_cond_vars should be a non-negative integer")
+    typechecker(n_jobs, int, "n_jobs")
+    valchecker(n_jobs > 0 or n_jobs == -1, "n_jobs should be positive or -1")
+    n_vars = len(ci_test.variables)
+    stats = EstimateStats()
+    with stats.measure():
+        wall, cpu = time.perf_counter(), time.process_time()
+        graph = marginal_screen(ci_test, significance_level, block_size)
+        tasks = []
+        for target in range(n_vars):
+            candidates = np.flatnonzero(graph[target])
+            tasks.append(
+                {
+                    "target": target,
+                    "candidates": candidates.tolist(),
+                    "p_values": ci_test.marginal_pvalues(
+                        candidates, np.array([target])
+                    )[:, 0].tolist(),
+                    "significance_level": significance_level,
+                    "max_cond_vars": max_cond_vars,
+                }
+            )
+        stats.add_level(
+            "screening",
+            0,
+            n_vars * (n_vars - 1) // 2,
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            (n_vars * (n_vars - 1) - int(graph.sum())) // 2,
+        )
+        wall = time.perf_counter()
+        if n_jobs != 1 and n_vars > 1:
+            with SharedMemoryPool(ci_test, n_jobs=n_jobs) as pool:
+                # the targets with the most candidates are scheduled first
+                order = sorted(
+                    range(n_vars), key=lambda i: -len(tasks[i]["candidates"])
+                )
+                results = pool.map(_mmpc_target, [tasks[i] for i in order])
+            stats._add_workers(
+                pool.cpu_time, pool.n_jobs * (time.perf_counter() - wall)
+            )
+        else:
+            results = [_mmpc_target(ci_test, task) for task in tasks]
+            _flush_results(ci_test)
+        levels = {}
+        for result in results:
+            for level, row in result["levels"].items():
+                total = levels.setdefault(level, [0, 0.0, 0.0, 0])
+                for k, v in enumerate(row):
+                    total[k] += v
+        for level in sorted(levels):
+            stats.add_level("search", level, *levels[level])
+    parents_children = [None] * n_vars
+    for result in results:
+        parents_children[result["target"]] = result["pc"]
+    return parents_children, stats
@@ -0,0 +1,455 @@
+"""
+shared-memory process pool for level-wise CI tests
+"""
+
+import copy
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from grnet.dev import typechecker, valchecker
+
+from ._results import _flush_results
+from ._threads import _enter_worker, _n_workers, _worker_budget
+
+_WORKER = {}
+
+
+def _initializer(
+    ci_test: Any,
+    specs: Dict[str, Tuple[str, Tuple[int], str]],
+    budget: Dict[str, int],
+) -> None:
+    _enter_worker(budget)
+    handles = []
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        handles.append(shm)
+        if key == "neighbors":
+            _WORKER["neighbors"] = arr
+        else:
+            setattr(ci_test, key, arr)
+    _WORKER["ci_test"] = ci_test
+    _WORKER["handles"] = handles
+
+
+def _candidate_sets(
+    neighbors: np.ndarray, x: int, y: int, level: int
+) -> Iterator[Tuple[int]]:
+    """
+    sorted conditioning sets of x and y in the order of pgmpy.estimators.PC,
+    i.e., subsets of the neighbors of x and then new subsets of those of y
+    """
+    adj_x = [int(v) for v in np.flatnonzero(neighbors[x]) if v != y]
+    adj_y = [int(v) for v in np.flatnonzero(neighbors[y]) if v != x]
+    seen = set()
+    for candidates in (adj_x, adj_y):
+        for z in combinations(candidates, level):
+            if z not in seen:
+                seen.add(z)
+                yield z
+
+
+def _find_separating_set(
+    ci_test: Any,
+    x: int,
+    y: int,
+    neighbors: np.ndarray,
+    level: int,
+    significance_level: float,
+    limit: int = None,
+    deadline: float = None,
+) -> Tuple[Tuple[int], int, bool]:
+    """
+    function to search a separating set of x and y among the neighbors
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object with `test(x, y, z) -> (statistic, p_value)`
+
+    x: int
+        column index of the first variable
+
+    y: int
+        column index of the second variable
+
+    neighbors: numpy.ndarray
+        DxD boolean adjacency matrix that candidate sets are drawn from
+
+    level: int
+        size of conditioning sets
+
+    significance_level: float
+        x and y are regarded as independent given z when p-value >= significance_level
+
+    limit: int, default: None
+        maximum number of tests (if None, unlimited)
+
+    deadline: float, default: None
+        `time.time()` after which no more tests are run (if None, unlimited)
+
+    Returns
+    -------
+    (separating_set, n_tests, complete): Tuple[Tuple[int], int, bool]
+        the first separating set found (None if not found), the number of tests,
+        and False if the search was cut by `limit` or `deadline`
+    """
+    n_tests = 0
+    for z in _candidate_sets(neighbors, x, y, level):
+        if (limit is not None and n_tests >= limit) or (
+            deadline is not None and time.time() >= deadline
+        ):
+            return None, n_tests, False
+        n_tests += 1
+        if ci_test.test(x, y, z)[1] >= significance_level:
+            return z, n_tests, True
+    return None, n_tests, True
+
+
+def _find_separating_sets(
+    ci_test: Any,
+    edges: List[Tuple[int, int]],
+    neighbors: np.ndarray,
+    level: int,
+    significance_level: float,
+) -> Tuple[List[Tuple[int, int, Tuple[int]]], int]:
+    """
+    function to search separating sets of the edges in rounds of tests grouped
+    by conditioning set
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object with `conditional_pvalues(x, y, z) -> p_values`
+
+    edges: List[Tuple[int, int]]
+        edges to be tested
+
+    neighbors: numpy.ndarray
+        DxD boolean adjacency matrix that candidate sets are drawn from
+
+    level: int
+        size of conditioning sets
+
+    significance_level: float
+        x and y are regarded as independent given z when p-value >= significance_level
+
+    Returns
+    -------
+    (removed, n_tests): Tuple[List[Tuple[int, int, Tuple[int]]], int]
+        (x, y, separating set) of removed edges and the number of tests,
+        same as `_find_separating_set` for each edge
+    """
+    pending = {}
+    for x, y in edges:
+        sets = _candidate_sets(neighbors, x, y, level)
+        z = next(sets, None)
+        if z is not None:
+            pending[x, y] = (z, sets)
+    removed, n_tests = [], 0
+    while len(pending) > 0:
+        groups = defaultdict(list)
+        for edge, (z, _) in pending.items():
+            groups[z].append(edge)
+        for z, group in groups.items():
+            x, y = np.array(group, dtype=np.intp).T
+            p_values = ci_test.conditional_pvalues(x, y, z)
+            n_tests += len(group)
+            for edge, p_value in zip(group, p_values):
+                if p_value >= significance_level:
+                    removed.append((*edge, z))
+                    del pending[edge]
+                    continue
+                # the next set of the edge, in the order of _find_separating_set
+                sets = pending[edge][1]
+                z_next = next(sets, None)
+                if z_next is None:
+                    del pending[edge]
+                else:
+                    pending[edge] = (z_next, sets)
+    return removed, n_tests
+
+
+def _cache_counts(ci_test: Any) -> Dict[str, int]:
+    if not hasattr(ci_test, "cache_info"):
+        return {}
+    info = ci_test.cache_info()
+    return {k: info[k] for k in ("hits", "misses")}
+
+
+def _search_chunk(
+    edges: List[Tuple[int, int]],
+    level: int,
+    significance_level: float,
+    limit: int = None,
+    deadline: float = None,
+    batched: bool = False,
+) -> Tuple[List[Tuple[int, int, Tuple[int]]], int, bool, Dict[str, int], float]:
+    ci_test, neighbors = _WORKER["ci_test"], _WORKER["neighbors"]
+    before, cpu = _cache_counts(ci_test), time.process_time()
+    removed, n_tests, complete = [], 0, True
+    if batched:
+        removed, n_tests = _find_separating_sets(
+            ci_test, edges, neighbors, level, significance_level
+        )
+        edges = []
+    for x, y in edges:
+        z, n, complete = _find_separating_set(
+            ci_test,
+            x,
+            y,
+            neighbors,
+            level,
+            significance_level,
+            None if limit is None else limit - n_tests,
+            deadline,
+        )
+        n_tests += n
+        if z is not None:
+            removed.append((x, y, z))
+        if not complete:
+            break
+    _flush_results(ci_test)
+    after, cpu = _cache_counts(ci_test), time.process_time() - cpu
+    return removed, n_tests, complete, {k: after[k] - before[k] for k in after}, cpu
+
+
+def _apply(fn: Callable, item: Any) -> Tuple[Any, Dict[str, int], float]:
+    ci_test = _WORKER["ci_test"]
+    before, cpu = _cache_counts(ci_test), time.process_time()
+    ret = fn(ci_test, item)
+    _flush_results(ci_test)
+    after, cpu = _cache_counts(ci_test), time.process_time() - cpu
+    return ret, {k: after[k] - before[k] for k in after}, cpu
+
+
+class SharedMemoryPool:
+    """
+    process pool whose workers read the arrays of a CI test from shared memory
+
+    Methods
+    -------
+    __init__(
+        self,
+        ci_test: Any,
+        n_jobs: int
+    ) -> None:
+        copy the shared arrays of `ci_test` into shared memory once and start workers
+
+    search(
+        self,
+        edges: List[Tuple[int, int]],
+        neighbors: numpy.ndarray,
+        level: int,
+        significance_level: float,
+        limit: int,
+        deadline: float,
+        batched: bool
+    ) -> Tuple[List[Tuple[int, int, Tuple[int]]], int]:
+        search separating sets of the edges in parallel
+
+    map(
+        self,
+        fn: Callable,
+        items: List[Any]
+    ) -> List[Any]:
+        apply `fn(ci_test, item)` to the items in parallel
+
+    close(
+        self
+    ) -> None:
+        stop workers and release shared memory
+
+    Attributes
+    ----------
+    n_jobs: int
+        number of worker processes
+
+    cache_counts: Dict[str, int]
+        hits and misses of caches in workers (if `ci_test` has `cache_info`)
+
+    cpu_time: float
+        CPU seconds spent by workers in `search` and `map`
+
+    interrupted: bool
+        True if the last `search` was cut by its `limit` or `deadline`
+
+    Notes
+    -----
+    * arrays listed in `ci_test.shared_arrays` (e.g., moment matrix or packed bits)
+      and the adjacency snapshot of each level are never pickled to workers
+    * memory-mapped arrays (see `store` of the CI tests) are not copied into
+      shared memory, and workers map the same files read-only
+    * workers only read shared memory, so that every level follows PC-stable
+    * each worker limits its BLAS threads to its share of the cores
+      (see `grnet.engines.set_thread_budget`)
+    * this class can be used as a context manager
+    """
+
+    def __init__(self, ci_test: Any, n_jobs: int = -1) -> None:
+        """
+        Parameters
+        ----------
+        ci_test: Any
+            CI test object with `variables`, `shared_arrays`, and `test(x, y, z)`
+
+        n_jobs: int, default: -1
+            number of worker processes (-1 means the cores of
+            `grnet.engines.get_thread_budget`)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(n_jobs, int, "n_jobs")
+        valchecker(n_jobs > 0 or n_jobs == -1, "n_jobs should be positive or -1")
+        self.n_jobs = _n_workers(n_jobs)
+        n_vars = len(ci_test.variables)
+        # memory-mapped arrays are pickled as file names and mapped by workers
+        shared = [
+            key
+            for key in ci_test.shared_arrays
+            if not isinstance(getattr(ci_test, key), np.memmap)
+        ]
+        arrays = {key: getattr(ci_test, key) for key in shared}
+        arrays["neighbors"] = np.zeros((n_vars, n_vars), dtype=bool)
+        self._shm, specs = [], {}
+        for key, arr in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            self._shm.append(shm)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            specs[key] = (shm.name, arr.shape, arr.dtype.str)
+        self._neighbors = np.ndarray(
+            (n_vars, n_vars), dtype=bool, buffer=self._shm[-1].buf
+        )
+        light = copy.copy(ci_test)
+        for key in shared:
+            setattr(light, key, None)
+        self.cache_counts = {}
+        self.cpu_time = 0.0
+        self.interrupted = False
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            initializer=_initializer,
+            initargs=(light, specs, _worker_budget(self.n_jobs)),
+        )
+        pass
+
+    def search(
+        self,
+        edges: List[Tuple[int, int]],
+        neighbors: np.ndarray,
+        level: int,
+        significance_level: float,
+        limit: int = None,
+        deadline: float = None,
+        batched: bool = False,
+    ) -> Tuple[List[Tuple[int, int, Tuple[int]]], int]:
+        """
+        Parameters
+        ----------
+        edges: List[Tuple[int, int]]
+            edges to be tested
+
+        neighbors: numpy.ndarray
+            DxD boolean adjacency matrix at the beginning of the level
+
+        level: int
+            size of conditioning sets
+
+        significance_level: float
+            x and y are regarded as independent given z when p-value >= significance_level
+
+        limit: int, default: None
+            maximum number of tests in total (split evenly over chunks; if None, unlimited)
+
+        deadline: float, default: None
+            `time.time()` after which workers run no more tests (if None, unlimited)
+
+        batched: bool, default: False
+            if True, each chunk tests the edges sharing a conditioning set at once
+            by `ci_test.conditional_pvalues` (`limit` and `deadline` are ignored)
+
+        Returns
+        -------
+        (removed, n_tests): Tuple[List[Tuple[int, int, Tuple[int]]], int]
+            (x, y, separating set) of removed edges and the number of tests
+            (`self.interrupted` tells whether some chunk was cut by the budget)
+        """
+        self._neighbors[...] = neighbors
+        n_chunks = min(len(edges), 4 * self.n_jobs)
+        chunks = [edges[i::n_chunks] for i in range(n_chunks)]
+        limits = [
+            None if limit is None else limit // n_chunks + (i < limit % n_chunks)
+            for i in range(n_chunks)
+        ]
+        removed, n_tests, self.interrupted = [], 0, False
+        for ret, n, complete, counts, cpu in self._executor.map(
+            _search_chunk,
+            chunks,
+            [level] * n_chunks,
+            [significance_level] * n_chunks,
+            limits,
+            [deadline] * n_chunks,
+            [batched] * n_chunks,
+        ):
+            removed += ret
+            n_tests += n
+            self.interrupted |= not complete
+            self.cpu_time += cpu
+            for k, v in counts.items():
+                self.cache_counts[k] = self.cache_counts.get(k, 0) + v
+        return sorted(removed), n_tests
+
+    def map(self, fn: Callable, items: List[Any]) -> List[Any]:
+        """
+        Parameters
+        ----------
+        fn: Callable
+            picklable function of (ci_test, item) executed in worker processes
+
+        items: List[Any]
+            items to be processed (one task per item)
+
+        Returns
+        -------
+        results: List[Any]
+            `fn(ci_test, item)` for each item in the same order as `items`
+        """
+        results = []
+        for ret, counts, cpu in self._executor.map(_apply, [fn] * len(items), items):
+            results.append(ret)
+            self.cpu_time += cpu
+            for k, v in counts.items():
+                self.cache_counts[k] = self.cache_counts.get(k, 0) + v
+        return results
+
+    def close(self) -> None:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self._executor.shutdown()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+        pass
+
+    def __enter__(self) -> "SharedMemoryPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,747 @@
+"""
+partial-correlation CI test computed from a cached moment matrix
+"""
+
+from functools import lru_cache
+from typing import Iterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, special
+
+from grnet.dev import typechecker, valchecker
+
+from ._permutation import _permutation_pvalues
+from ._results import ResultStore, _cached_pvalues, _fingerprint, _flush_results
+from ._rows import _row_blocks, _rows_per_block, _values
+from ._store import _dump_arrays, _load_arrays, _open_store
+
+# float32 p-values within a factor REFINE of the significance level are recomputed
+REFINE = 2.0
+EPS32 = float(np.finfo(np.float32).eps)
+
+
+class PartialCorrelationTest:
+    """
+    partial-correlation CI test computed from a cached moment matrix
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: pandas.DataFrame,
+        method: str,
+        cache_size: int,
+        rows: numpy.ndarray,
+        store: str,
+        block_size: int,
+        permutations: int,
+        significance_level: float,
+        random_state: int,
+        result_cache: str,
+        dtype: str,
+        center: bool
+    ) -> None:
+        initialize attributes and compute the moment matrix once
+
+    test(
+        self,
+        x: int,
+        y: int,
+        z: Tuple[int]
+    ) -> Tuple[float, float]:
+        returns the (partial) correlation and p-value for x _|_ y | z
+
+    marginal_pvalues(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray
+    ) -> numpy.ndarray:
+        p-values of x _|_ y for all pairs of two sets of variables at once
+
+    conditional_pvalues(
+        self,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        z: Tuple[int]
+    ) -> numpy.ndarray:
+        p-values of x[k] _|_ y[k] | z for pairs sharing one conditioning set at once
+
+    correlation(
+        self
+    ) -> numpy.ndarray:
+        DxD Pearson correlation matrix derived from the moment matrix
+
+    update(
+        self,
+        data: pandas.DataFrame
+    ) -> None:
+        add the moments of new samples (with the same columns) to the moment matrix
+
+    Attributes
+    ----------
+    variables: pandas.Index
+        names of the variables (i.e., columns of the input data)
+
+    n_samples: int
+        number of samples used for the moment matrix
+
+    method: str
+        "pearsonr" or "fisher_z"
+
+    center: bool
+        whether "pearsonr" tests the data minus their column means
+
+    moments: numpy.ndarray
+        (D+1)x(D+1) Gram matrix of the data augmented with a constant column
+        (numpy.memmap if `store` is given) of `dtype`; with dtype="float32", it is
+        the Gram matrix of the centered data, whose column sums are kept in float64
+
+    dtype: str
+        "float64" or "float32"
+
+    permutations: int
+        maximum number of permutations of the p-values (None for the asymptotic ones)
+
+    result_cache: grnet.engines.ResultStore
+        persistent cache of the results of `self.test` (None if not given)
+
+    values: numpy.ndarray
+        NxD dense copy of the (resampled) data kept for permutations
+        (None unless `permutations` is given)
+
+    shared_arrays: Tuple[str]
+        names of the array attributes to be placed in shared memory by
+        `grnet.engines.SharedMemoryPool` ("values" is added with `permutations`)
+
+    Notes
+    -----
+    * "pearsonr" reproduces pgmpy.estimators.CITests.pearsonr, i.e., residuals of
+      least squares without intercept followed by a t-test with N-2 degrees of freedom
+    * "fisher_z" is the classical partial correlation (with intercept) tested by
+      Fisher's z-transformation with N-|Z|-3 degrees of freedom
+    * "pearsonr" with center=True is pgmpy's "pearsonr" of the centered data,
+      i.e., the partial correlation of "fisher_z" tested by the t-test with N-2
+      degrees of freedom, without centering (and densifying) sparse data
+    * both of them only need Schur complements of the moment matrix,
+      so that the data matrix is never revisited after initialization
+    * `conditional_pvalues` takes one Schur complement of the union of the
+      pairs given z, i.e., every involved variable is residualized on z once,
+      and the correlations of all pairs are read from it
+    * the moment matrix is computed in `block_size` x `block_size` tiles; with
+      `store`, tiles are written to a memory-mapped file, so that neither the
+      moment matrix nor a dense copy of the data has to fit in memory, and
+      worker processes map the same file instead of copying it
+    * with `permutations`, p-values are calibrated by permuting the residuals of
+      x (given z) against those of y, and the correlations of all permutations
+      in a batch are one matrix product (N small enough to keep the data dense);
+      permutations stop early once the p-value is clearly above or below
+      `significance_level`, and they are seeded by the tested variables, so that
+      results do not depend on the order of tests or worker processes
+    * with dtype="float32", the moment matrix takes half the memory (also in
+      shared memory and `store`) and the products of the data and the screening
+      run in float32; the stored moments are centered (so that they do not cancel
+      in float32), and statistics are computed from them directly; p-values near
+      `significance_level` are recomputed in float64 arithmetic, so that decisions
+      only differ from "float64" by the rounding of the stored moments
+    * conditional "pearsonr" tests regress without intercept, so that they need
+      the uncentered moments, which are restored from the centered ones (and the
+      float64 column sums) in float64 arithmetic only
+    """
+
+    shared_arrays = ("moments",)
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        method: str = "pearsonr",
+        cache_size: int = 4096,
+        rows: np.ndarray = None,
+        store: str = None,
+        block_size: int = 1024,
+        permutations: int = None,
+        significance_level: float = 0.01,
+        random_state: int = 0,
+        result_cache: str = None,
+        dtype: str = "float64",
+        center: bool = False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: pandas.DataFrame
+            NxD matrix (N: number of samples, D: number of genes) of data
+
+        method: str, default: "pearsonr"
+            "pearsonr" (compatible with pgmpy) or "fisher_z"
+
+        cache_size: int, default: 4096
+            maximum number of inverted conditioning blocks to be cached
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a resample);
+            rows are gathered block by block, so that no copy of `data` is made
+
+        store: str, default: None
+            directory of the memory-mapped moment matrix (if None, it is kept in memory)
+
+        block_size: int, default: 1024
+            number of variables in one tile of the moment matrix
+
+        permutations: int, default: None
+            maximum number of permutations of each test; if None, p-values are
+            asymptotic (t or normal distributions)
+
+        significance_level: float, default: 0.01
+            permutations stop once the p-value is clearly above or below it
+            (if None, all permutations are evaluated)
+
+        random_state: int, default: 0
+            random seed of the permutations
+
+        result_cache: str, default: None
+            SQLite file in which results of `self.test` are stored and reused
+            across instances and sessions with the same data and arguments
+            (see `grnet.engines.ResultStore`)
+
+        dtype: str, default: "float64"
+            "float64" or "float32"; with "float32", products of the data, the
+            moment matrix, and cached inverses are float32 (except for conditional
+            "pearsonr" tests), and tests whose p-value is within a factor 2 of
+            `significance_level` are recomputed in float64
+
+        center: bool, default: False
+            if True, "pearsonr" tests are those of the data minus their column
+            means (e.g., pgmpy's "pearsonr" of centered ranks; ignored for "fisher_z")
+
+        Returns
+        -------
+        None
+        """
+        typechecker(data, pd.DataFrame, "data")
+        typechecker(method, str, "method")
+        valchecker(
+            method in ("pearsonr", "fisher_z"),
+            f"method should be 'pearsonr' or 'fisher_z', got {method}",
+        )
+        typechecker(cache_size, int, "cache_size")
+        if rows is not None:
+            typechecker(rows, np.ndarray, "rows")
+        typechecker(block_size, int, "block_size")
+        valchecker(block_size > 0, "block_size should be a positive integer")
+        if permutations is not None:
+            typechecker(permutations, int, "permutations")
+            valchecker(permutations > 0, "permutations should be a positive integer")
+        if significance_level is not None:
+            typechecker(significance_level, float, "significance_level")
+        typechecker(random_state, int, "random_state")
+        typechecker(dtype, str, "dtype")
+        typechecker(center, bool, "center")
+        valchecker(
+            dtype in ("float64", "float32"),
+            f"dtype should be 'float64' or 'float32', got {dtype}",
+        )
+        self.variables = data.columns
+        self.n_samples = data.shape[0] if rows is None else len(rows)
+        self.method = method
+        self.center = center
+        self.dtype = dtype
+        size = data.shape[1] + 1
+        self.moments = (
+            np.zeros((size, size), dtype=dtype)
+            if store is None
+            else _open_store(store, (size, size), dtype)
+        )
+        self._block_size = block_size
+        # float32 moments are centered, and their column sums are kept in float64
+        self._sums = None if dtype == "float64" else np.zeros(size)
+        self._accumulate(data, rows)
+        self._const = data.shape[1]
+        self._cache_size = cache_size
+        self._inverse = lru_cache(maxsize=cache_size)(self._pinv)
+        self.permutations = permutations
+        self.significance_level = significance_level
+        self.random_state = random_state
+        self._result_path = result_cache
+        self.values = None
+        if permutations is not None:
+            self.values = self._dense(data, rows, dtype)
+            self.shared_arrays = ("moments", "values")
+        self.result_cache = self._open_results()
+        pass
+
+    def _open_results(self) -> ResultStore:
+        if self._result_path is None:
+            return None
+        # early stopping of permutations and the float32 refinement make
+        # p-values depend on significance_level
+        arrays = (self.moments,) if self._sums is None else (self.moments, self._sums)
+        exact = self.permutations is None and self.dtype == "float64"
+        fingerprint = _fingerprint(
+            arrays,
+            test="PartialCorrelationTest",
+            method=self.method,
+            center=self.center,
+            n_samples=self.n_samples,
+            permutations=self.permutations,
+            random_state=self.random_state,
+            dtype=self.dtype,
+            significance_level=None if exact else self.significance_level,
+        )
+        return ResultStore(self._result_path, fingerprint)
+
+    @staticmethod
+    def _dense(
+        data: pd.DataFrame, rows: np.ndarray = None, dtype: str = "float64"
+    ) -> np.ndarray:
+        values = _values(data)
+        blocks = [
+            block.toarray() if sparse.issparse(block) else block
+            for block in _row_blocks(values, rows, _rows_per_block(data.shape[1]))
+        ]
+        if len(blocks) == 0:
+            return np.zeros((0, data.shape[1]), dtype=dtype)
+        return np.vstack(blocks).astype(dtype, copy=False)
+
+    @staticmethod
+    def _augmented_blocks(
+        values: Union[np.ndarray, sparse.csr_matrix],
+        rows: np.ndarray,
+        columns: np.ndarray,
+        block_size: int,
+        dtype: str = "float64",
+    ) -> Iterator[Union[np.ndarray, sparse.csr_matrix]]:
+        n_vars = values.shape[1]
+        for block in _row_blocks(values, rows, block_size, columns[columns < n_vars]):
+            block = block.astype(dtype, copy=False)
+            if columns[-1] == n_vars:
+                ones = np.ones((block.shape[0], 1), dtype=dtype)
+                block = (
+                    sparse.hstack([block, ones], format="csr")
+                    if sparse.issparse(block)
+                    else np.hstack([block, ones])
+                )
+            yield block
+
+    @staticmethod
+    def _gram(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        ret = x.T @ y
+        return ret.toarray() if sparse.issparse(ret) else ret
+
+    def _accumulate(self, data: pd.DataFrame, rows: np.ndarray = None) -> None:
+        """
+        add the moments of (the rows of) data to the moment matrix tile by tile
+        (sparse data are multiplied as CSR blocks and never densified;
+        products of float32 blocks are summed into float64 tiles)
+        """
+        values = _values(data)
+        size, step = data.shape[1] + 1, self._block_size
+        n_rows = _rows_per_block(2 * min(step, size))
+        center = self._sums is not None
+        if center:
+            sums = self._column_sums(values, rows, n_rows)
+            n_old, n_new = self._sums[-1], sums[-1]
+            mean = sums / max(n_new, 1)
+            # shift of the old mean to the mean of all samples, weighted as in
+            # the pairwise update of co-moments (Chan et al.)
+            shift = self._sums / max(n_old, 1) - mean
+            weight = n_old * n_new / max(n_old + n_new, 1)
+        for i in range(0, size, step):
+            x = np.arange(i, min(i + step, size))
+            for j in range(i, size, step):
+                y = np.arange(j, min(j + step, size))
+                tile = np.zeros((len(x), len(y)))
+                blocks_x = self._augmented_blocks(values, rows, x, n_rows, self.dtype)
+                if i == j:
+                    pairs = ((block, block) for block in blocks_x)
+                else:
+                    blocks_y = self._augmented_blocks(
+                        values, rows, y, n_rows, self.dtype
+                    )
+                    pairs = zip(blocks_x, blocks_y)
+                dense = True
+                for block_x, block_y in pairs:
+                    dense = not sparse.issparse(block_x)
+                    if center and dense:
+                        # products of centered blocks do not cancel in float32
+                        block_x = block_x - mean[x].astype(self.dtype)
+                        block_y = block_y - mean[y].astype(self.dtype)
+                    tile += self._gram(block_x, block_y)
+                if center:
+                    if not dense:
+                        tile -= np.outer(sums[x], sums[y]) / max(n_new, 1)
+                    tile += np.outer(shift[x], shift[y]) * weight
+                tile_x, tile_y = slice(i, i + len(x)), slice(j, j + len(y))
+                self.moments[tile_x, tile_y] += tile
+                if i != j:
+                    self.moments[tile_y, tile_x] += tile.T
+        if center:
+            self._sums += sums
+
+    @staticmethod
+    def _column_sums(
+        values: Union[np.ndarray, sparse.csr_matrix],
+        rows: np.ndarray,
+        block_size: int,
+    ) -> np.ndarray:
+        """
+        float64 column sums of the data augmented with a constant column
+        """
+        ret = np.zeros(values.shape[1] + 1)
+        for block in _row_blocks(values, rows, block_size):
+            ret[:-1] += np.asarray(block.sum(axis=0, dtype=np.float64)).ravel()
+            ret[-1] += block.shape[0]
+        return ret
+
+    def _entries(
+        self, x: np.ndarray, y: np.ndarray, precise: bool = False, raw: bool = False
+    ) -> np.ndarray:
+        """
+        entries of the moment matrix at broadcast indices; with dtype="float32",
+        they are centered moments (in float64 if `precise`, otherwise in float32),
+        or uncentered moments in float64 if `raw`
+        """
+        ret = self.moments[x, y]
+        if self._sums is None:
+            return ret
+        if not raw:
+            return ret.astype(np.float64) if precise else ret
+        shift = self._sums[x] * self._sums[y] / max(self._sums[-1], 1)
+        return ret.astype(np.float64) + shift
+
+    def update(self, data: pd.DataFrame) -> None:
+        """
+        Parameters
+        ----------
+        data: pandas.DataFrame
+            MxD matrix of new samples with the same columns as `self.variables`
+
+        Returns
+        -------
+        None
+        """
+        typechecker(data, pd.DataFrame, "data")
+        valchecker(
+            data.columns.equals(self.variables),
+            "columns of data should be the same as self.variables",
+        )
+        self._accumulate(data)
+        if self.values is not None:
+            self.values = np.vstack([self.values, self._dense(data, None, self.dtype)])
+        self.n_samples += data.shape[0]
+        self._inverse = lru_cache(maxsize=self._cache_size)(self._pinv)
+        # results of the new data are stored under a new fingerprint
+        _flush_results(self)
+        self.result_cache = self._open_results()
+        pass
+
+    def __getstate__(self) -> dict:
+        return _dump_arrays({k: v for k, v in self.__dict__.items() if k != "_inverse"})
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(_load_arrays(state))
+        self._inverse = lru_cache(maxsize=self._cache_size)(self._pinv)
+
+    def _pinv(self, cond: Tuple[int], precise: bool = False) -> np.ndarray:
+        block = self._entries(*np.ix_(cond, cond), precise, self._raw)
+        # singular values below the rounding error of the dtype are cut
+        rcond = 1e-15 if block.dtype == np.float64 else len(cond) * EPS32
+        return np.linalg.pinv(block, rcond=rcond, hermitian=True)
+
+    @property
+    def _raw(self) -> bool:
+        """
+        whether conditional tests need the uncentered moments, i.e., residuals
+        without intercept of "pearsonr" (float64 arithmetic with dtype="float32")
+        """
+        return self.method == "pearsonr" and not self.center
+
+    def _residual_moments(
+        self, idx: Tuple[int], cond: Tuple[int], precise: bool = False
+    ) -> np.ndarray:
+        raw = self._raw and len(cond) > 0
+        block = self._entries(*np.ix_(idx, idx), precise, raw)
+        if len(cond) == 0:
+            return block
+        cross = self._entries(*np.ix_(idx, cond), precise, raw)
+        return block - cross @ self._inverse(cond, precise) @ cross.T
+
+    def _covariance(
+        self, idx: Tuple[int], z: Tuple[int], precise: bool = False
+    ) -> np.ndarray:
+        """
+        covariance of the residuals of idx given z, whose correlations are tested;
+        float32 moments are centered, so that the intercept is already removed
+        """
+        n, center = self.n_samples, self._sums is not None
+        if not self._raw:
+            return self._residual_moments(idx, z if center else z + (self._const,), precise)
+        if center and len(z) == 0:
+            return self._entries(*np.ix_(idx, idx), precise)
+        s = self._residual_moments(idx + (self._const,), z, precise or center)
+        k = len(idx)
+        return s[:k, :k] - np.outer(s[:k, k], s[:k, k]) / n
+
+    def _refine(self, p_values: np.ndarray, z: Tuple[int] = ()) -> np.ndarray:
+        """
+        whether p-values of float32 arithmetic are close to the significance level
+        (conditional "pearsonr" tests are already computed in float64)
+        """
+        exact = self.dtype == "float64" or (self._raw and len(z) > 0)
+        if exact or self.significance_level is None:
+            return np.zeros(np.shape(p_values), dtype=bool)
+        alpha = self.significance_level
+        return (p_values >= alpha / REFINE) & (p_values <= alpha * REFINE)
+
+    def test(self, x: int, y: int, z: Tuple[int] = ()) -> Tuple[float, float]:
+        """
+        Parameters
+        ----------
+        x: int
+            column index of the first variable
+
+        y: int
+            column index of the second variable
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables
+
+        Returns
+        -------
+        (coef, p_value): Tuple[float, float]
+            (partial) correlation coefficient and its p-value
+            (both are `nan` when residuals are constant)
+        """
+        if self.result_cache is None:
+            return self._test(x, y, z)
+        ret = self.result_cache.get(x, y, z)
+        if ret is None:
+            ret = self._test(x, y, z)
+            self.result_cache.put(x, y, z, ret)
+        return ret
+
+    def _test(self, x: int, y: int, z: Tuple[int]) -> Tuple[float, float]:
+        z = tuple(sorted(z))
+        coef, dof = self._coefficient(x, y, z)
+        if np.isnan(coef):
+            return np.nan, np.nan
+        if self.permutations is not None:
+            return coef, self._permutation_pvalue(x, y, z)
+        p_value = self._pvalue(coef, dof)
+        if self._refine(p_value, z):
+            coef, dof = self._coefficient(x, y, z, precise=True)
+            p_value = np.nan if np.isnan(coef) else self._pvalue(coef, dof)
+        return coef, p_value
+
+    def _coefficient(
+        self, x: int, y: int, z: Tuple[int], precise: bool = False
+    ) -> Tuple[float, int]:
+        n = self.n_samples
+        cov = self._covariance((x, y), z, precise)
+        dof = n - 2 if self.method == "pearsonr" else n - len(z) - 3
+        denom = np.sqrt(cov[0, 0] * cov[1, 1])
+        if not denom > 0 or dof <= 0:
+            return np.nan, dof
+        return float(np.clip(cov[0, 1] / denom, -1, 1)), dof
+
+    def _pvalue(self, coef: float, dof: int) -> float:
+        if abs(coef) == 1:
+            return 0.0
+        if self.method == "pearsonr":
+            stat = coef * np.sqrt(dof / (1 - coef**2))
+            return float(2 * special.stdtr(dof, -abs(stat)))
+        stat = np.arctanh(coef) * np.sqrt(dof)
+        return float(2 * special.ndtr(-abs(stat)))
+
+    def _pvalues(self, coef: np.ndarray, dof: int) -> np.ndarray:
+        """
+        vectorized `_pvalue` (nan for nan coefficients)
+        """
+        ret = np.full(coef.shape, np.nan)
+        valid = ~np.isnan(coef)
+        coef = coef[valid]
+        with np.errstate(divide="ignore"):
+            if self.method == "pearsonr":
+                stat = coef * np.sqrt(dof / (1 - coef**2))
+                ret[valid] = 2 * special.stdtr(dof, -np.abs(stat))
+            else:
+                stat = np.arctanh(coef) * np.sqrt(dof)
+                ret[valid] = 2 * special.ndtr(-np.abs(stat))
+        ret[valid] = np.where(np.abs(coef) == 1, 0.0, ret[valid])
+        return ret
+
+    def conditional_pvalues(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int] = ()
+    ) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: numpy.ndarray
+            column indices of the first variables of the pairs
+
+        y: numpy.ndarray
+            column indices of the second variables of the pairs (same length as x)
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables shared by the pairs
+
+        Returns
+        -------
+        p_values: numpy.ndarray
+            p-values of the pairs, same as `self.test(x[k], y[k], z)[1]`
+            (results are read from and written to `self.result_cache`)
+        """
+        return _cached_pvalues(self, x, y, tuple(sorted(z)), self._conditional)
+
+    def _conditional(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.permutations is not None or len(x) == 0:
+            # permutations are drawn for each pair
+            results = [self._test(i, j, z) for i, j in zip(x.tolist(), y.tolist())]
+            results = np.array(results, dtype=np.float64).reshape(-1, 2)
+            return results[:, 0], results[:, 1]
+        coef, dof = self._coefficients(x, y, z)
+        p_values = self._pvalues(coef, dof)
+        for k in np.flatnonzero(self._refine(p_values, z)):
+            coef[k], dof = self._coefficient(int(x[k]), int(y[k]), z, precise=True)
+            p_values[k] = np.nan if np.isnan(coef[k]) else self._pvalue(coef[k], dof)
+        return coef, p_values
+
+    def _coefficients(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int]
+    ) -> Tuple[np.ndarray, int]:
+        """
+        (partial) correlations of pairs from one Schur complement of their union
+        """
+        n = self.n_samples
+        union, index = np.unique(np.concatenate([x, y]), return_inverse=True)
+        cov = self._covariance(tuple(union.tolist()), z)
+        dof = n - 2 if self.method == "pearsonr" else n - len(z) - 3
+        i, j = np.split(index, [len(x)])
+        var = np.diag(cov).astype(np.float64)
+        denom = np.sqrt(var[i] * var[j])
+        coef = np.full(len(x), np.nan)
+        valid = denom > 0
+        if dof > 0:
+            coef[valid] = np.clip(cov[i, j][valid] / denom[valid], -1, 1)
+        return coef, dof
+
+    def _rng(self, *key: int) -> np.random.Generator:
+        return np.random.default_rng([self.random_state, *key])
+
+    def _permutation_pvalue(self, x: int, y: int, z: Tuple[int]) -> float:
+        x, y = sorted((x, y))
+        cond = self.values[:, list(z)]
+        if not self._raw:
+            cond = np.hstack([cond, np.ones((self.n_samples, 1))])
+        pair = self.values[:, [x, y]]
+        if cond.shape[1] > 0:
+            pair = pair - cond @ np.linalg.lstsq(cond, pair, rcond=None)[0]
+        pair = pair - pair.mean(axis=0)
+        residual_x, residual_y = (pair / np.linalg.norm(pair, axis=0)).T
+        p_value, _ = _permutation_pvalues(
+            lambda perm: np.abs(residual_x[perm] @ residual_y),
+            abs(residual_x @ residual_y),
+            self.n_samples,
+            self.permutations,
+            self._rng(x, y, *z),
+            significance_level=self.significance_level,
+        )
+        return float(p_value)
+
+    def _marginal_permutation_pvalues(
+        self, x: np.ndarray, y: np.ndarray, valid: np.ndarray
+    ) -> np.ndarray:
+        """
+        permutation p-values of all pairs; a batch of B permutations of the
+        standardized x is one B x N x len(x) by N x len(y) product
+        """
+        n = self.n_samples
+        data_x, data_y = self.values[:, x], self.values[:, y]
+        data_x, data_y = data_x - data_x.mean(axis=0), data_y - data_y.mean(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            data_x = np.nan_to_num(data_x / np.linalg.norm(data_x, axis=0))
+            data_y = np.nan_to_num(data_y / np.linalg.norm(data_y, axis=0))
+        batch = max(1, min(128, 2**24 // max(n * len(x) + len(x) * len(y), 1)))
+        p_values, _ = _permutation_pvalues(
+            lambda perm: np.abs(np.matmul(data_x[perm].transpose(0, 2, 1), data_y)),
+            np.abs(data_x.T @ data_y),
+            n,
+            self.permutations,
+            self._rng(int(x[0]), int(y[0]), len(x), len(y)),
+            significance_level=self.significance_level,
+            batch_size=batch,
+        )
+        return np.where(valid, p_values, np.nan)
+
+    def marginal_pvalues(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        x: numpy.ndarray
+            column indices of the first variables
+
+        y: numpy.ndarray
+            column indices of the second variables
+
+        Returns
+        -------
+        p_values: numpy.ndarray
+            len(x) x len(y) matrix of p-values, same as `self.test(x[i], y[j])[1]`
+            (except for the random permutations with `self.permutations`)
+        """
+        p_values, valid = self._marginal(x[:, None], y[None, :])
+        if self.permutations is not None and np.any(valid):
+            return self._marginal_permutation_pvalues(x, y, valid)
+        refine = self._refine(p_values)
+        if np.any(refine):
+            i, j = np.nonzero(refine)
+            p_values[i, j] = self._marginal(x[i], y[j], precise=True)[0]
+        return p_values
+
+    def _marginal(
+        self, x: np.ndarray, y: np.ndarray, precise: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        p-values (and whether they are defined) of pairs of broadcast indices
+        """
+        n, const = self.n_samples, self._const
+        cov = self._entries(x, y, precise)
+        var_x = self._entries(x, x, precise)
+        var_y = self._entries(y, y, precise)
+        if self._sums is None:
+            sum_x, sum_y = self.moments[x, const], self.moments[y, const]
+            cov, var_x, var_y = (
+                cov - sum_x * sum_y / n, var_x - sum_x**2 / n, var_y - sum_y**2 / n
+            )
+        denom = np.sqrt(var_x * var_y)
+        dof = n - 2 if self.method == "pearsonr" else n - 3
+        coef = np.full(cov.shape, np.nan)
+        valid = (denom > 0) & (dof > 0)
+        coef[valid] = np.clip(cov[valid] / denom[valid], -1, 1)
+        return self._pvalues(coef, dof), valid
+
+    def correlation(self) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        correlation: numpy.ndarray
+            DxD Pearson correlation matrix of the variables (with intercept);
+            rows and columns of constant variables are 0 except the diagonal
+        """
+        n, const = self.n_samples, self._const
+        if self._sums is None:
+            sums = np.asarray(self.moments[:const, const])
+            cov = np.asarray(self.moments[:const, :const]) - np.outer(sums, sums) / n
+        else:
+            cov = np.asarray(self.moments[:const, :const], dtype=np.float64)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        scale = np.divide(1.0, std, out=np.zeros_like(std), where=std > 0)
+        corr = np.clip(cov * np.outer(scale, scale), -1, 1)
+        np.fill_diagonal(corr, 1.0)
+        return corr
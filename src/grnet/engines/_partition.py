@@ -0,0 +1,396 @@
+"""
+divide-and-conquer adjacency search over overlapping blocks of variables
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typechecker, valchecker
+
+from ._parallel import SharedMemoryPool
+from ._results import _flush_results
+from ._screening import marginal_screen
+from ._skeleton import SkeletonSearch
+from ._stats import EstimateStats
+
+
+class _SubsetTest:
+    """
+    view of a CI test restricted to a subset of its variables (local indices)
+    """
+
+    shared_arrays = ()
+
+    def __init__(self, ci_test: Any, index: np.ndarray) -> None:
+        self.ci_test = ci_test
+        self.index = index
+        self.variables = ci_test.variables[index]
+
+    def test(self, x: int, y: int, z: Tuple[int] = ()) -> Tuple[float, float]:
+        index = self.index
+        return self.ci_test.test(index[x], index[y], tuple(index[v] for v in z))
+
+    def conditional_pvalues(
+        self, x: np.ndarray, y: np.ndarray, z: Tuple[int] = ()
+    ) -> np.ndarray:
+        index, z = self.index, tuple(int(self.index[v]) for v in z)
+        if not hasattr(self.ci_test, "conditional_pvalues"):
+            return np.array(
+                [self.ci_test.test(index[i], index[j], z)[1] for i, j in zip(x, y)]
+            )
+        return self.ci_test.conditional_pvalues(index[x], index[y], z)
+
+
+def _partition(
+    graph: np.ndarray, max_block_size: int, random_state: int = 0
+) -> List[np.ndarray]:
+    """
+    function to split the variables into disjoint blocks of dependent variables
+
+    Parameters
+    ----------
+    graph: numpy.ndarray
+        DxD boolean matrix of the marginal dependence graph
+
+    max_block_size: int
+        maximum number of variables in one block
+
+    random_state: int, default: 0
+        seed of the community detection
+
+    Returns
+    -------
+    blocks: List[numpy.ndarray]
+        sorted variable indices of each block (isolated variables are omitted)
+
+    Notes
+    -----
+    * connected components larger than `max_block_size` are split into Louvain
+      communities, and communities still too large are cut in BFS order
+    * small components and communities are packed together (first fit decreasing)
+    """
+    net = nx.from_scipy_sparse_array(csr_matrix(graph))
+    pieces = []
+    for component in nx.connected_components(net):
+        if len(component) < 2:
+            continue
+        if len(component) <= max_block_size:
+            pieces.append(sorted(component))
+            continue
+        sub = net.subgraph(component)
+        for community in nx.community.louvain_communities(sub, seed=random_state):
+            if len(community) <= max_block_size:
+                pieces.append(sorted(community))
+                continue
+            root = next(iter(community))
+            order = list(nx.bfs_tree(sub.subgraph(community), root))
+            order += sorted(set(community) - set(order))
+            for k in range(0, len(order), max_block_size):
+                pieces.append(sorted(order[k:][:max_block_size]))
+    bins = []
+    for piece in sorted(pieces, key=len, reverse=True):
+        for block in bins:
+            if len(block) + len(piece) <= max_block_size:
+                block += piece
+                break
+        else:
+            bins.append(list(piece))
+    return [np.array(sorted(block)) for block in bins]
+
+
+def _search_block(ci_test: Any, task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    function to run the adjacency search within an (extended) block
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object over all variables
+
+    task: Dict[str, Any]
+        {"index": variable indices, "graph": marginal dependence graph of the block,
+        "kwargs": kwargs of `grnet.engines.SkeletonSearch`, "deadline": `time.time()`
+        after which the block stops (None for unlimited)}
+
+    Returns
+    -------
+    result: Dict[str, Any]
+        {"separating_sets" (global indices), "n_tests", "level", "completed_level",
+        "stopped_by", "stats"}
+    """
+    index, deadline = task["index"], task["deadline"]
+    search = SkeletonSearch(
+        _SubsetTest(ci_test, index),
+        n_jobs=1,
+        screening=False,
+        time_budget=None if deadline is None else max(deadline - time.time(), 0.0),
+        **task["kwargs"],
+    )
+    search.adjacency = task["graph"].copy()
+    search.run()
+    separating_sets = {
+        frozenset(int(index[v]) for v in k): tuple(int(index[v]) for v in z)
+        for k, z in search.separating_sets.items()
+    }
+    return {
+        "separating_sets": separating_sets,
+        "n_tests": search.n_tests,
+        "level": search.level,
+        "completed_level": search.completed_level,
+        "stopped_by": search.stopped_by,
+        "stats": search.stats,
+    }
+
+
+class PartitionedSearch(SkeletonSearch):
+    """
+    divide-and-conquer adjacency search over overlapping blocks of variables
+
+    Methods
+    -------
+    __init__(
+        self,
+        ci_test: Any,
+        max_block_size: int,
+        variant: str,
+        max_cond_vars: int,
+        significance_level: float,
+        n_jobs: int,
+        random_state: int,
+        time_budget: float,
+        max_tests: int
+    ) -> None:
+        initialize attributes with a complete graph
+
+    run(
+        self
+    ) -> grnet.engines.PartitionedSearch:
+        search each block in parallel and reconcile the edges between blocks
+
+    refit(
+        self
+    ) -> grnet.engines.PartitionedSearch:
+        run the partitioned search again (e.g., after `ci_test` was updated)
+
+    Attributes
+    ----------
+    max_block_size: int
+        maximum number of variables in the core of one block
+
+    blocks: List[numpy.ndarray]
+        variable indices of the core of each block
+
+    extended_blocks: List[numpy.ndarray]
+        cores extended with their neighbors in the marginal dependence graph
+
+    boundary: numpy.ndarray
+        DxD boolean matrix of pairs whose variables share no core
+
+    (other attributes are the same as grnet.engines.SkeletonSearch)
+
+    Notes
+    -----
+    * the marginal dependence graph (level 0 for all pairs) is obtained by
+      `grnet.engines.marginal_screen` and split into blocks of dependent variables
+    * every block is extended with the marginal neighbors of its core, so that
+      each marginally dependent pair is searched together in at least one block
+    * an edge is kept only if no block found a separating set, and edges on the
+      boundary are searched again with neighbors of the merged skeleton
+    * blocks run in parallel over `grnet.engines.SharedMemoryPool` for `n_jobs != 1`
+    * marginally independent pairs are dropped as `candidates` of SkeletonSearch
+    * `stats` sums the levels of all blocks (stage "blocks") apart from the
+      levels of the boundary (stage "boundary")
+    * `time_budget` is shared by all blocks and the boundary, and `max_tests` is
+      split over blocks in proportion to their sizes; if a block is cut, the
+      boundary is not searched and `completed_level` is the minimum over blocks
+    """
+
+    def __init__(
+        self,
+        ci_test: Any,
+        max_block_size: int = 500,
+        variant: str = "stable",
+        max_cond_vars: int = None,
+        significance_level: float = 0.01,
+        n_jobs: int = 1,
+        random_state: int = 0,
+        time_budget: float = None,
+        max_tests: int = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        ci_test: Any
+            CI test object with `variables`, `test(x, y, z)`, and `marginal_pvalues(x, y)`
+
+        max_block_size: int, default: 500
+            maximum number of variables in the core of one block
+
+        variant: str, default: "stable"
+            "orig", "stable", or "parallel" (used within each block)
+
+        max_cond_vars: int, default: None
+            maximum size of conditioning sets (if None, number of variables is used)
+
+        significance_level: float, default: 0.01
+            x and y are regarded as independent given z when p-value >= significance_level
+
+        n_jobs: int, default: 1
+            number of worker processes over blocks (-1 means all CPUs)
+
+        random_state: int, default: 0
+            seed of the community detection used to split large components
+
+        time_budget: float, default: None
+            seconds after which `run` stops (if None, unlimited)
+
+        max_tests: int, default: None
+            maximum number of CI tests of `run`, excluding the screening
+            (if None, unlimited)
+
+        Returns
+        -------
+        None
+        """
+        super().__init__(
+            ci_test,
+            variant,
+            max_cond_vars,
+            significance_level,
+            n_jobs,
+            time_budget=time_budget,
+            max_tests=max_tests,
+        )
+        typechecker(max_block_size, int, "max_block_size")
+        valchecker(max_block_size > 1, "max_block_size should be larger than 1")
+        typechecker(random_state, int, "random_state")
+        self.max_block_size = max_block_size
+        self.random_state = random_state
+        self.blocks = None
+        self.extended_blocks = None
+        self.boundary = None
+        pass
+
+    def run(self) -> "PartitionedSearch":
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        self: grnet.engines.PartitionedSearch
+            the search itself (results are saved as attributes)
+        """
+        self.stats = EstimateStats()
+        with self.stats.measure():
+            try:
+                self._run_blocks()
+            finally:
+                _flush_results(self.ci_test)
+        return self
+
+    def _run_blocks(self) -> None:
+        n_vars = len(self.ci_test.variables)
+        start, cache = time.time(), self.cache_info()
+        self.adjacency = ~np.eye(n_vars, dtype=bool)
+        with self._record("screening", 0):
+            graph = marginal_screen(self.ci_test, self.significance_level)
+            self.candidates = graph
+            self.adjacency = graph.copy()
+            self.separating_sets = {}
+            self.level = 0
+            self.n_tests += n_vars * (n_vars - 1) // 2
+        self.blocks = _partition(graph, self.max_block_size, self.random_state)
+        self.extended_blocks = []
+        for block in self.blocks:
+            member = np.zeros(n_vars, dtype=bool)
+            member[block] = True
+            self.extended_blocks.append(
+                np.flatnonzero(member | graph[block].any(axis=0))
+            )
+        extended_blocks = sorted(self.extended_blocks, key=len, reverse=True)
+        total = sum(len(v) for v in extended_blocks)
+        tasks = [
+            {
+                "index": v,
+                "graph": graph[np.ix_(v, v)],
+                "kwargs": {
+                    "variant": self.variant,
+                    "max_cond_vars": self.max_cond_vars,
+                    "significance_level": self.significance_level,
+                    "max_tests": (
+                        None
+                        if self.max_tests is None
+                        else self.max_tests * len(v) // total
+                    ),
+                },
+                "deadline": (
+                    None if self.time_budget is None else start + self.time_budget
+                ),
+            }
+            for v in extended_blocks
+        ]
+        if self.n_jobs != 1 and len(tasks) > 1:
+            wall = time.perf_counter()
+            with SharedMemoryPool(self.ci_test, n_jobs=self.n_jobs) as pool:
+                results = pool.map(_search_block, tasks)
+            for k, v in pool.cache_counts.items():
+                self._worker_cache_counts[k] = self._worker_cache_counts.get(k, 0) + v
+            self.stats._add_workers(
+                pool.cpu_time, pool.n_jobs * (time.perf_counter() - wall)
+            )
+        else:
+            results = [_search_block(self.ci_test, task) for task in tasks]
+        if len(cache) > 0:
+            after = self.cache_info()
+            self.stats._add_cache(
+                after["hits"] - cache["hits"], after["misses"] - cache["misses"]
+            )
+        n_tests = self.n_tests
+        for result in results:
+            self.stats.merge(result["stats"], "blocks")
+            self.n_tests += result["n_tests"]
+            self.level = max(self.level, result["level"])
+            for k, z in result["separating_sets"].items():
+                if k not in self.separating_sets:
+                    self._remove(*sorted(k), z)
+        core = np.full(n_vars, -1)
+        for i, block in enumerate(self.blocks):
+            core[block] = i
+        self.boundary = (core[:, None] != core[None, :]) | (core[:, None] < 0)
+        stopped = [v["stopped_by"] for v in results if v["stopped_by"] is not None]
+        if len(stopped) > 0:
+            self.completed_level = min(v["completed_level"] for v in results)
+            self.stopped_by = stopped[0]
+            return None
+        level = self.level
+        time_budget, max_tests = self.time_budget, self.max_tests
+        if time_budget is not None:
+            self.time_budget = max(time_budget - (time.time() - start), 0.0)
+        if max_tests is not None:
+            self.max_tests = max(max_tests - (self.n_tests - n_tests), 0)
+        try:
+            self._run(self.boundary, "boundary")
+        finally:
+            self.time_budget, self.max_tests = time_budget, max_tests
+        self.level = max(level, self.level)
+        if self.stopped_by is None:
+            self.completed_level = self.level
+
+    def refit(self) -> "PartitionedSearch":
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        self: grnet.engines.PartitionedSearch
+            the search itself (results are saved as attributes)
+        """
+        return self.run()
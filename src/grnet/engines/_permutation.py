@@ -0,0 +1,116 @@
+"""
+Monte Carlo permutation p-values computed in batches of permutations
+"""
+
+from typing import Callable, Tuple
+
+import numpy as np
+from scipy import special
+
+# confidence level of the early stopping is 1 - STOP_RISK
+STOP_RISK = 1e-3
+
+
+def _permutations(
+    n_samples: int,
+    size: int,
+    rng: np.random.Generator,
+    strata: np.ndarray = None,
+) -> np.ndarray:
+    """
+    size x n_samples matrix whose rows are random permutations of the samples
+    (within each stratum if `strata` is given)
+    """
+    keys = rng.random((size, n_samples))
+    if strata is None:
+        return np.argsort(keys, axis=1)
+    # keys in [0, 1) shuffle the samples without leaving their stratum
+    order = np.argsort(strata, kind="stable")
+    ret = np.empty((size, n_samples), dtype=np.intp)
+    ret[:, order] = order[np.argsort(strata[order] + keys, axis=1)]
+    return ret
+
+
+def _decided(exceed: np.ndarray, n_done: int, significance_level: float) -> np.ndarray:
+    """
+    whether the Clopper-Pearson interval of the p-value excludes significance_level
+    """
+    lower = np.where(
+        exceed > 0,
+        special.betaincinv(np.maximum(exceed, 1), n_done - exceed + 1, STOP_RISK / 2),
+        0.0,
+    )
+    upper = np.where(
+        exceed < n_done,
+        special.betaincinv(
+            exceed + 1, np.maximum(n_done - exceed, 1), 1 - STOP_RISK / 2
+        ),
+        1.0,
+    )
+    return (lower > significance_level) | (upper < significance_level)
+
+
+def _permutation_pvalues(
+    statistic: Callable[[np.ndarray], np.ndarray],
+    observed: np.ndarray,
+    n_samples: int,
+    n_permutations: int,
+    rng: np.random.Generator,
+    strata: np.ndarray = None,
+    significance_level: float = None,
+    batch_size: int = 128,
+) -> Tuple[np.ndarray, int]:
+    """
+    function to calibrate statistics by permutations of the samples
+
+    Parameters
+    ----------
+    statistic: Callable[[numpy.ndarray], numpy.ndarray]
+        function mapping a B x N matrix of permutations (see `_permutations`)
+        to a B x `observed.shape` array of the permuted statistics at once
+
+    observed: numpy.ndarray
+        observed statistics (larger values mean stronger dependence)
+
+    n_samples: int
+        number of samples (N)
+
+    n_permutations: int
+        maximum number of permutations
+
+    rng: numpy.random.Generator
+        random generator of the permutations
+
+    strata: numpy.ndarray, default: None
+        stratum of each sample, within which samples are permuted
+
+    significance_level: float, default: None
+        if given, permutations stop as soon as every p-value is clearly above or
+        below it (Clopper-Pearson interval at the level 1 - STOP_RISK)
+
+    batch_size: int, default: 128
+        number of permutations evaluated by one call of `statistic`
+
+    Returns
+    -------
+    (p_values, n_done): Tuple[numpy.ndarray, int]
+        (1 + number of permuted statistics >= observed) / (1 + n_done),
+        where n_done is the number of permutations actually evaluated
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    exceed = np.zeros(observed.shape, dtype=np.int64)
+    n_done = 0
+    while n_done < n_permutations:
+        size = min(batch_size, n_permutations - n_done)
+        permuted = statistic(_permutations(n_samples, size, rng, strata))
+        # ties within rounding errors count as exceedances
+        exceed += np.sum(
+            (permuted >= observed) | np.isclose(permuted, observed, rtol=1e-9),
+            axis=0,
+        )
+        n_done += size
+        if significance_level is not None and np.all(
+            _decided(exceed, n_done, significance_level)
+        ):
+            break
+    return (exceed + 1) / (n_done + 1), n_done
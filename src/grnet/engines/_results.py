@@ -0,0 +1,307 @@
+"""
+persistent cache of CI test results in a SQLite file
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+from grnet.dev import typechecker, valchecker
+
+# rows of an array hashed at once
+HASH_ROWS = 1024
+
+
+def _fingerprint(arrays: Tuple[np.ndarray], **params: Any) -> str:
+    """
+    content hash of the arrays (read block by block, e.g., memory-mapped files)
+    and the parameters of a CI test
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(sorted(params.items())).encode())
+    for array in arrays:
+        array = np.asarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        flat = array.reshape(len(array), -1) if array.ndim > 0 else array.reshape(1, 1)
+        for i in range(0, len(flat), HASH_ROWS):
+            stop = i + HASH_ROWS
+            digest.update(np.ascontiguousarray(flat[i:stop]).tobytes())
+    return digest.hexdigest()
+
+
+def _cached_pvalues(
+    ci_test: Any,
+    x: np.ndarray,
+    y: np.ndarray,
+    z: Tuple[int],
+    compute: Callable[..., Tuple[np.ndarray, np.ndarray]],
+) -> np.ndarray:
+    """
+    p-values of x[k] _|_ y[k] | z read from the result cache of ci_test, where
+    the missing ones are computed at once by `compute(x, y, z) -> (statistics,
+    p_values)` and stored
+    """
+    x, y = np.asarray(x, dtype=np.intp), np.asarray(y, dtype=np.intp)
+    store = getattr(ci_test, "result_cache", None)
+    if store is None:
+        return compute(x, y, z)[1]
+    ret = np.empty(len(x))
+    missing = []
+    for k, (i, j) in enumerate(zip(x.tolist(), y.tolist())):
+        result = store.get(i, j, z)
+        if result is None:
+            missing.append(k)
+        else:
+            ret[k] = result[1]
+    if len(missing) > 0:
+        missing = np.array(missing, dtype=np.intp)
+        stats, p_values = compute(x[missing], y[missing], z)
+        ret[missing] = p_values
+        for k, stat, p_value in zip(missing, stats, p_values):
+            store.put(int(x[k]), int(y[k]), z, (stat, p_value))
+    return ret
+
+
+def _flush_results(ci_test: Any) -> None:
+    store = getattr(ci_test, "result_cache", None)
+    if store is not None:
+        store.flush()
+
+
+class ResultStore:
+    """
+    persistent cache of CI test results in a SQLite file
+
+    Methods
+    -------
+    __init__(
+        self,
+        path: str,
+        fingerprint: str,
+        flush_every: int
+    ) -> None:
+        initialize attributes and create the table if the file is new
+
+    get(
+        self,
+        x: int,
+        y: int,
+        z: Tuple[int]
+    ) -> Tuple[float, float]:
+        returns the stored (statistic, p_value) of x _|_ y | z or None
+
+    put(
+        self,
+        x: int,
+        y: int,
+        z: Tuple[int],
+        result: Tuple[float, float]
+    ) -> None:
+        store a result (written to the file every `flush_every` results)
+
+    flush(
+        self
+    ) -> None:
+        write the pending results to the file
+
+    info(
+        self
+    ) -> Dict[str, int]:
+        hits, misses, and numbers of stored and pending results
+
+    Attributes
+    ----------
+    path: str
+        path of the SQLite file
+
+    fingerprint: str
+        content hash of the sufficient statistics and the type of the CI test,
+        under which the results are stored
+
+    flush_every: int
+        number of pending results that triggers a write
+
+    Notes
+    -----
+    * results of the same fingerprint are read into a dict at the first lookup,
+      so that a repeated estimation (e.g., with another significance level or
+      maximum size of conditioning sets) costs dict lookups instead of tests
+    * keys are (min(x, y), max(x, y), sorted z), since every CI test of
+      grnet.engines is symmetric in x and y
+    * one file can hold the results of many datasets and CI tests; worker
+      processes open their own connection and append their results, and
+      concurrent writers wait for the lock of SQLite
+    """
+
+    def __init__(self, path: str, fingerprint: str, flush_every: int = 4096) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            path of the SQLite file (created if it does not exist)
+
+        fingerprint: str
+            key of the dataset and CI test (see `_fingerprint`)
+
+        flush_every: int, default: 4096
+            number of pending results that triggers a write
+
+        Returns
+        -------
+        None
+        """
+        typechecker(path, str, "path")
+        directory = os.path.dirname(os.path.abspath(path))
+        valchecker(
+            os.path.isdir(directory), f"directory of path should exist, got {path}"
+        )
+        typechecker(fingerprint, str, "fingerprint")
+        typechecker(flush_every, int, "flush_every")
+        valchecker(flush_every > 0, "flush_every should be a positive integer")
+        self.path = path
+        self.fingerprint = fingerprint
+        self.flush_every = flush_every
+        self._results = None
+        self._pending = []
+        self._hits = 0
+        self._misses = 0
+        self._connection = None
+        self._pid = None
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (fingerprint TEXT, x INTEGER, "
+                "y INTEGER, z TEXT, statistic REAL, p_value REAL, "
+                "PRIMARY KEY (fingerprint, x, y, z))"
+            )
+        pass
+
+    def __getstate__(self) -> dict:
+        # copies (e.g., in worker processes) reconnect and read the file again
+        return {
+            **self.__dict__,
+            "_results": None,
+            "_pending": [],
+            "_connection": None,
+            "_pid": None,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _key(x: int, y: int, z: Tuple[int]) -> Tuple[int, int, str]:
+        x, y = sorted((int(x), int(y)))
+        return x, y, ",".join(str(int(v)) for v in sorted(z))
+
+    def _load(self) -> Dict[Tuple[int, int, str], Tuple[float, float]]:
+        if self._results is None:
+            rows = self._connect().execute(
+                "SELECT x, y, z, statistic, p_value FROM results WHERE fingerprint = ?",
+                (self.fingerprint,),
+            )
+            self._results = {
+                (x, y, z): (
+                    np.nan if stat is None else stat,
+                    np.nan if p_value is None else p_value,
+                )
+                for x, y, z, stat, p_value in rows
+            }
+        return self._results
+
+    def get(self, x: int, y: int, z: Tuple[int] = ()) -> Tuple[float, float]:
+        """
+        Parameters
+        ----------
+        x: int
+            column index of the first variable
+
+        y: int
+            column index of the second variable
+
+        z: Tuple[int], default: ()
+            column indices of the conditioning variables
+
+        Returns
+        -------
+        result: Tuple[float, float]
+            stored (statistic, p_value), or None if x _|_ y | z was not stored
+        """
+        ret = self._load().get(self._key(x, y, z))
+        if ret is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return ret
+
+    def put(self, x: int, y: int, z: Tuple[int], result: Tuple[float, float]) -> None:
+        """
+        Parameters
+        ----------
+        x: int
+            column index of the first variable
+
+        y: int
+            column index of the second variable
+
+        z: Tuple[int]
+            column indices of the conditioning variables
+
+        result: Tuple[float, float]
+            (statistic, p_value) of the test
+
+        Returns
+        -------
+        None
+        """
+        key = self._key(x, y, z)
+        result = (float(result[0]), float(result[1]))
+        self._load()[key] = result
+        self._pending.append(key + result)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        pass
+
+    def flush(self) -> None:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if len(self._pending) == 0:
+            return None
+        # NaN is stored as NULL by SQLite
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.fingerprint,) + row for row in self._pending],
+            )
+        self._pending = []
+
+    def info(self) -> Dict[str, int]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        information: Dict[str, int]
+            {"hits": int, "misses": int, "entries": int, "pending": int}
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(self._load()),
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,73 @@
+"""
+blocked gather of (resampled) rows of a data matrix
+"""
+
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+ROW_BLOCK = 2**16
+
+
+def _values(data: pd.DataFrame) -> Union[np.ndarray, sparse.csr_matrix]:
+    """
+    values of data as a CSR matrix if all columns are sparse, otherwise as an array
+    """
+    if data.shape[1] > 0 and all(isinstance(v, pd.SparseDtype) for v in data.dtypes):
+        return data.sparse.to_coo().tocsr()
+    return data.to_numpy()
+
+
+def _rows_per_block(n_cols: int, budget: int = 2**22) -> int:
+    """
+    number of rows (a multiple of 64) in one block of about `budget` elements
+    """
+    return int(min(ROW_BLOCK, max(64, budget // max(n_cols, 1) // 64 * 64)))
+
+
+def _row_blocks(
+    data: Union[pd.DataFrame, np.ndarray, sparse.csr_matrix],
+    rows: np.ndarray = None,
+    block_size: int = ROW_BLOCK,
+    columns: np.ndarray = None,
+) -> Iterator[np.ndarray]:
+    """
+    function to yield contiguous copies of rows of data, one block at a time
+
+    Parameters
+    ----------
+    data: Union[pandas.DataFrame, numpy.ndarray, scipy.sparse.csr_matrix]
+        NxD matrix of data (parent matrix of the resample); a DataFrame whose
+        columns are all sparse is read as a CSR matrix (see `_values`)
+
+    rows: numpy.ndarray, default: None
+        positional indices of the rows to be read (if None, all rows are read)
+
+    block_size: int, default: 2**16
+        maximum number of rows in one block (a multiple of 64 keeps packed bits dense)
+
+    columns: numpy.ndarray, default: None
+        positional indices of the columns to be read (if None, all columns are read)
+
+    Returns
+    -------
+    blocks: Iterator[Union[numpy.ndarray, scipy.sparse.csr_matrix]]
+        blocks of at most `block_size` rows in the order of `rows`
+        (CSR matrices for sparse data, so that no dense copy is made)
+    """
+    values = _values(data) if isinstance(data, pd.DataFrame) else data
+    n_rows = values.shape[0] if rows is None else len(rows)
+    for start in range(0, max(n_rows, 1), block_size):
+        stop = min(start + block_size, n_rows)
+        index = slice(start, stop) if rows is None else rows[start:stop]
+        if sparse.issparse(values):
+            block = values[index]
+            yield block if columns is None else block[:, columns]
+        elif columns is None:
+            yield values[index]
+        elif rows is None:
+            yield values[index, columns]
+        else:
+            yield values[np.ix_(index, columns)]
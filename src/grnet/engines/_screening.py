@@ -0,0 +1,50 @@
+"""
+blocked marginal screening of all pairs of variables
+"""
+
+from typing import Any
+
+import numpy as np
+
+from grnet.dev import typechecker, valchecker
+
+
+def marginal_screen(
+    ci_test: Any, significance_level: float = 0.01, block_size: int = 1024
+) -> np.ndarray:
+    """
+    function to test all pairs of variables marginally, one block of pairs at a time
+
+    Parameters
+    ----------
+    ci_test: Any
+        CI test object with `variables` and `marginal_pvalues(x, y) -> p_values`
+        (e.g., grnet.engines.PartialCorrelationTest or ContingencyTest)
+
+    significance_level: float, default: 0.01
+        x and y are regarded as independent when p-value >= significance_level
+
+    block_size: int, default: 1024
+        number of variables in one block (memory is O(block_size^2) per block)
+
+    Returns
+    -------
+    dependence graph: numpy.ndarray
+        DxD boolean matrix whose (x, y) element is True when x and y are
+        not marginally independent (same decision as level 0 of PC)
+    """
+    typechecker(significance_level, float, "significance_level")
+    typechecker(block_size, int, "block_size")
+    valchecker(block_size > 0, "block_size should be a positive integer")
+    n_vars = len(ci_test.variables)
+    graph = np.zeros((n_vars, n_vars), dtype=bool)
+    starts = range(0, n_vars, block_size)
+    for i in starts:
+        x = np.arange(i, min(i + block_size, n_vars))
+        for j in range(i, n_vars, block_size):
+            y = np.arange(j, min(j + block_size, n_vars))
+            dependent = ~(ci_test.marginal_pvalues(x, y) >= significance_level)
+            graph[np.ix_(x, y)] = dependent
+            graph[np.ix_(y, x)] = dependent.T
+    np.fill_diagonal(graph, False)
+    return graph
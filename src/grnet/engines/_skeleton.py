@@ -0,0 +1,720 @@
+"""
+level-wise adjacency search of PC algorithm and orientation of its skeleton
+"""
+
+import os
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterator, List, Tuple, Union
+
+import networkx as nx
+import numpy as np
+from pgmpy.base import DAG, PDAG
+from pgmpy.estimators import PC as PGMPYPC
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typechecker, valchecker
+
+from ._parallel import SharedMemoryPool, _find_separating_set, _find_separating_sets
+from ._results import _flush_results
+from ._screening import marginal_screen
+from ._stats import EstimateStats
+
+
+class SkeletonSearch:
+    """
+    level-wise adjacency search (the first part of PC algorithm) over column indices
+
+    Methods
+    -------
+    __init__(
+        self,
+        ci_test: Any,
+        variant: str,
+        max_cond_vars: int,
+        significance_level: float,
+        n_jobs: int,
+        screening: bool,
+        block_size: int,
+        time_budget: float,
+        max_tests: int,
+        checkpoint: str,
+        checkpoint_every: int,
+        batched: bool
+    ) -> None:
+        initialize attributes with a complete graph
+
+    run(
+        self,
+        mask: numpy.ndarray
+    ) -> grnet.engines.SkeletonSearch:
+        remove edges level by level until no conditioning set of the current size exists
+
+    refit(
+        self
+    ) -> grnet.engines.SkeletonSearch:
+        re-run the search from the current skeleton after `ci_test` was updated
+
+    save_checkpoint(
+        self,
+        path: str
+    ) -> None:
+        write the adjacency, separating sets, and position of the search to a file
+
+    load_checkpoint(
+        self,
+        path: str
+    ) -> grnet.engines.SkeletonSearch:
+        restore a checkpoint, so that the next `run` continues from its position
+
+    cache_info(
+        self
+    ) -> Dict[str, int]:
+        cache information of `ci_test` including lookups in worker processes
+
+    sparse_adjacency(
+        self
+    ) -> scipy.sparse.csr_matrix:
+        current skeleton as a symmetric DxD sparse matrix
+
+    edges(
+        self
+    ) -> List[Tuple[str, str]]:
+        undirected edges of the current skeleton labeled with variable names
+
+    Attributes
+    ----------
+    ci_test: Any
+        CI test object with `variables` and `test(x, y, z) -> (statistic, p_value)`
+
+    adjacency: numpy.ndarray
+        DxD boolean adjacency matrix of the current skeleton
+
+    separating_sets: Dict[FrozenSet[int], Tuple[int]]
+        separating sets of removed edges (keys and values are column indices)
+
+    level: int
+        size of the conditioning sets in the last level that was searched
+
+    n_tests: int
+        number of CI tests that have been run
+
+    candidates: numpy.ndarray
+        DxD boolean matrix of marginally dependent pairs, i.e., the candidate graph
+        pruned by screening before the conditional search (None without screening)
+
+    completed_level: int
+        the last level whose edges were all searched (-1 if none)
+
+    stopped_by: str
+        "time_budget" or "max_tests" if the last `run` was cut by the budget
+        (None if the search finished)
+
+    stats: grnet.engines.EstimateStats
+        CI tests, time, and edges removed of each level of the last `run`,
+        with its peak memory, cache hits, and worker utilization
+
+    Notes
+    -----
+    * edges are visited in the same order as pgmpy.estimators.PC
+    * "orig" updates neighbors immediately, while "stable" and "parallel" fix
+      neighbors at the beginning of each level (order-independent PC-stable);
+      pgmpy's "parallel" does the same, but its "stable" draws conditioning sets
+      from the updated graph as "orig" does, so that its skeleton can differ
+    * for "stable" and "parallel", `n_jobs != 1` distributes the edges of each
+      level over `grnet.engines.SharedMemoryPool` (same result as `n_jobs=1`)
+    * `refit` restores removed edges whose separating set no longer separates them
+      and searches again from the resulting skeleton, so that the neighbor sets
+      (and the number of tests) stay as small as those of the previous result
+    * with `screening`, level 0 is replaced with `grnet.engines.marginal_screen`
+      (same decisions, vectorized over blocks of pairs); pairs dropped by it are
+      not saved in `separating_sets` to keep memory O(edges), and `skeleton`
+      returns the empty set for them
+    * with `time_budget` or `max_tests`, every `run` stops before the test that
+      would exceed the budget and keeps the current skeleton; edges of the
+      interrupted level that were not fully searched are kept (conservative),
+      and `completed_level` tells up to which level the result is exact
+    * with `checkpoint`, the state is written to the file after the screening,
+      after each level, every `checkpoint_every` tests, and when the budget is
+      used up (compressed .npz: packed bits of the adjacency and the pointer
+      (level, number of finished edges, neighbors at the beginning of the level));
+      edges finished before the checkpoint are not tested again after
+      `load_checkpoint` (in parallel, edges are checkpointed in batches)
+    * with `batched` and a CI test with `conditional_pvalues(x, y, z)`, levels
+      of "stable" and "parallel" are searched in rounds: each round takes the
+      next conditioning set of every unresolved edge and tests the edges sharing
+      a set by one call, so that the involved variables are residualized (or
+      stratified) once per set; with worker processes, each chunk of edges is
+      searched in rounds of its own; the tests, removed edges, and separating
+      sets are the same as those of the edge-by-edge search, which is kept for
+      "orig", budgets, and `checkpoint_every` with `n_jobs=1`
+    """
+
+    def __init__(
+        self,
+        ci_test: Any,
+        variant: str = "stable",
+        max_cond_vars: int = None,
+        significance_level: float = 0.01,
+        n_jobs: int = 1,
+        screening: bool = True,
+        block_size: int = 1024,
+        time_budget: float = None,
+        max_tests: int = None,
+        checkpoint: str = None,
+        checkpoint_every: int = None,
+        batched: bool = True,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        ci_test: Any
+            CI test object with `variables` and `test(x, y, z) -> (statistic, p_value)`
+
+        variant: str, default: "stable"
+            "orig", "stable", or "parallel"
+
+        max_cond_vars: int, default: None
+            maximum size of conditioning sets (if None, number of variables is used)
+
+        significance_level: float, default: 0.01
+            x and y are regarded as independent given z when p-value >= significance_level
+
+        n_jobs: int, default: 1
+            number of worker processes (-1 means all CPUs). \
+            ignored for "orig", which is sequential by definition
+
+        screening: bool, default: True
+            if True, all pairs are tested marginally at once before the conditional \
+            search (`ci_test` should have `marginal_pvalues(x, y)`)
+
+        block_size: int, default: 1024
+            number of variables in one block of the screening
+
+        time_budget: float, default: None
+            seconds after which each `run` stops (if None, unlimited)
+
+        max_tests: int, default: None
+            maximum number of CI tests of each `run`, excluding the screening
+            (if None, unlimited)
+
+        checkpoint: str, default: None
+            path of the checkpoint file written during `run` (if None, not written)
+
+        checkpoint_every: int, default: None
+            number of tests between checkpoints within a level
+            (if None, checkpoints are written only between levels)
+
+        batched: bool, default: True
+            if True, tests sharing a conditioning set are run at once by
+            `ci_test.conditional_pvalues` (if available)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(variant, str, "variant")
+        valchecker(
+            variant in ("orig", "stable", "parallel"),
+            f"variant should be 'orig', 'stable', or 'parallel', got {variant}",
+        )
+        n_vars = len(ci_test.variables)
+        if max_cond_vars is not None:
+            typechecker(max_cond_vars, int, "max_cond_vars")
+        typechecker(significance_level, float, "significance_level")
+        typechecker(n_jobs, int, "n_jobs")
+        valchecker(n_jobs > 0 or n_jobs == -1, "n_jobs should be positive or -1")
+        typechecker(screening, bool, "screening")
+        valchecker(
+            not screening or hasattr(ci_test, "marginal_pvalues"),
+            "ci_test should have marginal_pvalues for screening",
+        )
+        typechecker(block_size, int, "block_size")
+        valchecker(block_size > 0, "block_size should be a positive integer")
+        if time_budget is not None:
+            typechecker(time_budget, (int, float), "time_budget")
+            valchecker(time_budget >= 0, "time_budget should be non-negative")
+        if max_tests is not None:
+            typechecker(max_tests, int, "max_tests")
+            valchecker(max_tests >= 0, "max_tests should be a non-negative integer")
+        if checkpoint is not None:
+            typechecker(checkpoint, str, "checkpoint")
+        if checkpoint_every is not None:
+            typechecker(checkpoint_every, int, "checkpoint_every")
+            valchecker(checkpoint_every > 0, "checkpoint_every should be positive")
+        typechecker(batched, bool, "batched")
+        self.ci_test = ci_test
+        self.variant = variant
+        self.max_cond_vars = n_vars if max_cond_vars is None else max_cond_vars
+        self.significance_level = significance_level
+        self.n_jobs = n_jobs
+        self.adjacency = ~np.eye(n_vars, dtype=bool)
+        self.separating_sets = {}
+        self.level = 0
+        self.n_tests = 0
+        self.screening = screening
+        self.block_size = block_size
+        self.candidates = None
+        self.time_budget = time_budget
+        self.max_tests = max_tests
+        self.completed_level = -1
+        self.stopped_by = None
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.batched = batched
+        self._limit = None
+        self._deadline = None
+        self._pointer = None
+        self._pending = 0
+        self.stats = EstimateStats()
+        self._worker_cache_counts = {}
+        pass
+
+    def _remove(self, x: int, y: int, z: Tuple[int]) -> None:
+        self.adjacency[x, y] = self.adjacency[y, x] = False
+        self.separating_sets[frozenset((x, y))] = tuple(z)
+
+    def _screen(self) -> None:
+        self.candidates = marginal_screen(
+            self.ci_test, self.significance_level, self.block_size
+        )
+        self.adjacency &= self.candidates
+        n_vars = len(self.candidates)
+        self.n_tests += n_vars * (n_vars - 1) // 2
+
+    def _remaining(self) -> int:
+        return None if self._limit is None else max(self._limit - self.n_tests, 0)
+
+    def _save(self, level: int, position: int = 0, start: np.ndarray = None) -> None:
+        self._pointer = (level, position, start)
+        self._pending = 0
+        if self.checkpoint is not None:
+            self.save_checkpoint(self.checkpoint)
+
+    def _tick(self, n_tests: int, level: int, position: int, start: np.ndarray) -> None:
+        self._pending += n_tests
+        if self.checkpoint_every is not None and self._pending >= self.checkpoint_every:
+            self._save(level, position, start)
+
+    def _search_level(
+        self,
+        level: int,
+        pool: SharedMemoryPool = None,
+        mask: np.ndarray = None,
+        position: int = 0,
+        start: np.ndarray = None,
+    ) -> bool:
+        start = self.adjacency.copy() if start is None else start
+        neighbors = self.adjacency if self.variant == "orig" else start
+        targets = start if mask is None else start & mask
+        edges = np.argwhere(np.triu(targets, 1)).tolist()
+        if pool is not None:
+            batch = len(edges) if self.checkpoint_every is None else 64 * pool.n_jobs
+            while position < len(edges):
+                removed, n_tests = pool.search(
+                    edges[slice(position, position + batch)],
+                    neighbors,
+                    level,
+                    self.significance_level,
+                    self._remaining(),
+                    self._deadline,
+                    self._batchable(level),
+                )
+                self.n_tests += n_tests
+                for x, y, z in removed:
+                    self._remove(x, y, z)
+                if pool.interrupted:
+                    self._save(level, position, start)
+                    return False
+                position = min(position + batch, len(edges))
+                self._tick(n_tests, level, position, start)
+            return True
+        if self._batchable(level) and self.checkpoint_every is None:
+            removed, n_tests = _find_separating_sets(
+                self.ci_test,
+                edges[position:],
+                neighbors,
+                level,
+                self.significance_level,
+            )
+            self.n_tests += n_tests
+            for x, y, z in removed:
+                self._remove(x, y, z)
+            return True
+        for k in range(position, len(edges)):
+            x, y = edges[k]
+            z, n_tests, complete = _find_separating_set(
+                self.ci_test,
+                x,
+                y,
+                neighbors,
+                level,
+                self.significance_level,
+                self._remaining(),
+                self._deadline,
+            )
+            self.n_tests += n_tests
+            if z is not None:
+                self._remove(x, y, z)
+            if not complete:
+                self._save(level, k, start)
+                return False
+            self._tick(n_tests, level, k + 1, start)
+        return True
+
+    def _batchable(self, level: int) -> bool:
+        return (
+            self.batched
+            and level > 0
+            and self.variant != "orig"
+            and hasattr(self.ci_test, "conditional_pvalues")
+            and self._limit is None
+            and self._deadline is None
+        )
+
+    def run(self, mask: np.ndarray = None) -> "SkeletonSearch":
+        """
+        Parameters
+        ----------
+        mask: numpy.ndarray, default: None
+            DxD boolean matrix of the edges to be tested (if None, all edges are
+            tested); the other edges stay as they are but still serve as neighbors
+
+        Returns
+        -------
+        self: grnet.engines.SkeletonSearch
+            the search itself (results are saved as attributes)
+        """
+        self.stats = EstimateStats()
+        with self.stats.measure():
+            self._run(mask)
+        return self
+
+    @contextmanager
+    def _record(
+        self, stage: str, level: int, pool: SharedMemoryPool = None
+    ) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        n_tests, n_edges = self.n_tests, int(self.adjacency.sum())
+        worker = 0.0 if pool is None else pool.cpu_time
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            worker = 0.0 if pool is None else pool.cpu_time - worker
+            capacity = 0.0 if pool is None else pool.n_jobs * wall
+            self.stats._add_workers(worker, capacity)
+            self.stats.add_level(
+                stage,
+                level,
+                self.n_tests - n_tests,
+                wall,
+                time.process_time() - cpu + worker,
+                (n_edges - int(self.adjacency.sum())) // 2,
+                worker / capacity if capacity > 0 else None,
+            )
+
+    def _run(self, mask: np.ndarray = None, stage: str = "search") -> None:
+        pool = (
+            SharedMemoryPool(self.ci_test, n_jobs=self.n_jobs)
+            if self.n_jobs != 1 and self.variant != "orig"
+            else None
+        )
+        cache = self.cache_info()
+        try:
+            if self._pointer is None:
+                if self.screening and self.candidates is None:
+                    with self._record("screening", 0):
+                        self._screen()
+                level, position, start = 0 if self.candidates is None else 1, 0, None
+                self.completed_level = level - 1
+                self._save(level)
+            else:
+                level, position, start = self._pointer
+            self.stopped_by = None
+            self._limit = (
+                None if self.max_tests is None else self.n_tests + self.max_tests
+            )
+            self._deadline = (
+                None if self.time_budget is None else time.time() + self.time_budget
+            )
+            while level <= self.max_cond_vars and (
+                position > 0 or np.any(self.adjacency.sum(axis=1) >= level)
+            ):
+                self.level = level
+                with self._record(stage, level, pool):
+                    complete = self._search_level(level, pool, mask, position, start)
+                if not complete:
+                    self.stopped_by = (
+                        "max_tests" if self._remaining() == 0 else "time_budget"
+                    )
+                    break
+                self.completed_level = level
+                level, position, start = level + 1, 0, None
+                self._save(level)
+        finally:
+            self._pointer = None
+            _flush_results(self.ci_test)
+            if pool is not None:
+                pool.close()
+                for k, v in pool.cache_counts.items():
+                    self._worker_cache_counts[k] = (
+                        self._worker_cache_counts.get(k, 0) + v
+                    )
+            if len(cache) > 0:
+                after = self.cache_info()
+                self.stats._add_cache(
+                    after["hits"] - cache["hits"], after["misses"] - cache["misses"]
+                )
+
+    def refit(self) -> "SkeletonSearch":
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        self: grnet.engines.SkeletonSearch
+            the search itself (results are saved as attributes)
+        """
+        for key, z in list(self.separating_sets.items()):
+            x, y = sorted(key)
+            self.n_tests += 1
+            if not self.ci_test.test(x, y, z)[1] >= self.significance_level:
+                self.adjacency[x, y] = self.adjacency[y, x] = True
+                del self.separating_sets[key]
+        if self.candidates is not None:
+            # pairs dropped by the previous screening are screened again
+            self.adjacency |= ~self.candidates & ~np.eye(
+                len(self.adjacency), dtype=bool
+            )
+            self.candidates = None
+        return self.run()
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            path of the checkpoint file (overwritten atomically)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(path, str, "path")
+        level, position, start = (
+            (self.completed_level + 1, 0, None)
+            if self._pointer is None
+            else self._pointer
+        )
+        n_vars = len(self.adjacency)
+        keys = [sorted(k) for k in self.separating_sets]
+        sets = list(self.separating_sets.values())
+        arrays = {
+            "variables": np.asarray(self.ci_test.variables, dtype=str),
+            "adjacency": np.packbits(self.adjacency),
+            "candidates": (
+                np.packbits(self.candidates)
+                if self.candidates is not None
+                else np.zeros(0, np.uint8)
+            ),
+            "start": (
+                np.packbits(start) if start is not None else np.zeros(0, np.uint8)
+            ),
+            "pairs": np.array(keys, dtype=np.int64).reshape(-1, 2),
+            "lengths": np.array([len(z) for z in sets], dtype=np.int64),
+            "sets": np.array([v for z in sets for v in z], dtype=np.int64),
+            "pointer": np.array(
+                [n_vars, level, position, self.completed_level, self.n_tests]
+            ),
+            "variant": np.array(self.variant),
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def load_checkpoint(self, path: str) -> "SkeletonSearch":
+        """
+        Parameters
+        ----------
+        path: str
+            path of a checkpoint file written by `self.save_checkpoint`
+
+        Returns
+        -------
+        self: grnet.engines.SkeletonSearch
+            the search itself, whose next `run` continues from the checkpoint
+        """
+        typechecker(path, str, "path")
+        valchecker(os.path.isfile(path), f"checkpoint not found: {path}")
+        with np.load(path) as f:
+            arrays = dict(f)
+        n_vars, level, position, completed_level, n_tests = (
+            int(v) for v in arrays["pointer"]
+        )
+        valchecker(
+            np.array_equal(
+                arrays["variables"], np.asarray(self.ci_test.variables, dtype=str)
+            ),
+            "variables of the checkpoint should be the same as those of ci_test",
+        )
+        valchecker(
+            str(arrays["variant"]) == self.variant,
+            f"variant of the checkpoint is {arrays['variant']}, not {self.variant}",
+        )
+
+        def unpack(bits: np.ndarray) -> np.ndarray:
+            if len(bits) == 0:
+                return None
+            return (
+                np.unpackbits(bits, count=n_vars * n_vars)
+                .reshape(n_vars, n_vars)
+                .astype(bool)
+            )
+
+        self.adjacency = unpack(arrays["adjacency"])
+        self.candidates = unpack(arrays["candidates"])
+        ends = np.cumsum(arrays["lengths"])
+        self.separating_sets = {
+            frozenset(int(v) for v in pair): tuple(
+                int(v) for v in arrays["sets"][slice(end - n, end)]
+            )
+            for pair, n, end in zip(arrays["pairs"], arrays["lengths"], ends)
+        }
+        self.level = level
+        self.completed_level = completed_level
+        self.n_tests = n_tests
+        self._pointer = (level, position, unpack(arrays["start"]))
+        return self
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        cache information: Dict[str, int]
+            `ci_test.cache_info()` with hits and misses of worker processes added
+            (empty if `ci_test` has no cache)
+        """
+        if not hasattr(self.ci_test, "cache_info"):
+            return {}
+        info = self.ci_test.cache_info()
+        for k, v in self._worker_cache_counts.items():
+            info[k] += v
+        return info
+
+    def sparse_adjacency(self) -> csr_matrix:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        adjacency: scipy.sparse.csr_matrix
+            symmetric DxD matrix of 0 or 1 (rows and columns follow `ci_test.variables`)
+        """
+        return csr_matrix(self.adjacency, dtype=np.int8)
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        edges: List[Tuple[str, str]]
+            each undirected edge appears once as (former variable, latter variable)
+        """
+        names = self.ci_test.variables
+        return [
+            (names[x], names[y])
+            for x, y in np.argwhere(np.triu(self.adjacency, 1)).tolist()
+        ]
+
+    def skeleton(self) -> Tuple[nx.Graph, Dict[FrozenSet[str], Tuple[str]]]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (skeleton, separating_sets): Tuple[networkx.Graph, Dict[FrozenSet[str], Tuple[str]]]
+            skeleton and separating sets labeled with variable names
+            (same format as pgmpy.estimators.PC.build_skeleton; separating sets
+            default to the empty set for pairs dropped by the screening)
+        """
+        names = self.ci_test.variables
+        graph = nx.Graph()
+        graph.add_nodes_from(names)
+        graph.add_edges_from(self.edges())
+        separating_sets = {
+            frozenset(names[v] for v in k): tuple(names[v] for v in z)
+            for k, z in self.separating_sets.items()
+        }
+        if self.candidates is not None:
+            separating_sets = defaultdict(tuple, separating_sets)
+        return graph, separating_sets
+
+
+def orient_skeleton(
+    search: SkeletonSearch, return_type: str = "dag"
+) -> Union[DAG, PDAG, Tuple[nx.Graph, Dict[FrozenSet[str], Tuple[str]]]]:
+    """
+    function to orient the result of `grnet.engines.SkeletonSearch` with pgmpy
+
+    Parameters
+    ----------
+    search: grnet.engines.SkeletonSearch
+        adjacency search that has already been run
+
+    return_type: str, default: "dag"
+        "dag", "pdag", "cpdag", or "skeleton" (same as pgmpy.estimators.PC.estimate)
+
+    Returns
+    -------
+    Estimated model: Union[pgmpy.base.DAG, pgmpy.base.PDAG, Tuple[networkx.Graph, dict]]
+        the same type of output as pgmpy.estimators.PC.estimate; a DAG keeps every
+        edge of the skeleton (pgmpy's `PDAG.to_dag` drops the edges that it cannot
+        orient without a new v-structure, and they are oriented along a
+        topological order of the remaining DAG instead)
+    """
+    typechecker(search, SkeletonSearch, "search")
+    typechecker(return_type, str, "return_type")
+    return_type = return_type.lower()
+    valchecker(
+        return_type in ("dag", "pdag", "cpdag", "skeleton"),
+        f"return_type should be 'dag', 'pdag', 'cpdag', or 'skeleton', got {return_type}",
+    )
+    skel, separating_sets = search.skeleton()
+    if return_type == "skeleton":
+        return skel, separating_sets
+    pdag = PGMPYPC.orient_colliders(skel, separating_sets)
+    pdag = PGMPYPC.apply_orientation_rules(pdag)
+    pdag = PGMPYPC.apply_orientation_rules(pdag, apply_r4=True)
+    pdag.add_nodes_from(set(search.ci_test.variables) - set(pdag.nodes()))
+    if return_type in ("pdag", "cpdag"):
+        return pdag
+    dag = pdag.to_dag()
+    # pgmpy drops edges of PDAGs without a consistent extension; they are oriented
+    # along a topological order of the DAG, so that no cycle is introduced
+    order = {v: k for k, v in enumerate(nx.topological_sort(dag))}
+    for u, v in skel.edges():
+        if not dag.has_edge(u, v) and not dag.has_edge(v, u):
+            dag.add_edge(*sorted((u, v), key=order.get))
+    return dag
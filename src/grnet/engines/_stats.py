@@ -0,0 +1,313 @@
+"""
+statistics of an estimation (CI tests, time, memory, caches, and workers)
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover (Windows)
+    resource = None
+
+LEVEL_KEYS = [
+    "stage",
+    "level",
+    "n_tests",
+    "wall_time",
+    "cpu_time",
+    "edges_removed",
+    "worker_utilization",
+]
+
+
+def _peak_memory() -> int:
+    """
+    peak resident set size in bytes of this process and its finished workers
+    (None if the platform does not report it)
+    """
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    return scale * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+class EstimateStats:
+    """
+    statistics of an estimation (CI tests, time, memory, caches, and workers)
+
+    Methods
+    -------
+    __init__(
+        self
+    ) -> None:
+        initialize empty statistics
+
+    measure(
+        self
+    ) -> ContextManager:
+        add wall and CPU time of the block to the totals and update peak memory
+
+    add_level(
+        self,
+        stage: str,
+        level: int,
+        n_tests: int,
+        wall_time: float,
+        cpu_time: float,
+        edges_removed: int,
+        worker_utilization: float
+    ) -> None:
+        append the statistics of one level
+
+    merge(
+        self,
+        other: grnet.engines.EstimateStats,
+        stage: str
+    ) -> None:
+        add the levels and cache counts of another estimation (e.g., a block)
+
+    to_dict(
+        self
+    ) -> Dict[str, Any]:
+        totals and levels as a dict
+
+    to_frame(
+        self
+    ) -> pandas.DataFrame:
+        levels as a DataFrame (one row per stage and level)
+
+    Attributes
+    ----------
+    levels: List[Dict[str, Any]]
+        {"stage", "level", "n_tests", "wall_time", "cpu_time", "edges_removed",
+        "worker_utilization"} of each level; stage is "screening" (marginal tests
+        of all pairs), "search", "blocks" (summed over blocks), "boundary", or
+        "mutual_information" (pairs left out of a Chow-Liu tree, without CI tests)
+
+    wall_time: float
+        seconds elapsed in `measure`
+
+    cpu_time: float
+        CPU seconds of this process in `measure` and of its workers
+
+    peak_memory: int
+        peak resident set size in bytes of the process and its workers
+        (None if the platform does not report it)
+
+    cache_hits: int
+        number of cache hits of the CI test (None if it has no cache)
+
+    cache_misses: int
+        number of cache misses of the CI test (None if it has no cache)
+
+    n_tests: int
+        number of CI tests over all levels
+
+    cache_hit_rate: float
+        `cache_hits / (cache_hits + cache_misses)` (None without lookups)
+
+    worker_utilization: float
+        CPU time of workers divided by their number and the wall time of the
+        levels searched in parallel (None if no worker was used)
+
+    Notes
+    -----
+    * `wall_time` and `cpu_time` of a level are measured in the main process,
+      and `cpu_time` includes the CPU time of the workers for the level
+    * a worker utilization far below 1 means that workers waited for tasks
+      (e.g., levels with a few edges) and `n_jobs` can be reduced
+    """
+
+    def __init__(self) -> None:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.levels = []
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = None
+        self.cache_hits = None
+        self.cache_misses = None
+        self._worker_time = 0.0
+        self._worker_capacity = 0.0
+        pass
+
+    @contextmanager
+    def measure(self) -> Iterator["EstimateStats"]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        context: ContextManager
+            context manager yielding the statistics themselves
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield self
+        finally:
+            self.wall_time += time.perf_counter() - wall
+            self.cpu_time += time.process_time() - cpu
+            self.peak_memory = _peak_memory()
+
+    def add_level(
+        self,
+        stage: str,
+        level: int,
+        n_tests: int,
+        wall_time: float,
+        cpu_time: float,
+        edges_removed: int,
+        worker_utilization: float = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        stage: str
+            "screening", "search", "blocks", "boundary", or "mutual_information"
+
+        level: int
+            size of conditioning sets
+
+        n_tests: int
+            number of CI tests of the level
+
+        wall_time: float
+            seconds elapsed in the level
+
+        cpu_time: float
+            CPU seconds of the level (including workers)
+
+        edges_removed: int
+            number of edges removed in the level
+
+        worker_utilization: float, default: None
+            utilization of workers in the level (None without workers)
+
+        Returns
+        -------
+        None
+        """
+        self.levels.append(
+            {
+                "stage": stage,
+                "level": level,
+                "n_tests": n_tests,
+                "wall_time": wall_time,
+                "cpu_time": cpu_time,
+                "edges_removed": edges_removed,
+                "worker_utilization": worker_utilization,
+            }
+        )
+
+    def _add_workers(self, cpu_time: float, capacity: float) -> None:
+        self.cpu_time += cpu_time
+        self._worker_time += cpu_time
+        self._worker_capacity += capacity
+
+    def _add_cache(self, hits: int, misses: int) -> None:
+        self.cache_hits = (self.cache_hits or 0) + hits
+        self.cache_misses = (self.cache_misses or 0) + misses
+
+    def merge(self, other: "EstimateStats", stage: str = None) -> None:
+        """
+        Parameters
+        ----------
+        other: grnet.engines.EstimateStats
+            statistics of another estimation whose levels are added to `self`
+
+        stage: str, default: None
+            stage of the added levels (if None, the stages of `other` are kept);
+            levels of the same stage and level are summed
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        * totals of time are not added, since `other` usually ran within
+          `self.measure` or in workers whose CPU time is counted separately
+        """
+        index = {(v["stage"], v["level"]): v for v in self.levels}
+        for row in other.levels:
+            row = {**row, "stage": row["stage"] if stage is None else stage}
+            key = (row["stage"], row["level"])
+            if key not in index:
+                index[key] = {**row, "worker_utilization": None}
+                self.levels.append(index[key])
+                continue
+            for k in ("n_tests", "wall_time", "cpu_time", "edges_removed"):
+                index[key][k] += row[k]
+        if other.cache_hits is not None:
+            self._add_cache(other.cache_hits, other.cache_misses)
+
+    @property
+    def n_tests(self) -> int:
+        return sum(v["n_tests"] for v in self.levels)
+
+    @property
+    def cache_hit_rate(self) -> float:
+        if not self.cache_hits and not self.cache_misses:
+            return None
+        return self.cache_hits / (self.cache_hits + self.cache_misses)
+
+    @property
+    def worker_utilization(self) -> float:
+        if self._worker_capacity == 0:
+            return None
+        return self._worker_time / self._worker_capacity
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        stats: Dict[str, Any]
+            {"n_tests", "wall_time", "cpu_time", "peak_memory", "cache_hits",
+            "cache_misses", "cache_hit_rate", "worker_utilization", "levels"}
+            ("levels" is a list of the dicts of `self.levels`)
+        """
+        return {
+            "n_tests": self.n_tests,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hit_rate,
+            "worker_utilization": self.worker_utilization,
+            "levels": [dict(v) for v in self.levels],
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        levels: pandas.DataFrame
+            one row per stage and level with the columns of `self.levels`
+        """
+        return pd.DataFrame(self.levels, columns=LEVEL_KEYS)
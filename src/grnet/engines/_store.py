@@ -0,0 +1,81 @@
+"""
+memory-mapped files for the sufficient statistics of CI tests
+"""
+
+import os
+import tempfile
+import weakref
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from grnet.dev import typechecker, valchecker
+
+
+def _remove(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _open_store(directory: str, shape: Tuple[int], dtype: Any) -> np.memmap:
+    """
+    function to create a zero-filled array on disk instead of memory
+
+    Parameters
+    ----------
+    directory: str
+        existing directory in which a temporary .npy file is created
+
+    shape: Tuple[int]
+        shape of the array
+
+    dtype: Any
+        data type of the array
+
+    Returns
+    -------
+    array: numpy.memmap
+        writable array backed by the file; the file is removed when the array
+        (and every view of it) is garbage collected
+
+    Notes
+    -----
+    * only pages being read or written are held in memory by the OS, so that
+      statistics larger than memory (e.g., the moment matrix of 10^5 genes) can
+      be built block by block and read in small pieces by CI tests
+    * copies made by pickling (e.g., for worker processes) open the same file
+      read-only instead of copying the array (see `_dump_arrays`)
+    """
+    typechecker(directory, str, "store")
+    valchecker(
+        os.path.isdir(directory), f"store should be a directory, got {directory}"
+    )
+    fd, path = tempfile.mkstemp(suffix=".npy", dir=directory)
+    os.close(fd)
+    array = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    weakref.finalize(array, _remove, path)
+    return array
+
+
+def _dump_arrays(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    replace memory-mapped arrays of a pickled state with their file names
+    """
+    return {
+        k: ("memmap", v.filename) if isinstance(v, np.memmap) else v
+        for k, v in state.items()
+    }
+
+
+def _load_arrays(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    open the file names left by `_dump_arrays` as read-only memory-mapped arrays
+    """
+    return {
+        k: (
+            np.load(v[1], mmap_mode="r")
+            if isinstance(v, tuple) and len(v) == 2 and v[0] == "memmap"
+            else v
+        )
+        for k, v in state.items()
+    }
@@ -0,0 +1,171 @@
+"""
+core budget shared by worker processes and BLAS threads of grnet
+"""
+
+import inspect
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from joblib import parallel_backend
+
+from grnet.dev import typechecker, valchecker
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover (installed with scikit-learn)
+    threadpool_limits = None
+
+# environment variables read by BLAS and OpenMP runtimes of new processes
+THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_BUDGET = {"n_cores": None, "blas_threads": None, "limiter": None}
+
+
+def get_thread_budget() -> Dict[str, int]:
+    """
+    function to get the current core budget
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    budget: Dict[str, int]
+        {"n_cores": int, "blas_threads": int}; cores default to all CPUs,
+        and BLAS threads of this process default to the cores
+    """
+    n_cores = _BUDGET["n_cores"] or os.cpu_count() or 1
+    blas_threads = min(_BUDGET["blas_threads"] or n_cores, n_cores)
+    return {"n_cores": n_cores, "blas_threads": blas_threads}
+
+
+def set_thread_budget(n_cores: int = None, blas_threads: int = None) -> None:
+    """
+    function to set the core budget of this process (and of workers started later)
+
+    Parameters
+    ----------
+    n_cores: int, default: None
+        number of cores shared by all parallel work of grnet
+        (if None, all CPUs)
+
+    blas_threads: int, default: None
+        maximum number of BLAS/OpenMP threads of this process (if None, `n_cores`)
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    * `n_jobs=-1` of grnet means `n_cores` worker processes, and each of `w`
+      workers gets `n_cores // w` cores (at least 1) as its own budget, i.e.,
+      for its BLAS threads and nested parallelism (e.g., PC of each cell class
+      in `grnet.clusters.estimate_by_group`), so that nested levels never run
+      more than `n_cores` threads in total; explicit `n_jobs` is kept as it is
+    * BLAS threads are limited by threadpoolctl (if installed) and by the
+      environment variables of the workers, and joblib workers of pgmpy
+      (engine="pgmpy") get the same share through `inner_max_num_threads`
+    * `grnet.engines.thread_budget` sets the budget within a with statement
+    """
+    for value, name in [(n_cores, "n_cores"), (blas_threads, "blas_threads")]:
+        if value is not None:
+            typechecker(value, int, name)
+            valchecker(value > 0, f"{name} should be a positive integer")
+    if _BUDGET["limiter"] is not None:
+        _BUDGET["limiter"].restore_original_limits()
+    _BUDGET.update(n_cores=n_cores, blas_threads=blas_threads, limiter=None)
+    if threadpool_limits is not None and not (n_cores is None and blas_threads is None):
+        _BUDGET["limiter"] = threadpool_limits(get_thread_budget()["blas_threads"])
+
+
+@contextmanager
+def thread_budget(n_cores: int = None, blas_threads: int = None) -> Iterator[None]:
+    """
+    context manager to set the core budget within a with statement
+
+    Parameters
+    ----------
+    n_cores: int, default: None
+        number of cores shared by all parallel work of grnet (if None, all CPUs)
+
+    blas_threads: int, default: None
+        maximum number of BLAS/OpenMP threads of this process
+        (if None, `n_cores`)
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pandas as pd
+    >>> from grnet.engines import thread_budget
+    >>> from grnet.models import PC
+    >>> data = pd.DataFrame(np.random.default_rng(0).normal(size=(60, 4)))
+    >>> with thread_budget(n_cores=4):
+    ...     PC(data).estimate(engine="native", n_jobs=-1)
+
+    References
+    ----------
+    * grnet.engines.set_thread_budget
+    """
+    previous = (_BUDGET["n_cores"], _BUDGET["blas_threads"])
+    set_thread_budget(n_cores, blas_threads)
+    try:
+        yield
+    finally:
+        set_thread_budget(*previous)
+
+
+def _n_workers(n_jobs: int) -> int:
+    return get_thread_budget()["n_cores"] if n_jobs == -1 else n_jobs
+
+
+def _worker_budget(n_workers: int) -> Dict[str, int]:
+    """
+    budget of each of n_workers processes sharing the cores of this process
+    """
+    budget = get_thread_budget()
+    n_cores = max(1, budget["n_cores"] // max(n_workers, 1))
+    return {"n_cores": n_cores, "blas_threads": min(budget["blas_threads"], n_cores)}
+
+
+def _nested_kwargs(method: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    kwargs of `method` run in a worker process (n_jobs=1 unless specified,
+    if `method` takes n_jobs), to avoid nested worker processes
+    """
+    if "n_jobs" in inspect.signature(method).parameters:
+        return {"n_jobs": 1, **kwargs}
+    return kwargs
+
+
+def _enter_worker(budget: Dict[str, int]) -> None:
+    """
+    function to apply the budget of a worker process in its initializer
+    """
+    for name in THREAD_VARIABLES:
+        os.environ[name] = str(budget["blas_threads"])
+    set_thread_budget(**budget)
+
+
+@contextmanager
+def _joblib_budget(n_jobs: int) -> Iterator[int]:
+    """
+    context manager of joblib (e.g., pgmpy) yielding the number of workers
+    """
+    n_workers = _n_workers(n_jobs)
+    inner = _worker_budget(n_workers)["blas_threads"]
+    with parallel_backend("loky", inner_max_num_threads=inner):
+        yield n_workers
@@ -7,6 +7,21 @@ import pandas as pd
 
 from grnet.abstract import Estimator
 from grnet.dev import is_grn_matrix, typechecker
+from grnet.engines import BinaryMatrix
+
+
+def _coverage(model: Estimator, genes: pd.Index) -> pd.Series:
+    """
+    fraction of samples in which each gene is detected, from the packed bits
+    of `model.binary` if available (e.g., grnet.models.BinPC), otherwise from
+    the rows of `model.data` used by the model (`model.rows` if given)
+    """
+    if isinstance(getattr(model, "binary", None), BinaryMatrix):
+        return model.coverage()[genes]
+    data = model.data.loc[:, genes]
+    if model.rows is not None:
+        data = data.iloc[model.rows]
+    return (data != 0).sum() / data.shape[0]
 
 
 def whqpm(subjective: Estimator, objective: Estimator) -> float:
@@ -27,15 +42,13 @@ def whqpm(subjective: Estimator, objective: Estimator) -> float:
     typechecker(subjective, Estimator, "subjective")
     typechecker(objective, Estimator, "objective")
     s_grn = subjective.get_matrix()
-    s_rawdata = subjective.data
     o_grn = objective.get_matrix()
-    o_rawdata = objective.data
     is_grn_matrix(s_grn)
     is_grn_matrix(o_grn)
     s = s_grn.loc[s_grn.index, s_grn.index]
     o = o_grn.loc[s.index, s.columns]
-    s_diag = (s_rawdata.loc[:, s.index] != 0).sum() / s_rawdata.shape[0]
-    o_diag = (o_rawdata.loc[:, s.index] != 0).sum() / o_rawdata.shape[0]
+    s_diag = _coverage(subjective, s.index)
+    o_diag = _coverage(objective, s.index)
     diag_min = pd.concat([s_diag, o_diag], axis=1).min(axis=1)
     s_other = s.values - np.eye(s.shape[0])
     o_other = o.values - np.eye(o.shape[0])
@@ -1,9 +1,17 @@
 from ._bin_pc import BinPC
+from ._chow_liu import ChowLiu
+from ._ensemble import BootstrapEnsemble
+from ._glasso import GraphicalLasso
+from ._mmpc import MMPC
 from ._pc import PC
 from ._pretrained import PretrainedModel
 
 __all__ = [
     "BinPC",
+    "BootstrapEnsemble",
+    "ChowLiu",
+    "GraphicalLasso",
+    "MMPC",
     "PC",
     "PretrainedModel",
 ]
@@ -2,15 +2,60 @@
 pgmpy wrapper class for PC algorithm
 """
 
+from typing import List, Union
+
+import anndata as ad
 import numpy as np
 import pandas as pd
 from pgmpy.estimators import PC as PGMPYPC
+from scipy import sparse
 
 from grnet.abstract import Estimator
 from grnet.dev import typechecker
+from grnet.engines import (
+    BinaryMatrix,
+    ContingencyTest,
+    EstimateStats,
+    SkeletonSearch,
+)
+from grnet.engines._threads import _joblib_budget
+
+from ._native_pc import _NativePC
+
+
+class _BinaryEstimator(Estimator):
+    """
+    Estimator whose data are binarized (`data != 0`) into a bit-packed BinaryMatrix
+    """
+
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        rows: np.ndarray = None,
+    ) -> None:
+        super().__init__(data, n, random_state, copy, genes, rows=rows)
+        self.binary = BinaryMatrix(self.data, rows=self.rows)
+        pass
+
+    def coverage(self) -> pd.Series:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        coverage: pandas.Series
+            fraction of samples in which each gene is detected (from `self.binary`)
+        """
+        return self.binary.coverage()
 
 
-class BinPC(Estimator):
+class BinPC(_NativePC, _BinaryEstimator):
     """
     pgmpy wrapper class for PC algorithm with DOR-based binarization
 
@@ -18,9 +63,12 @@ class BinPC(Estimator):
     -------
     __init__(
         self,
-        data: pandas.DataFrame,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray],
         n: int,
-        random_state: int
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        rows: numpy.ndarray
     ) -> None:
         initialize attributes
 
@@ -32,11 +80,43 @@ class BinPC(Estimator):
         return_type: str,
         significance_level: float,
         n_jobs: int,
-        show_progress: bool
+        show_progress: bool,
+        engine: str,
+        cache_bytes: int,
+        max_block_size: int,
+        screening: bool,
+        store: str,
+        block_size: int,
+        time_budget: float,
+        max_tests: int,
+        checkpoint: str,
+        checkpoint_every: int,
+        resume_from: str,
+        permutations: int,
+        result_cache: str
     ) -> None:
         estimate network and save edges (a list of tuples) as self.edges by PC algorithm
         actual implementation of PC algorithm is a wrapper of pgmpy.estimators.PC
         default values are altered from the original codes for some arguments to adjust for GRNs
+        if engine="native", the adjacency search is run by grnet.engines instead
+        if max_block_size is specified, blocks of genes are searched separately and merged
+        if return_type="skeleton", orientation is skipped and self.adjacency is saved
+        if store is specified, statistics of the native engine are memory-mapped files
+        if time_budget or max_tests is specified, the search stops when it is used up
+        if checkpoint is specified, the search is saved to the file and resumed by resume_from
+        if permutations is specified, p-values of the native engine are calibrated by permutations
+        if result_cache is specified, CI test results are stored in the file and reused by later calls
+
+    partial_fit(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+    ) -> None:
+        append new samples and update edges from the previous result (engine="native")
+
+    coverage(
+        self
+    ) -> pandas.Series:
+        fraction of samples in which each gene is detected
 
     get_matrix(
         self
@@ -47,28 +127,70 @@ class BinPC(Estimator):
     ----------
     data: pandas.core.frame.DataFrame
         input data or resampled data
-        (data will be resampled if `n` is specified in `self.__init__`)
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True)
+
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
 
-    model: pgmpy.estimators.PC.PC
+    model: Union[pgmpy.estimators.PC.PC, grnet.engines.SkeletonSearch, grnet.engines.PartitionedSearch]
         model information (for debugging)
 
     edges: List[tuple]
         information of edges are saved as a list of tuples
         after `self.estimate` was run
 
+    adjacency: scipy.sparse.csr_matrix
+        symmetric DxD matrix of 0 or 1 whose rows and columns follow `self.data.columns`
+        after `self.estimate(return_type="skeleton")` was run (None for other types)
+
+    candidates: scipy.sparse.csr_matrix
+        symmetric DxD matrix of 0 or 1 of marginally dependent pairs, i.e., the
+        candidate graph pruned before the conditional search
+        after `self.estimate(engine="native")` was run (None without screening)
+
+    completed_level: int
+        the last level of the adjacency search whose edges were all searched
+        after `self.estimate(engine="native")` was run (None for engine="pgmpy")
+
+    stopped_by: str
+        "time_budget" or "max_tests" if the adjacency search was cut by the budget,
+        and None if it finished (the skeleton is exact up to `completed_level`)
+
+    estimate_stats: grnet.engines.EstimateStats
+        statistics of the last `self.estimate` or `self.partial_fit`; levels are
+        recorded by engine="native" (only the totals for engine="pgmpy")
+
+    cache_info: Dict[str, int]
+        hits, misses, entries, and bytes of the contingency-table cache
+        after `self.estimate` was run (None unless engine="native")
+
+    binary: grnet.engines.BinaryMatrix
+        bit-packed `data != 0` of the (resampled) rows with per-gene counts,
+        built once at construction and shared by both engines, `coverage`, and
+        `grnet.evaluations.whqpm` (extended by `self.partial_fit`)
+
     References
     ----------
     * pgmpy.estimators.PC: https://pgmpy.org/structure_estimator/pc.html?highlight=pc
     """
 
     def __init__(
-        self, data: pd.DataFrame, n: int = None, random_state: int = 0
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        rows: np.ndarray = None,
     ) -> None:
         """
         Parameters
         ----------
-        data: pandas.DataFrame
-            NxD matrix (N: number of samples, D: number of genes) of data
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            NxD matrix (N: number of samples, D: number of genes) of data;
+            AnnData (possibly backed) and sparse matrices are kept sparse
 
         n: int, default: None
             positive integer for resampling (for n > N, N will be used instead)
@@ -77,13 +199,37 @@ class BinPC(Estimator):
         random_state: int, default: 0
             random seed for random sampling
 
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows` \
+            (the native engine reads the rows without copying `data`)
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class);
+            only the indices are kept as `self.rows` (see `grnet.abstract.Estimator`)
+
         Returns
         -------
         None
         """
-        super().__init__(data, n, random_state)
+        super().__init__(data, n, random_state, copy, genes, rows=rows)
         pass
 
+    def coverage(self) -> pd.Series:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        coverage: pandas.Series
+            fraction of samples in which each gene is detected (from `self.binary`)
+        """
+        return super().coverage()
+
     def estimate(
         self,
         variant: str = "stable",
@@ -93,17 +239,89 @@ class BinPC(Estimator):
         significance_level: float = 0.01,
         n_jobs: int = -1,
         show_progress: bool = False,
+        engine: str = "pgmpy",
+        cache_bytes: int = 2**28,
+        max_block_size: int = None,
+        screening: bool = True,
+        store: str = None,
+        block_size: int = 1024,
+        time_budget: float = None,
+        max_tests: int = None,
+        checkpoint: str = None,
+        checkpoint_every: int = None,
+        resume_from: str = None,
+        permutations: int = None,
+        result_cache: str = None,
     ) -> None:
         """
         Parameters
         ----------
-        variant: str, default: "stable",
+        variant: str, default: "stable"
+            "orig", "stable", or "parallel". for engine="native", "stable" and \
+            "parallel" are PC-stable (neighbors are fixed at the beginning of each \
+            level), i.e., the skeleton of "parallel" of pgmpy; pgmpy's own "stable" \
+            draws conditioning sets from the updated graph as "orig" does, so that \
+            the skeletons of the two engines can differ for "stable"
         ci_test: str, default: "chi_square",
         max_cond_vars: int, default: None,
-        return_type: str, default: "dag",
+        return_type: str, default: "dag"
+            "dag", "pdag", "cpdag", or "skeleton". "skeleton" stops after the \
+            adjacency search and saves undirected edges and `self.adjacency` \
+            (no orientation or DAG construction)
         significance_level: float, default: 0.01,
-        n_jobs: int, default: -1,
-        show_progress: bool, default: False
+        n_jobs: int, default: -1
+            number of workers (-1 means the cores of `grnet.engines.get_thread_budget`, \
+            which are split between workers and their BLAS threads)
+        show_progress: bool, default: False,
+        engine: str, default: "pgmpy"
+            "pgmpy" or "native". "native" packs the binarized data into bits and \
+            counts contingency tables with bitwise AND and popcount (`show_progress` \
+            is ignored, and workers of `n_jobs` read the bits from shared memory). \
+            `ci_test` should be "chi_square" or "g_sq" for the native engine \
+            (same skeleton as "pgmpy" except for `variant`="stable"); \
+            if several separating sets exist, the native engine picks another one \
+            than pgmpy, so that directed edges (and the edges that pgmpy drops from \
+            a DAG without a consistent extension) can differ; a DAG of the native \
+            engine keeps every edge of the skeleton (see grnet.engines.orient_skeleton)
+        cache_bytes: int, default: 2**28
+            memory ceiling of the LRU cache of contingency tables (native engine only)
+        max_block_size: int, default: None
+            if specified, genes are split into overlapping blocks of at most \
+            `max_block_size` marginally dependent genes, which are searched in \
+            parallel and merged (grnet.engines.PartitionedSearch, native engine only)
+        screening: bool, default: True
+            if True, level 0 is replaced with a blocked vectorized test of all pairs \
+            and the pruned candidate graph is saved as `self.candidates` \
+            (native engine only; always True with `max_block_size`)
+        store: str, default: None
+            directory in which the packed bits are written as a memory-mapped file, \
+            for data whose statistics do not fit in memory (native engine only)
+        block_size: int, default: 1024
+            number of genes in one block of the screening (native engine only)
+        time_budget: float, default: None
+            seconds after which the adjacency search stops and keeps the current \
+            skeleton (native engine only; see `self.completed_level`)
+        max_tests: int, default: None
+            maximum number of CI tests of the adjacency search, excluding the \
+            screening (native engine only; see `self.completed_level`)
+        checkpoint: str, default: None
+            file to which the adjacency, separating sets, and position of the \
+            search are written after each level (native engine without `max_block_size`)
+        checkpoint_every: int, default: None
+            number of CI tests between checkpoints within a level \
+            (if None, only after each level)
+        resume_from: str, default: None
+            checkpoint file of an interrupted search with the same data and \
+            arguments, from which the adjacency search continues
+        permutations: int, default: None
+            maximum number of permutations of each CI test, whose p-value is then \
+            the fraction of permuted statistics at least as large as the observed one \
+            (native engine only; see `grnet.engines.ContingencyTest`)
+        result_cache: str, default: None
+            SQLite file in which the results of CI tests are stored, so that later \
+            calls with the same data and CI test (e.g., with another \
+            `significance_level` or `max_cond_vars`) reuse them instead of testing \
+            again (native engine only; see `grnet.engines.ResultStore`)
 
         Returns
         -------
@@ -117,19 +335,100 @@ class BinPC(Estimator):
         if max_cond_vars is not None:
             typechecker(max_cond_vars, int, "max_cond_vars")
         max_cond_vars = self.data.shape[1] if max_cond_vars is None else max_cond_vars
-        self.model = PGMPYPC(data=(self.data != 0).astype(int))
-        model = self.model.estimate(
-            variant=variant,
-            ci_test=ci_test,
-            max_cond_vars=max_cond_vars,
-            return_type=return_type,
-            significance_level=significance_level,
-            n_jobs=n_jobs,
-            show_progress=show_progress,
+        self._check_engine(
+            engine,
+            max_block_size,
+            store,
+            time_budget,
+            max_tests,
+            checkpoint,
+            resume_from,
+            permutations,
+            result_cache,
         )
-        self.edges = list(model.edges)
+        typechecker(return_type, str, "return_type")
+        if engine == "native":
+            self._run_native(
+                ci_test=ContingencyTest(
+                    self.binary,
+                    method=ci_test,
+                    cache_bytes=cache_bytes,
+                    store=store,
+                    permutations=permutations,
+                    significance_level=significance_level,
+                    result_cache=result_cache,
+                ),
+                return_type=return_type,
+                max_block_size=max_block_size,
+                screening=screening,
+                block_size=block_size,
+                checkpoint=checkpoint,
+                checkpoint_every=checkpoint_every,
+                time_budget=time_budget,
+                max_tests=max_tests,
+                resume_from=resume_from,
+                variant=variant,
+                max_cond_vars=max_cond_vars,
+                significance_level=significance_level,
+                n_jobs=n_jobs,
+            )
+            return None
+        self.model = PGMPYPC(data=self.binary.to_frame())
+        self.estimate_stats = EstimateStats()
+        with self.estimate_stats.measure(), _joblib_budget(n_jobs) as n_workers:
+            model = self.model.estimate(
+                variant=variant,
+                ci_test=ci_test,
+                max_cond_vars=max_cond_vars,
+                return_type=return_type,
+                significance_level=significance_level,
+                n_jobs=n_workers,
+                show_progress=show_progress,
+            )
+        self.cache_info = None
+        self._save_pgmpy_result(model, return_type)
         pass
 
+    def partial_fit(
+        self, data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            MxD matrix of new samples with the same columns as `self.data`
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        * if the last `self.estimate` used engine="native", new samples are appended
+          to the packed bits of grnet.engines.ContingencyTest (contingency tables
+          are recounted lazily), and the adjacency search is resumed from the
+          previous skeleton by `grnet.engines.SkeletonSearch.refit`
+        * otherwise, new samples are only appended to `self.data` and `self.binary`
+          (run `self.estimate` again to update edges)
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        n_rows = self.binary.n_samples
+        super().partial_fit(data)
+        new = BinaryMatrix(self.data.iloc[n_rows:])
+        self.binary.update(new)
+        if isinstance(getattr(self, "model", None), SkeletonSearch):
+            self.model.ci_test.update(new)
+            self.model.refit()
+            self._save_native_result()
+        pass
+
+    def _save_native_result(self) -> None:
+        super()._save_native_result()
+        self.cache_info = self.model.cache_info()
+
     def get_matrix(self) -> pd.DataFrame:
         """
         Parameters
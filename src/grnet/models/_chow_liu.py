@@ -0,0 +1,229 @@
+"""
+Chow-Liu tree of binarized data from vectorized mutual information
+"""
+
+import time
+from typing import List, Union
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import minimum_spanning_tree
+
+from grnet.dev import typechecker, valchecker
+from grnet.engines import ContingencyTest, EstimateStats
+
+from ._bin_pc import _BinaryEstimator
+
+
+class ChowLiu(_BinaryEstimator):
+    """
+    Chow-Liu tree of binarized data from vectorized mutual information
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray],
+        n: int,
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        rows: numpy.ndarray
+    ) -> None:
+        initialize attributes and pack `data != 0` into bits
+
+    estimate(
+        self,
+        significance_level: float,
+        ci_test: str,
+        block_size: int
+    ) -> None:
+        save the maximum spanning tree of the mutual information as self.edges
+
+    coverage(
+        self
+    ) -> pandas.Series:
+        fraction of samples in which each gene is detected
+
+    get_matrix(
+        self
+    ) -> pandas.core.frame.DataFrame:
+        export network information as DxD matrix of 0 or 1 elements
+
+    Attributes
+    ----------
+    data: pandas.core.frame.DataFrame
+        input data or resampled data
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True)
+
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
+
+    binary: grnet.engines.BinaryMatrix
+        bit-packed `data != 0` of the (resampled) rows (same as grnet.models.BinPC)
+
+    edges: List[tuple]
+        undirected edges of the tree (or forest) after `self.estimate` was run
+
+    mutual_information: pandas.DataFrame
+        DxD matrix of the mutual information (nats) of the detection of genes
+
+    estimate_stats: grnet.engines.EstimateStats
+        time and peak memory of the last `self.estimate`, with the pairs left out
+        of the tree as its "mutual_information" level (no CI tests) and the
+        marginal tests of the tree edges as its "screening" level
+
+    Notes
+    -----
+    * the mutual information of all pairs is computed from one product of the
+      unpacked bits per block of genes (`block_size` x `block_size`), i.e.,
+      O(D^2) counts without any conditional test, and the tree is the maximum
+      spanning tree of it (Kruskal's algorithm on the negated weights)
+    * with `significance_level`, tree edges whose marginal test does not reject
+      independence are dropped, so that the result is a forest whose components
+      are modules of dependent genes (e.g., to be refined by grnet.models.PC)
+
+    References
+    ----------
+    * Chow and Liu (1968) Approximating discrete probability distributions with
+      dependence trees. IEEE Trans. Inf. Theory 14(3): 462-467
+    * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+    """
+
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        rows: np.ndarray = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            NxD matrix (N: number of samples, D: number of genes) of data,
+            non-zero elements are regarded as detected
+
+        n: int, default: None
+            positive integer for resampling (for n > N, N will be used instead)
+            if None, resampling will not be performed
+
+        random_state: int, default: 0
+            random seed for random sampling
+
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows`
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class);
+            only the indices are kept as `self.rows` (see `grnet.abstract.Estimator`)
+
+        Returns
+        -------
+        None
+        """
+        super().__init__(data, n, random_state, copy, genes, rows=rows)
+        self.mutual_information = None
+        pass
+
+    def estimate(
+        self,
+        significance_level: float = 0.01,
+        ci_test: str = "g_sq",
+        block_size: int = 1024,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        significance_level: float, default: 0.01
+            tree edges whose marginal p-value is significance_level or more are \
+            dropped (if None, the whole spanning tree is kept)
+        ci_test: str, default: "g_sq"
+            "chi_square" or "g_sq" for the marginal tests of the tree edges
+        block_size: int, default: 1024
+            number of genes in one block of the mutual information
+
+        Returns
+        -------
+        None
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        if significance_level is not None:
+            typechecker(significance_level, float, "significance_level")
+        typechecker(block_size, int, "block_size")
+        valchecker(block_size > 0, "block_size should be a positive integer")
+        columns = self.data.columns
+        n_vars = len(columns)
+        self.estimate_stats = EstimateStats()
+        with self.estimate_stats.measure():
+            wall, cpu = time.perf_counter(), time.process_time()
+            ci_test = ContingencyTest(self.binary, method=ci_test)
+            info = np.zeros((n_vars, n_vars))
+            for i in range(0, n_vars, block_size):
+                x = np.arange(i, min(i + block_size, n_vars))
+                for j in range(i, n_vars, block_size):
+                    y = np.arange(j, min(j + block_size, n_vars))
+                    block = ci_test.mutual_information(x, y)
+                    info[np.ix_(x, y)] = block
+                    info[np.ix_(y, x)] = block.T
+            np.fill_diagonal(info, 0.0)
+            # zeros are missing edges of csgraph, so ties at 0 leave a forest
+            tree = minimum_spanning_tree(sparse.csr_matrix(-info)).tocoo()
+            pairs = sorted(
+                (int(min(i, j)), int(max(i, j))) for i, j in zip(tree.row, tree.col)
+            )
+            self.estimate_stats.add_level(
+                "mutual_information",
+                0,
+                0,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                n_vars * (n_vars - 1) // 2 - len(pairs),
+            )
+            if significance_level is not None:
+                wall, cpu, n_tests = time.perf_counter(), time.process_time(), len(pairs)
+                pairs = [
+                    (i, j)
+                    for i, j in pairs
+                    if ci_test.test(i, j)[1] < significance_level
+                ]
+                self.estimate_stats.add_level(
+                    "screening",
+                    0,
+                    n_tests,
+                    time.perf_counter() - wall,
+                    time.process_time() - cpu,
+                    n_tests - len(pairs),
+                )
+        self.mutual_information = pd.DataFrame(info, index=columns, columns=columns)
+        self.edges = [(columns[i], columns[j]) for i, j in pairs]
+        pass
+
+    def get_matrix(self) -> pd.core.frame.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        GRNMatrix: pandas.core.frame.DataFrame
+            edge information of the GRN will be returned as a DxD matrix
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        return super().get_matrix()
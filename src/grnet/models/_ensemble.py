@@ -0,0 +1,331 @@
+"""
+bootstrap / stability-selection ensemble of an Estimator subclass
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from grnet.abstract import Estimator
+from grnet.dev import typechecker, valchecker
+from grnet.engines import EstimateStats
+from grnet.engines._threads import (
+    _enter_worker,
+    _n_workers,
+    _nested_kwargs,
+    _worker_budget,
+)
+
+from ._pc import PC
+
+_WORKER = {}
+
+
+def _initializer(
+    data: pd.DataFrame, model: type, kwargs: Dict[str, Any], budget: Dict[str, int]
+) -> None:
+    _enter_worker(budget)
+    _WORKER.update(data=data, model=model, kwargs=kwargs)
+
+
+def _count_edges(
+    data: pd.DataFrame,
+    model: type,
+    kwargs: Dict[str, Any],
+    seeds: List[np.random.SeedSequence],
+    n: int,
+    replace: bool,
+) -> Tuple[np.ndarray, EstimateStats]:
+    """
+    function to fit `model` on resamples of `data` and count the edges of the fits
+
+    Parameters
+    ----------
+    data: pandas.DataFrame
+        NxD matrix of the original data
+
+    model: type
+        subclass of `grnet.abstract.Estimator`
+
+    kwargs: Dict[str, Any]
+        kwargs for `model.estimate`
+
+    seeds: List[numpy.random.SeedSequence]
+        one independent seed per resample
+
+    n: int
+        number of rows of each resample
+
+    replace: bool
+        rows are drawn with replacement if True
+
+    Returns
+    -------
+    (counts, stats): Tuple[numpy.ndarray, grnet.engines.EstimateStats]
+        DxD symmetric matrix of the number of fits that include each edge,
+        and the levels of the fits summed over them (with the time of the loop)
+    """
+    columns = data.columns
+    counts = np.zeros((len(columns), len(columns)), dtype=np.int64)
+    stats = EstimateStats()
+    with stats.measure():
+        for seed in seeds:
+            counts += _count_fit(data, model, kwargs, seed, n, replace, stats)
+    return counts, stats
+
+
+def _count_fit(
+    data: pd.DataFrame,
+    model: type,
+    kwargs: Dict[str, Any],
+    seed: np.random.SeedSequence,
+    n: int,
+    replace: bool,
+    stats: EstimateStats,
+) -> np.ndarray:
+    columns = data.columns
+    found = np.zeros((len(columns), len(columns)), dtype=bool)
+    rows = np.random.default_rng(seed).choice(len(data), size=n, replace=replace)
+    fit = model(data, rows=rows)
+    fit.estimate(**kwargs)
+    if fit.estimate_stats is not None:
+        stats.merge(fit.estimate_stats)
+    if len(fit.edges) == 0:
+        return found
+    sources, targets = zip(*fit.edges)
+    i = columns.get_indexer(list(sources))
+    j = columns.get_indexer(list(targets))
+    found[i, j] = found[j, i] = True
+    return found
+
+
+def _count_edges_in_worker(
+    seeds: List[np.random.SeedSequence], n: int, replace: bool
+) -> Tuple[np.ndarray, EstimateStats]:
+    return _count_edges(
+        _WORKER["data"], _WORKER["model"], _WORKER["kwargs"], seeds, n, replace
+    )
+
+
+class BootstrapEnsemble(Estimator):
+    """
+    bootstrap / stability-selection ensemble of an Estimator subclass (e.g., PC, BinPC)
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: pandas.DataFrame,
+        estimator: type,
+        n_estimators: int,
+        n: int,
+        replace: bool,
+        random_state: int
+    ) -> None:
+        initialize attributes
+
+    estimate(
+        self,
+        threshold: float,
+        n_jobs: int,
+        **kwargs
+    ) -> None:
+        fit `estimator` on `n_estimators` resamples in parallel, save the edge frequency
+        as self.frequency and edges found in at least `threshold` of fits as self.edges
+
+    get_matrix(
+        self
+    ) -> pandas.DataFrame:
+        export the consensus network as DxD matrix of 0 or 1 elements
+
+    Attributes
+    ----------
+    data: pandas.DataFrame
+        input data (never resampled as a whole)
+
+    estimator: type
+        subclass of `grnet.abstract.Estimator` to be fitted on each resample
+
+    n_estimators: int
+        number of resamples (B)
+
+    n: int
+        number of rows of each resample
+
+    replace: bool
+        rows are drawn with replacement (bootstrap) if True,
+        and without replacement (subsampling for stability selection) otherwise
+
+    random_state: int
+        entropy of `numpy.random.SeedSequence` that spawns one seed per resample
+
+    frequency: pandas.DataFrame
+        DxD matrix of the fraction of fits that include each edge
+        (diagonal elements are 1) after `self.estimate` was run
+
+    edges: List[tuple]
+        edges whose frequency is `threshold` or more after `self.estimate` was run
+
+    estimate_stats: grnet.engines.EstimateStats
+        levels of all fits summed by stage and level, with the total time of
+        `self.estimate` and the utilization of its workers
+
+    Notes
+    -----
+    * each worker process receives the data once and keeps only row indices of
+      one resample and one DxD count matrix at a time, so that memory does not
+      grow with B; each fit is built with the rows of its resample (see `rows`
+      of `grnet.abstract.Estimator`), e.g., BinPC packs the resample only
+    * seeds are spawned from `random_state` independently of `n_jobs`,
+      so that results are reproducible for any number of workers
+    * direction of edges is ignored (same as `get_matrix`)
+
+    References
+    ----------
+    * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+    * Meinshausen and Bühlmann (2010) Stability selection. J. R. Stat. Soc. B 72(4): 417-473
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        estimator: type = PC,
+        n_estimators: int = 100,
+        n: int = None,
+        replace: bool = True,
+        random_state: int = 0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: pandas.DataFrame
+            NxD matrix (N: number of samples, D: number of genes) of data
+
+        estimator: type, default: grnet.models.PC
+            subclass of `grnet.abstract.Estimator`
+
+        n_estimators: int, default: 100
+            number of resamples
+
+        n: int, default: None
+            number of rows of each resample (for n > N, N will be used instead)
+            if None, N is used
+
+        replace: bool, default: True
+            if True, rows are drawn with replacement (bootstrap)
+
+        random_state: int, default: 0
+            random seed for resampling
+
+        Returns
+        -------
+        None
+        """
+        valchecker(
+            isinstance(estimator, type) and issubclass(estimator, Estimator),
+            f"estimator should be a subclass of grnet.abstract.Estimator, got {estimator}",
+        )
+        typechecker(n_estimators, int, "n_estimators")
+        valchecker(n_estimators > 0, "n_estimators should be a positive integer")
+        if n is not None:
+            typechecker(n, int, "n")
+            valchecker(n > 0, "n should be a positive integer")
+        typechecker(replace, bool, "replace")
+        super().__init__(data, None, random_state)
+        self.estimator = estimator
+        self.n_estimators = n_estimators
+        self.n = len(self.data) if n is None else min(n, len(self.data))
+        self.replace = replace
+        self.random_state = random_state
+        pass
+
+    def estimate(self, threshold: float = 0.5, n_jobs: int = -1, **kwargs) -> None:
+        """
+        Parameters
+        ----------
+        threshold: float, default: 0.5
+            minimum frequency of edges in the consensus network
+
+        n_jobs: int, default: -1
+            number of worker processes over resamples (-1 means the cores of
+            `grnet.engines.get_thread_budget`, which are split among the workers)
+
+        **kwargs
+            kwargs for `self.estimator.estimate` (if resamples are fitted by
+            several workers, n_jobs=1 is used unless specified, to avoid nested
+            worker processes; each worker keeps its share of the cores for BLAS)
+
+        Returns
+        -------
+        None
+        """
+        typechecker(threshold, float, "threshold")
+        valchecker(0 <= threshold <= 1, "threshold should be in [0, 1]")
+        typechecker(n_jobs, int, "n_jobs")
+        valchecker(n_jobs > 0 or n_jobs == -1, "n_jobs should be positive or -1")
+        n_jobs = _n_workers(n_jobs)
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_estimators)
+        self.estimate_stats = EstimateStats()
+        with self.estimate_stats.measure():
+            if n_jobs == 1:
+                counts, stats = _count_edges(
+                    self.data, self.estimator, kwargs, seeds, self.n, self.replace
+                )
+                self.estimate_stats.merge(stats)
+            else:
+                n_chunks = min(len(seeds), n_jobs)
+                chunks = [seeds[i::n_chunks] for i in range(n_chunks)]
+                wall, counts = time.perf_counter(), 0
+                with ProcessPoolExecutor(
+                    max_workers=n_chunks,
+                    initializer=_initializer,
+                    initargs=(
+                        self.data,
+                        self.estimator,
+                        _nested_kwargs(self.estimator.estimate, kwargs),
+                        _worker_budget(n_chunks),
+                    ),
+                ) as executor:
+                    for ret, stats in executor.map(
+                        _count_edges_in_worker,
+                        chunks,
+                        [self.n] * n_chunks,
+                        [self.replace] * n_chunks,
+                    ):
+                        counts += ret
+                        self.estimate_stats.merge(stats)
+                        self.estimate_stats._add_workers(stats.cpu_time, 0.0)
+                self.estimate_stats._add_workers(
+                    0.0, n_chunks * (time.perf_counter() - wall)
+                )
+        frequency = counts / self.n_estimators
+        np.fill_diagonal(frequency, 1)
+        self.frequency = pd.DataFrame(
+            frequency, index=self.data.columns, columns=self.data.columns
+        )
+        columns = self.data.columns
+        self.edges = [
+            (columns[i], columns[j])
+            for i, j in np.argwhere(np.triu(frequency >= threshold, 1)).tolist()
+        ]
+        pass
+
+    def get_matrix(self) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        GRNMatrix: pandas.DataFrame
+            consensus GRN as a DxD matrix (edges with frequency >= threshold)
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        return super().get_matrix()
@@ -0,0 +1,241 @@
+"""
+undirected GRN from a sparse precision matrix (graphical lasso or neighborhood selection)
+"""
+
+from typing import List, Union
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from grnet.abstract import Estimator
+from grnet.dev import typechecker, valchecker
+from grnet.engines import (
+    EstimateStats,
+    PartialCorrelationTest,
+    graphical_lasso,
+    neighborhood_selection,
+)
+
+
+class GraphicalLasso(Estimator):
+    """
+    undirected GRN from a sparse precision matrix (graphical lasso or neighborhood selection)
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray],
+        n: int,
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        rows: numpy.ndarray
+    ) -> None:
+        initialize attributes
+
+    estimate(
+        self,
+        alpha: float,
+        method: str,
+        rule: str,
+        threshold: float,
+        max_iter: int,
+        tol: float,
+        block_size: int
+    ) -> None:
+        fit a sparse precision matrix (or lasso regressions) to the correlation matrix
+        and save pairs whose strength exceeds `threshold` as self.edges
+
+    get_matrix(
+        self
+    ) -> pandas.core.frame.DataFrame:
+        export network information as DxD matrix of 0 or 1 elements
+
+    Attributes
+    ----------
+    data: pandas.core.frame.DataFrame
+        input data or resampled data
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True)
+
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
+
+    edges: List[tuple]
+        undirected edges (gene_i, gene_j) with i < j in the column order
+        after `self.estimate` was run
+
+    precision: pandas.DataFrame
+        DxD sparse precision matrix of the standardized data
+        after `self.estimate(method="glasso")` was run (None for "neighborhood")
+
+    coefficients: pandas.DataFrame
+        DxD lasso coefficients whose j-th column regresses the j-th gene on the others
+        after `self.estimate(method="neighborhood")` was run (None for "glasso")
+
+    strength: pandas.DataFrame
+        DxD symmetric matrix of edge strengths, i.e., absolute partial correlations
+        ("glasso") or the larger ("or") or smaller ("and") absolute coefficient of
+        the two regressions ("neighborhood"); diagonal elements are 0
+
+    n_iter: int
+        number of iterations of the solver
+
+    estimate_stats: grnet.engines.EstimateStats
+        time and peak memory of the last `self.estimate` (no CI tests or levels)
+
+    Notes
+    -----
+    * the correlation matrix is computed once from the moment matrix of
+      grnet.engines.PartialCorrelationTest (sparse data stay sparse, resamples
+      given by `rows` are not copied), and never depends on N afterwards
+    * the solvers only use DxD matrix products and factorizations, so that the
+      cost is polynomial in D instead of the exponential CI search of PC
+    * `alpha` is on the scale of correlations (e.g., 0.05-0.3); larger values
+      give sparser networks
+
+    References
+    ----------
+    * grnet.engines.graphical_lasso
+    * grnet.engines.neighborhood_selection
+    * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+    """
+
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        rows: np.ndarray = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            NxD matrix (N: number of samples, D: number of genes) of data;
+            AnnData (possibly backed) and sparse matrices are kept sparse
+
+        n: int, default: None
+            positive integer for resampling (for n > N, N will be used instead)
+            if None, resampling will not be performed
+
+        random_state: int, default: 0
+            random seed for random sampling
+
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows`
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class);
+            only the indices are kept as `self.rows` (see `grnet.abstract.Estimator`)
+
+        Returns
+        -------
+        None
+        """
+        super().__init__(data, n, random_state, copy, genes, rows=rows)
+        self.precision = None
+        self.coefficients = None
+        self.strength = None
+        self.n_iter = None
+        pass
+
+    def estimate(
+        self,
+        alpha: float = 0.1,
+        method: str = "glasso",
+        rule: str = "or",
+        threshold: float = 0.0,
+        max_iter: int = 100,
+        tol: float = 1e-4,
+        block_size: int = 1024,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        alpha: float, default: 0.1
+            L1 penalty (on the scale of correlations)
+        method: str, default: "glasso"
+            "glasso" (graphical lasso of the precision matrix) or "neighborhood" \
+            (lasso regression of each gene on the others, Meinshausen-Bühlmann)
+        rule: str, default: "or"
+            "or" or "and"; for method="neighborhood", an edge is kept when either \
+            or both of the two regressions select it (ignored for "glasso")
+        threshold: float, default: 0.0
+            edges whose strength (see `self.strength`) is not larger than \
+            `threshold` are dropped
+        max_iter: int, default: 100
+            maximum number of iterations of the solver
+        tol: float, default: 1e-4
+            tolerance of the relative change between iterations
+        block_size: int, default: 1024
+            number of genes in one tile of the moment matrix
+
+        Returns
+        -------
+        None
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        typechecker(method, str, "method")
+        valchecker(
+            method in ("glasso", "neighborhood"),
+            f"method should be 'glasso' or 'neighborhood', got {method}",
+        )
+        typechecker(rule, str, "rule")
+        valchecker(rule in ("or", "and"), f"rule should be 'or' or 'and', got {rule}")
+        typechecker(threshold, float, "threshold")
+        valchecker(threshold >= 0, "threshold should be non-negative")
+        columns = self.data.columns
+        self.estimate_stats = EstimateStats()
+        with self.estimate_stats.measure():
+            corr = PartialCorrelationTest(
+                self.data, rows=self.rows, block_size=block_size
+            ).correlation()
+            if method == "glasso":
+                precision, self.n_iter = graphical_lasso(corr, alpha, max_iter, tol)
+                scale = 1 / np.sqrt(np.diag(precision))
+                strength = np.abs(precision * np.outer(scale, scale))
+                self.precision = pd.DataFrame(precision, index=columns, columns=columns)
+                self.coefficients = None
+            else:
+                coef, self.n_iter = neighborhood_selection(corr, alpha, max_iter, tol)
+                pair = np.abs(coef), np.abs(coef.T)
+                strength = np.maximum(*pair) if rule == "or" else np.minimum(*pair)
+                self.precision = None
+                self.coefficients = pd.DataFrame(coef, index=columns, columns=columns)
+            np.fill_diagonal(strength, 0.0)
+        self.strength = pd.DataFrame(strength, index=columns, columns=columns)
+        self.edges = [
+            (columns[i], columns[j])
+            for i, j in np.argwhere(np.triu(strength > threshold, 1)).tolist()
+        ]
+        pass
+
+    def get_matrix(self) -> pd.core.frame.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        GRNMatrix: pandas.core.frame.DataFrame
+            edge information of the GRN will be returned as a DxD matrix
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        return super().get_matrix()
@@ -0,0 +1,217 @@
+"""
+max-min parents and children (MMPC) skeleton of binarized data
+"""
+
+from typing import List, Union
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from grnet.dev import typechecker, valchecker
+from grnet.engines import ContingencyTest, mmpc
+
+from ._bin_pc import _BinaryEstimator
+
+
+class MMPC(_BinaryEstimator):
+    """
+    max-min parents and children (MMPC) skeleton of binarized data
+
+    Methods
+    -------
+    __init__(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray],
+        n: int,
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        rows: numpy.ndarray
+    ) -> None:
+        initialize attributes and pack `data != 0` into bits
+
+    estimate(
+        self,
+        significance_level: float,
+        ci_test: str,
+        max_cond_vars: int,
+        rule: str,
+        cache_bytes: int,
+        block_size: int,
+        n_jobs: int
+    ) -> None:
+        find the parents and children of every gene and save the symmetric result as self.edges
+
+    coverage(
+        self
+    ) -> pandas.Series:
+        fraction of samples in which each gene is detected
+
+    get_matrix(
+        self
+    ) -> pandas.core.frame.DataFrame:
+        export network information as DxD matrix of 0 or 1 elements
+
+    Attributes
+    ----------
+    data: pandas.core.frame.DataFrame
+        input data or resampled data
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True)
+
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
+
+    binary: grnet.engines.BinaryMatrix
+        bit-packed `data != 0` of the (resampled) rows (same as grnet.models.BinPC)
+
+    edges: List[tuple]
+        undirected edges after `self.estimate` was run
+
+    parents_children: Dict[str, List[str]]
+        parents and children found for each gene (before the symmetry correction)
+
+    estimate_stats: grnet.engines.EstimateStats
+        CI tests, time, and rejected candidates of the screening and of each
+        size of conditioning sets (see `grnet.engines.mmpc`)
+
+    Notes
+    -----
+    * the marginal tests of all pairs are vectorized over the bits (as in the
+      screening of grnet.models.BinPC), and only marginally dependent genes are
+      searched with conditioning sets of at most `max_cond_vars` genes
+    * the search is local to each gene, so that the cost grows with the size of
+      its neighborhood rather than with D, and genes are searched in parallel
+
+    References
+    ----------
+    * Tsamardinos, Brown and Aliferis (2006) The max-min hill-climbing Bayesian
+      network structure learning algorithm. Mach. Learn. 65(1): 31-78
+    * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+    """
+
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        rows: np.ndarray = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            NxD matrix (N: number of samples, D: number of genes) of data,
+            non-zero elements are regarded as detected
+
+        n: int, default: None
+            positive integer for resampling (for n > N, N will be used instead)
+            if None, resampling will not be performed
+
+        random_state: int, default: 0
+            random seed for random sampling
+
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows`
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class);
+            only the indices are kept as `self.rows` (see `grnet.abstract.Estimator`)
+
+        Returns
+        -------
+        None
+        """
+        super().__init__(data, n, random_state, copy, genes, rows=rows)
+        self.parents_children = None
+        pass
+
+    def estimate(
+        self,
+        significance_level: float = 0.01,
+        ci_test: str = "chi_square",
+        max_cond_vars: int = 3,
+        rule: str = "and",
+        cache_bytes: int = 2**28,
+        block_size: int = 1024,
+        n_jobs: int = 1,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        significance_level: float, default: 0.01
+            x and y are regarded as independent given z when p-value >= significance_level
+        ci_test: str, default: "chi_square"
+            "chi_square" or "g_sq" (grnet.engines.ContingencyTest)
+        max_cond_vars: int, default: 3
+            maximum size of conditioning sets
+        rule: str, default: "and"
+            "and" keeps an edge when each gene is found for the other, \
+            "or" when either of them is found
+        cache_bytes: int, default: 2**28
+            memory ceiling of the cache of joint counts
+        block_size: int, default: 1024
+            number of genes in one block of the marginal screening
+        n_jobs: int, default: 1
+            number of worker processes over genes (-1 means all CPUs)
+
+        Returns
+        -------
+        None
+
+        References
+        ----------
+        * grnet.engines.mmpc
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        typechecker(rule, str, "rule")
+        valchecker(rule in ("or", "and"), f"rule should be 'or' or 'and', got {rule}")
+        columns = self.data.columns
+        ci_test = ContingencyTest(
+            self.binary, method=ci_test, cache_bytes=cache_bytes
+        )
+        parents_children, self.estimate_stats = mmpc(
+            ci_test,
+            significance_level=significance_level,
+            max_cond_vars=max_cond_vars,
+            n_jobs=n_jobs,
+            block_size=block_size,
+        )
+        found = np.zeros((len(columns), len(columns)), dtype=bool)
+        for target, pc in enumerate(parents_children):
+            found[target, pc] = True
+        adjacency = found & found.T if rule == "and" else found | found.T
+        self.parents_children = {
+            columns[i]: [columns[v] for v in pc]
+            for i, pc in enumerate(parents_children)
+        }
+        self.edges = [
+            (columns[i], columns[j])
+            for i, j in np.argwhere(np.triu(adjacency, 1)).tolist()
+        ]
+        pass
+
+    def get_matrix(self) -> pd.core.frame.DataFrame:
+        """
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        GRNMatrix: pandas.core.frame.DataFrame
+            edge information of the GRN will be returned as a DxD matrix
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        return super().get_matrix()
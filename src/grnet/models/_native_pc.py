@@ -0,0 +1,135 @@
+"""
+shared steps of PC algorithms with the pgmpy and native engines
+"""
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typechecker, valchecker
+from grnet.engines import PartitionedSearch, SkeletonSearch, orient_skeleton
+
+
+class _NativePC:
+    """
+    mixin of Estimator subclasses running PC with engine="pgmpy" or "native"
+    (subclasses build the CI test of the native engine)
+    """
+
+    def _check_engine(
+        self,
+        engine: str,
+        max_block_size: int = None,
+        store: str = None,
+        time_budget: float = None,
+        max_tests: int = None,
+        checkpoint: str = None,
+        resume_from: str = None,
+        permutations: int = None,
+        result_cache: str = None,
+    ) -> None:
+        """
+        function to check that native-only options are used with engine="native"
+        """
+        typechecker(engine, str, "engine")
+        valchecker(
+            engine in ("pgmpy", "native"),
+            f"engine should be 'pgmpy' or 'native', got {engine}",
+        )
+        if max_block_size is not None:
+            valchecker(
+                engine == "native", "max_block_size is available for engine='native'"
+            )
+        if store is not None:
+            valchecker(engine == "native", "store is available for engine='native'")
+        if time_budget is not None or max_tests is not None:
+            valchecker(
+                engine == "native",
+                "time_budget and max_tests are available for engine='native'",
+            )
+        if checkpoint is not None or resume_from is not None:
+            valchecker(
+                engine == "native" and max_block_size is None,
+                "checkpoint and resume_from are available for engine='native' "
+                "without max_block_size",
+            )
+        if permutations is not None:
+            valchecker(
+                engine == "native", "permutations is available for engine='native'"
+            )
+        if result_cache is not None:
+            valchecker(
+                engine == "native", "result_cache is available for engine='native'"
+            )
+
+    def _run_native(
+        self,
+        ci_test,
+        return_type: str,
+        max_block_size: int = None,
+        screening: bool = False,
+        block_size: int = None,
+        checkpoint: str = None,
+        checkpoint_every: int = None,
+        time_budget: float = None,
+        max_tests: int = None,
+        resume_from: str = None,
+        **kwargs,
+    ) -> None:
+        """
+        function to run SkeletonSearch (or PartitionedSearch with `max_block_size`)
+        with `ci_test` and save the result; kwargs are those of both searches
+        (variant, max_cond_vars, significance_level, and n_jobs)
+        """
+        if max_block_size is None:
+            search = SkeletonSearch
+            kwargs.update(
+                screening=screening,
+                block_size=block_size,
+                checkpoint=checkpoint,
+                checkpoint_every=checkpoint_every,
+            )
+        else:
+            search = PartitionedSearch
+            kwargs.update(max_block_size=max_block_size)
+        self.model = search(
+            ci_test=ci_test, time_budget=time_budget, max_tests=max_tests, **kwargs
+        )
+        if resume_from is not None:
+            self.model.load_checkpoint(resume_from)
+        self.model.run()
+        self._return_type = return_type
+        self._save_native_result()
+
+    def _save_native_result(self) -> None:
+        self.estimate_stats = self.model.stats
+        self.completed_level = self.model.completed_level
+        self.stopped_by = self.model.stopped_by
+        self.candidates = (
+            None
+            if self.model.candidates is None
+            else csr_matrix(self.model.candidates, dtype=np.int8)
+        )
+        if self._return_type.lower() == "skeleton":
+            self.adjacency = self.model.sparse_adjacency()
+            self.edges = self.model.edges()
+            return None
+        model = orient_skeleton(self.model, return_type=self._return_type)
+        self.adjacency = None
+        self.edges = list(model.edges)
+
+    def _save_pgmpy_result(self, model, return_type: str) -> None:
+        self.candidates = None
+        self.completed_level = None
+        self.stopped_by = None
+        if return_type.lower() == "skeleton":
+            model = model[0]
+            self.adjacency = csr_matrix(
+                nx.to_scipy_sparse_array(
+                    model, nodelist=self.data.columns, dtype=np.int8
+                )
+            )
+            self.edges = list(model.edges)
+            return None
+        self.adjacency = None
+        self.edges = list(model.edges)
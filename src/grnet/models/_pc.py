@@ -2,14 +2,28 @@
 pgmpy wrapper class for PC algorithm
 """
 
+from typing import List, Union
+
+import anndata as ad
+import numpy as np
 import pandas as pd
 from pgmpy.estimators import PC as PGMPYPC
+from scipy import sparse
 
 from grnet.abstract import Estimator
 from grnet.dev import typechecker
+from grnet.engines import (
+    EstimateStats,
+    PartialCorrelationTest,
+    SkeletonSearch,
+    rank_transform,
+)
+from grnet.engines._threads import _joblib_budget
+
+from ._native_pc import _NativePC
 
 
-class PC(Estimator):
+class PC(_NativePC, Estimator):
     """
     pgmpy wrapper class for PC algorithm
 
@@ -17,11 +31,15 @@ class PC(Estimator):
     -------
     __init__(
         self,
-        data: pandas.core.frame.DataFrame,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray],
         n: int,
-        random_state: int
+        random_state: int,
+        copy: bool,
+        genes: List[str],
+        dtype: str,
+        rows: numpy.ndarray
     ) -> None:
-        initialize attributes
+        initialize attributes (and cast data into dtype)
 
     estimate(
         self,
@@ -31,11 +49,39 @@ class PC(Estimator):
         return_type: str,
         significance_level: float,
         n_jobs: int,
-        show_progress: bool
+        show_progress: bool,
+        engine: str,
+        max_block_size: int,
+        screening: bool,
+        store: str,
+        block_size: int,
+        time_budget: float,
+        max_tests: int,
+        checkpoint: str,
+        checkpoint_every: int,
+        resume_from: str,
+        permutations: int,
+        result_cache: str
     ) -> None:
         estimate network and save edges (a list of tuples) as self.edges by PC algorithm
         actual implementation of PC algorithm is a wrapper of pgmpy.estimators.PC
         default values are altered from the original codes for some arguments to adjust for GRNs
+        if engine="native", the adjacency search is run by grnet.engines instead
+        if max_block_size is specified, blocks of genes are searched separately and merged
+        if return_type="skeleton", orientation is skipped and self.adjacency is saved
+        if store is specified, statistics of the native engine are memory-mapped files
+        if time_budget or max_tests is specified, the search stops when it is used up
+        if checkpoint is specified, the search is saved to the file and resumed by resume_from
+        if permutations is specified, p-values of the native engine are calibrated by permutations
+        if result_cache is specified, CI test results are stored in the file and reused by later calls
+        if self.dtype is "float32", the native engine computes moments in float32
+        if ci_test="spearman", genes are ranked once (self.ranks) and tested by partial correlation
+
+    partial_fit(
+        self,
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+    ) -> None:
+        append new samples and update edges from the previous result (engine="native")
 
     get_matrix(
         self
@@ -46,28 +92,70 @@ class PC(Estimator):
     ----------
     data: pandas.core.frame.DataFrame
         input data or resampled data
-        (data will be resampled if `n` is specified in `self.__init__`)
+        (data will be resampled if `n` is specified in `self.__init__` with copy=True)
 
-    model: pgmpy.estimators.PC.PC
+    rows: numpy.ndarray
+        positional indices of the rows of `self.data` used by the model
+        (None unless `rows` is given or `n` is specified with copy=False
+        in `self.__init__`)
+
+    dtype: str
+        "float32" or "float64" into which `self.data` was cast (None if kept as it is)
+
+    ranks: pandas.DataFrame
+        column-wise ranks of the (resampled) data (see `grnet.engines.rank_transform`)
+        after `self.estimate(ci_test="spearman")` was run, reused by later calls
+        until `self.partial_fit` adds samples (None before)
+
+    model: Union[pgmpy.estimators.PC.PC, grnet.engines.SkeletonSearch, grnet.engines.PartitionedSearch]
         model information (for debugging)
 
     edges: List[tuple]
         information of edges are saved as a list of tuples
         after `self.estimate` was run
 
+    adjacency: scipy.sparse.csr_matrix
+        symmetric DxD matrix of 0 or 1 whose rows and columns follow `self.data.columns`
+        after `self.estimate(return_type="skeleton")` was run (None for other types)
+
+    candidates: scipy.sparse.csr_matrix
+        symmetric DxD matrix of 0 or 1 of marginally dependent pairs, i.e., the
+        candidate graph pruned before the conditional search
+        after `self.estimate(engine="native")` was run (None without screening)
+
+    completed_level: int
+        the last level of the adjacency search whose edges were all searched
+        after `self.estimate(engine="native")` was run (None for engine="pgmpy")
+
+    stopped_by: str
+        "time_budget" or "max_tests" if the adjacency search was cut by the budget,
+        and None if it finished (the skeleton is exact up to `completed_level`)
+
+    estimate_stats: grnet.engines.EstimateStats
+        statistics of the last `self.estimate` or `self.partial_fit`; levels are
+        recorded by engine="native" (only the totals for engine="pgmpy")
+
     References
     ----------
     * pgmpy.estimators.PC: https://pgmpy.org/structure_estimator/pc.html?highlight=pc
     """
 
     def __init__(
-        self, data: pd.core.frame.DataFrame, n: int = None, random_state: int = 0
+        self,
+        data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray],
+        n: int = None,
+        random_state: int = 0,
+        copy: bool = True,
+        genes: List[str] = None,
+        dtype: str = None,
+        rows: np.ndarray = None,
     ) -> None:
         """
         Parameters
         ----------
-        data: pandas.core.frame.DataFrame
-            NxD matrix (N: number of samples, D: number of genes) of data
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            NxD matrix (N: number of samples, D: number of genes) of data;
+            AnnData (possibly backed) and sparse matrices are kept sparse
 
         n: int, default: None
             positive integer for resampling (for n > N, N will be used instead)
@@ -76,11 +164,29 @@ class PC(Estimator):
         random_state: int, default: 0
             random seed for random sampling
 
+        copy: bool, default: True
+            if False, only row indices of the resample are kept as `self.rows` \
+            (the native engine reads the rows without copying `data`)
+
+        genes: List[str], default: None
+            names of the genes (columns) when `data` is a scipy.sparse matrix
+
+        dtype: str, default: None
+            "float32" or "float64" into which `data` is cast once; with "float32", \
+            `self.data` and the dense copy of engine="pgmpy" take half the memory, \
+            and the moment matrix of engine="native" is float32 \
+            (see `grnet.engines.PartialCorrelationTest`)
+
+        rows: numpy.ndarray, default: None
+            positional indices of the rows of `data` to be used (e.g., a cell class);
+            only the indices are kept as `self.rows` (see `grnet.abstract.Estimator`)
+
         Returns
         -------
         None
         """
-        super().__init__(data, n, random_state)
+        super().__init__(data, n, random_state, copy, genes, dtype, rows)
+        self.ranks = None
         pass
 
     def estimate(
@@ -92,17 +198,92 @@ class PC(Estimator):
         significance_level: float = 0.01,
         n_jobs: int = -1,
         show_progress: bool = False,
+        engine: str = "pgmpy",
+        max_block_size: int = None,
+        screening: bool = True,
+        store: str = None,
+        block_size: int = 1024,
+        time_budget: float = None,
+        max_tests: int = None,
+        checkpoint: str = None,
+        checkpoint_every: int = None,
+        resume_from: str = None,
+        permutations: int = None,
+        result_cache: str = None,
     ) -> None:
         """
         Parameters
         ----------
-        variant: str, default: "stable",
-        ci_test: str, default: "pearsonr",
+        variant: str, default: "stable"
+            "orig", "stable", or "parallel". for engine="native", "stable" and \
+            "parallel" are PC-stable (neighbors are fixed at the beginning of each \
+            level), i.e., the skeleton of "parallel" of pgmpy; pgmpy's own "stable" \
+            draws conditioning sets from the updated graph as "orig" does, so that \
+            the skeletons of the two engines can differ for "stable"
+        ci_test: str, default: "pearsonr"
+            CI test of pgmpy.estimators.CITests, or "spearman" for Spearman's \
+            partial correlation, i.e., the partial correlation of ranks \
+            (`self.ranks`), which are computed once and then reused by every test \
+            ("pearsonr" of the centered ranks for both engines; the native engine \
+            keeps the ranks of sparse data sparse and centers their moments instead)
         max_cond_vars: int, default: None,
-        return_type: str, default: "dag",
+        return_type: str, default: "dag"
+            "dag", "pdag", "cpdag", or "skeleton". "skeleton" stops after the \
+            adjacency search and saves undirected edges and `self.adjacency` \
+            (no orientation or DAG construction)
         significance_level: float, default: 0.01,
-        n_jobs: int, default: -1,
-        show_progress: bool, default: False
+        n_jobs: int, default: -1
+            number of workers (-1 means the cores of `grnet.engines.get_thread_budget`, \
+            which are split between workers and their BLAS threads)
+        show_progress: bool, default: False,
+        engine: str, default: "pgmpy"
+            "pgmpy" or "native". "native" computes the moment matrix once and runs \
+            every CI test as a Schur complement of it (`show_progress` is ignored, \
+            and workers of `n_jobs` read the moment matrix from shared memory). \
+            `ci_test` should be "pearsonr" (same skeleton as "pgmpy" except for \
+            `variant`="stable"), "fisher_z", or "spearman" for the native engine; \
+            if several separating sets exist, the native engine picks another one \
+            than pgmpy, so that directed edges (and the edges that pgmpy drops from \
+            a DAG without a consistent extension) can differ; a DAG of the native \
+            engine keeps every edge of the skeleton (see grnet.engines.orient_skeleton)
+        max_block_size: int, default: None
+            if specified, genes are split into overlapping blocks of at most \
+            `max_block_size` marginally dependent genes, which are searched in \
+            parallel and merged (grnet.engines.PartitionedSearch, native engine only)
+        screening: bool, default: True
+            if True, level 0 is replaced with a blocked vectorized test of all pairs \
+            and the pruned candidate graph is saved as `self.candidates` \
+            (native engine only; always True with `max_block_size`)
+        store: str, default: None
+            directory in which the moment matrix is written as a memory-mapped file, \
+            for data whose statistics do not fit in memory (native engine only)
+        block_size: int, default: 1024
+            number of genes in one tile of the moment matrix and one block of the \
+            screening (native engine only)
+        time_budget: float, default: None
+            seconds after which the adjacency search stops and keeps the current \
+            skeleton (native engine only; see `self.completed_level`)
+        max_tests: int, default: None
+            maximum number of CI tests of the adjacency search, excluding the \
+            screening (native engine only; see `self.completed_level`)
+        checkpoint: str, default: None
+            file to which the adjacency, separating sets, and position of the \
+            search are written after each level (native engine without `max_block_size`)
+        checkpoint_every: int, default: None
+            number of CI tests between checkpoints within a level \
+            (if None, only after each level)
+        resume_from: str, default: None
+            checkpoint file of an interrupted search with the same data and \
+            arguments, from which the adjacency search continues
+        permutations: int, default: None
+            maximum number of permutations of each CI test, whose p-value is then \
+            the fraction of permuted statistics at least as large as the observed one \
+            (native engine only; see `grnet.engines.PartialCorrelationTest`)
+        result_cache: str, default: None
+            SQLite file in which the results of CI tests are stored, so that later \
+            calls with the same data and CI test (e.g., with another \
+            `significance_level` or `max_cond_vars`) reuse them instead of testing \
+            again (native engine only; see `grnet.engines.ResultStore`)
 
         Returns
         -------
@@ -116,19 +297,125 @@ class PC(Estimator):
         if max_cond_vars is not None:
             typechecker(max_cond_vars, int, "max_cond_vars")
         max_cond_vars = self.data.shape[1] if max_cond_vars is None else max_cond_vars
-        self.model = PGMPYPC(data=self.data)
-        model = self.model.estimate(
-            variant=variant,
-            ci_test=ci_test,
-            max_cond_vars=max_cond_vars,
-            return_type=return_type,
-            significance_level=significance_level,
-            n_jobs=n_jobs,
-            show_progress=show_progress,
+        self._check_engine(
+            engine,
+            max_block_size,
+            store,
+            time_budget,
+            max_tests,
+            checkpoint,
+            resume_from,
+            permutations,
+            result_cache,
         )
-        self.edges = list(model.edges)
+        typechecker(return_type, str, "return_type")
+        if engine == "native":
+            self._native_args = (
+                ci_test,
+                {
+                    "store": store,
+                    "block_size": block_size,
+                    "permutations": permutations,
+                    "significance_level": significance_level,
+                    "result_cache": result_cache,
+                },
+            )
+            self._run_native(
+                ci_test=self._native_test(*self._native_args),
+                return_type=return_type,
+                max_block_size=max_block_size,
+                screening=screening,
+                block_size=block_size,
+                checkpoint=checkpoint,
+                checkpoint_every=checkpoint_every,
+                time_budget=time_budget,
+                max_tests=max_tests,
+                resume_from=resume_from,
+                variant=variant,
+                max_cond_vars=max_cond_vars,
+                significance_level=significance_level,
+                n_jobs=n_jobs,
+            )
+            return None
+        if ci_test == "spearman":
+            # regressions without intercept of centered ranks are those with intercept
+            ranks = self._ranked()
+            if any(isinstance(v, pd.SparseDtype) for v in ranks.dtypes):
+                ranks = ranks.sparse.to_dense()
+            self.model = PGMPYPC(data=ranks - ranks.mean())
+            ci_test = "pearsonr"
+        else:
+            self.model = PGMPYPC(data=self._gather(dense=True))
+        self.estimate_stats = EstimateStats()
+        with self.estimate_stats.measure(), _joblib_budget(n_jobs) as n_workers:
+            model = self.model.estimate(
+                variant=variant,
+                ci_test=ci_test,
+                max_cond_vars=max_cond_vars,
+                return_type=return_type,
+                significance_level=significance_level,
+                n_jobs=n_workers,
+                show_progress=show_progress,
+            )
+        self._save_pgmpy_result(model, return_type)
         pass
 
+    def partial_fit(
+        self, data: Union[pd.DataFrame, ad.AnnData, sparse.spmatrix, sparse.sparray]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        data: Union[pandas.DataFrame, anndata.AnnData, scipy.sparse.spmatrix, scipy.sparse.sparray]
+            MxD matrix of new samples with the same columns as `self.data`
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        * if the last `self.estimate` used engine="native", new samples are added
+          to the moment matrix of grnet.engines.PartialCorrelationTest, and the
+          adjacency search is resumed from the previous skeleton by
+          `grnet.engines.SkeletonSearch.refit` (with ci_test="spearman", all
+          samples are ranked again and the moment matrix is recomputed)
+        * otherwise, new samples are only appended to `self.data`
+          (run `self.estimate` again to update edges)
+
+        References
+        ----------
+        * grnet.abstract.Estimator: https://grnet.readthedocs.io/en/latest/grnet.abstract.html#grnet.abstract.Estimator
+        """
+        n_rows = self.data.shape[0] if self.rows is None else len(self.rows)
+        super().partial_fit(data)
+        self.ranks = None
+        if isinstance(getattr(self, "model", None), SkeletonSearch):
+            if self._native_args[0] == "spearman":
+                # new samples change the ranks of all samples
+                self.model.ci_test = self._native_test(*self._native_args)
+            else:
+                self.model.ci_test.update(self.data.iloc[n_rows:])
+            self.model.refit()
+            self._save_native_result()
+        pass
+
+    def _ranked(self) -> pd.DataFrame:
+        if self.ranks is None:
+            dtype = "float32" if self.dtype == "float32" else "float64"
+            self.ranks = rank_transform(self.data, self.rows, dtype)
+        return self.ranks
+
+    def _native_test(self, ci_test: str, kwargs: dict) -> PartialCorrelationTest:
+        dtype = "float32" if self.dtype == "float32" else "float64"
+        if ci_test == "spearman":
+            return PartialCorrelationTest(
+                self._ranked(), method="pearsonr", dtype=dtype, center=True, **kwargs
+            )
+        return PartialCorrelationTest(
+            self.data, method=ci_test, rows=self.rows, dtype=dtype, **kwargs
+        )
+
     def get_matrix(self) -> pd.core.frame.DataFrame:
         """
         Parameters
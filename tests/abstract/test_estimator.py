@@ -2,9 +2,11 @@
 Test module for Estimator
 """
 
+import anndata as ad
 import numpy as np
 import pandas as pd
 import pytest
+from scipy import sparse
 
 from grnet.abstract import Estimator
 from grnet.dev import typemolds
@@ -160,3 +162,66 @@ def test_get_matrix_correct_return_rows_cols():
         assert np.all(
             ret.columns == cols
         ), f"test failed for {i}-th input: got {ret} while required cols name is {cols}"
+
+
+def test_init_copy_free_resampling():
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(15, 4)))
+    for i in range(5):
+        state = np.random.get_state()[1].copy()
+        copied = Estimator(data=df, n=7, random_state=i)
+        shared = Estimator(data=df, n=7, random_state=i, copy=False)
+        assert np.all(np.random.get_state()[1] == state), f"global RNG changed for {i}"
+        assert copied.rows is None and shared.data is df
+        assert np.all(df.iloc[shared.rows] == copied.data), f"test failed for {i}"
+        assert np.all(df.sample(n=7, random_state=i) == copied.data)
+
+
+def test_init_rows():
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(15, 4)))
+    rows = np.arange(3, 12)
+    model = Estimator(data=df, rows=rows)
+    assert model.data is df and model.rows is rows
+    with pytest.raises(AssertionError):
+        Estimator(data=df, rows=list(rows))
+    # resamples are drawn from the given rows
+    copied = Estimator(data=df, n=5, rows=rows)
+    shared = Estimator(data=df, n=5, rows=rows, copy=False)
+    assert np.all(np.isin(shared.rows, rows))
+    assert np.all(df.iloc[shared.rows] == copied.data)
+
+
+def test_init_sparse_and_anndata(tmp_path):
+    x = np.random.default_rng(0).poisson(0.5, size=(30, 4)).astype(float)
+    genes = [f"g{i}" for i in range(4)]
+    adata = ad.AnnData(sparse.csr_matrix(x))
+    adata.var_names = genes
+    adata.write_h5ad(tmp_path / "x.h5ad")
+    inputs = [
+        sparse.csr_matrix(x),
+        sparse.csc_array(x),
+        adata,
+        ad.read_h5ad(tmp_path / "x.h5ad", backed="r"),
+    ]
+    for i, v in enumerate(inputs):
+        model = Estimator(data=v, genes=None if isinstance(v, ad.AnnData) else genes)
+        assert list(model.data.columns) == genes, f"test failed for {i}-th input"
+        assert all(isinstance(t, pd.SparseDtype) for t in model.data.dtypes)
+        assert np.all(model.data.sparse.to_dense().to_numpy() == x)
+    with pytest.raises(AssertionError):
+        Estimator(data=sparse.csr_matrix(x), genes=genes[:3])
+
+
+def test_init_dtype():
+    x = np.random.default_rng(0).poisson(0.5, size=(30, 4)).astype(float)
+    for v in ["float16", "int", 32]:
+        with pytest.raises(AssertionError):
+            Estimator(data=pd.DataFrame(x), dtype=v)
+    df = pd.DataFrame(x)
+    assert Estimator(data=df).data is df
+    assert Estimator(data=df, dtype="float64").data is df
+    model = Estimator(data=df, dtype="float32")
+    assert model.dtype == "float32" and all(model.data.dtypes == np.float32)
+    model.partial_fit(df.iloc[:5])
+    assert all(model.data.dtypes == np.float32) and model.data.shape == (35, 4)
+    model = Estimator(data=sparse.csr_matrix(x), dtype="float32")
+    assert all(t == pd.SparseDtype(np.float32, 0) for t in model.data.dtypes)
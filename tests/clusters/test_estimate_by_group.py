@@ -0,0 +1,96 @@
+"""
+Test for grnet.clusters.estimate_by_group
+"""
+
+import anndata as ad
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+
+from grnet.clusters import CellClasses, estimate_by_group
+from grnet.models import PC, BinPC
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(240, 5))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(5)])
+
+
+@pytest.fixture
+def labels(df):
+    return pd.Series(np.repeat(["c2", "c0", "c1"], [40, 120, 80]), index=df.index)
+
+
+def test_invalid_value_labels(df):
+    with pytest.raises(AssertionError) as e:
+        estimate_by_group(df, ["a", "b"])
+    assert "Invalid" in f"{e.value}", f"got {e.value}"
+
+
+def test_invalid_value_model(df, labels):
+    with pytest.raises(AssertionError) as e:
+        estimate_by_group(df, labels, model=PC(df))
+    assert "Invalid" in f"{e.value}", f"got {e.value}"
+
+
+def test_correct_return(df, labels):
+    for n_jobs in [1, 2]:
+        ret = estimate_by_group(df, labels, n_jobs=n_jobs, engine="native")
+        assert isinstance(ret, CellClasses)
+        assert ret.names == {0: "c0", 1: "c1", 2: "c2"}
+        for i, name in ret.names.items():
+            expected = PC(df[(labels == name).to_numpy()])
+            expected.estimate(engine="native", n_jobs=1)
+            assert ret.models[i].data is df
+            assert np.all(
+                ret.grns[i] == expected.get_matrix()
+            ), f"test failed for {name} with n_jobs={n_jobs}"
+
+
+def test_series_aligned_to_index(df, labels):
+    ret = estimate_by_group(df, labels.iloc[::-1], model=BinPC, n_jobs=1)
+    expected = estimate_by_group(df, labels.to_numpy(), model=BinPC, n_jobs=1)
+    for i in ret.grns:
+        assert np.all(ret.grns[i] == expected.grns[i]), f"test failed for {i}"
+
+
+def test_models_built_on_cell_class(df, labels):
+    for n_jobs in [1, 2]:
+        ret = estimate_by_group(df, labels, model=BinPC, n_jobs=n_jobs)
+        for i, name in ret.names.items():
+            model = ret.models[i]
+            assert model.data is df
+            assert model.binary.n_samples == (labels == name).sum()
+            assert np.all(df.index[model.rows] == labels.index[labels == name])
+
+
+def test_sparse_and_anndata_input(df, labels):
+    expected = estimate_by_group(df, labels.to_numpy(), n_jobs=1, engine="native")
+    adata = ad.AnnData(
+        df.to_numpy(),
+        obs=pd.DataFrame(index=df.index.astype(str)),
+        var=pd.DataFrame(index=df.columns),
+    )
+    for v in [csr_matrix(df.to_numpy()), adata]:
+        ret = estimate_by_group(v, labels.to_numpy(), n_jobs=1, engine="native")
+        for i in ret.grns:
+            assert np.all(
+                ret.grns[i].to_numpy() == expected.grns[i].to_numpy()
+            ), f"test failed for {type(v).__name__}"
+
+
+def test_n_jobs_only_for_workers(df, labels, monkeypatch):
+    calls, estimate = [], PC.estimate
+
+    def recorder(self, n_jobs: int = -1, **kwargs) -> None:
+        calls.append(n_jobs)
+        estimate(self, n_jobs=n_jobs, **kwargs)
+
+    monkeypatch.setattr(PC, "estimate", recorder)
+    estimate_by_group(df, labels, n_jobs=1, engine="native")
+    assert calls == [-1] * 3
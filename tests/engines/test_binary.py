@@ -0,0 +1,71 @@
+"""
+Test module for BinaryMatrix
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typemolds
+from grnet.engines import BinaryMatrix
+
+
+@pytest.fixture
+def not_df():
+    return typemolds(pd.core.frame.DataFrame)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(2)
+    x = rng.random((131, 5)) * (rng.random((131, 5)) < 0.3)
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(5)])
+
+
+def test_init_invalid_dtype_data(not_df):
+    for i, v in enumerate(not_df):
+        with pytest.raises(AssertionError) as e:
+            BinaryMatrix(v)
+        assert f"{v}" in f"{e.value}", f"test failed for {i}-th input: {e.value}"
+
+
+def test_counts_and_coverage(df):
+    rows = np.random.default_rng(0).choice(len(df), size=200, replace=True)
+    matrix = BinaryMatrix(df, rows=rows)
+    expected = df.iloc[rows] != 0
+    assert matrix.n_samples == 200
+    assert np.all(matrix.counts == expected.sum().to_numpy())
+    assert np.allclose(matrix.coverage(), expected.mean())
+    assert np.all(matrix.coverage().index == df.columns)
+    assert np.all(matrix.to_frame().to_numpy() == expected.to_numpy())
+
+
+def test_sparse_same_as_dense(df):
+    sparse_df = pd.DataFrame.sparse.from_spmatrix(
+        csr_matrix(df.to_numpy()), columns=df.columns
+    )
+    assert np.all(BinaryMatrix(sparse_df).bits == BinaryMatrix(df).bits)
+
+
+def test_update_same_as_whole_data(df):
+    matrix = BinaryMatrix(df.iloc[:70])
+    matrix.update(df.iloc[70:100])
+    matrix.update(BinaryMatrix(df.iloc[100:]))
+    assert matrix.n_samples == len(df)
+    assert np.all(matrix.counts == BinaryMatrix(df).counts)
+    assert np.all(matrix.to_frame().to_numpy() == (df != 0).to_numpy())
+    with pytest.raises(AssertionError):
+        matrix.update(df.iloc[:, ::-1])
+
+
+def test_copy_to_store(df, tmp_path):
+    matrix = BinaryMatrix(df)
+    stored = matrix.copy(str(tmp_path))
+    assert isinstance(stored.bits, np.memmap)
+    assert np.all(stored.bits == matrix.bits)
+    restored = pickle.loads(pickle.dumps(stored))
+    assert isinstance(restored.bits, np.memmap)
+    assert np.all(restored.to_frame() == matrix.to_frame())
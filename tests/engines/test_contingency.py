@@ -0,0 +1,220 @@
+"""
+Test module for ContingencyTest
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from pgmpy.estimators.CITests import chi_square, g_sq
+
+from grnet.dev import typemolds
+from grnet.engines import ContingencyTest
+
+
+@pytest.fixture
+def not_df():
+    return typemolds(pd.core.frame.DataFrame)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    x = (rng.random((157, 7)) < 0.4).astype(int)
+    x[:, 1] |= x[:, 0] & (rng.random(157) < 0.5)
+    x[:, 2] = x[:, 1] ^ (rng.random(157) < 0.2)
+    x[:, 6] = 0
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(7)])
+
+
+@pytest.fixture
+def queries():
+    return [
+        (0, 1, ()),
+        (0, 2, (1,)),
+        (3, 4, (0, 5)),
+        (2, 5, (4, 1, 3)),
+        (6, 1, ()),
+        (6, 2, (0, 1)),
+    ]
+
+
+def test_init_invalid_dtype_data(not_df):
+    for i, v in enumerate(not_df):
+        with pytest.raises(AssertionError) as e:
+            ContingencyTest(data=v)
+        assert f"{v}" in f"{e.value}", f"test failed for {i}-th input: {e.value}"
+
+
+def test_init_invalid_value_method(df):
+    for v in ["pearsonr", "chi-square", ""]:
+        with pytest.raises(AssertionError) as e:
+            ContingencyTest(data=df, method=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_counts_correct_return(df, queries):
+    ci = ContingencyTest(2.5 * df)
+    values = df.values
+    for x, y, z in queries:
+        ret = ci.counts(x, y, z)
+        assert ret.shape == (2, 2, 2 ** len(z)), f"test failed for {(x, y, z)}"
+        strata = (values[:, list(z)] * 2 ** np.arange(len(z))).sum(axis=1)
+        for i, j, s in np.ndindex(*ret.shape):
+            expected = np.sum((values[:, x] == i) & (values[:, y] == j) & (strata == s))
+            assert (
+                ret[i, j, s] == expected
+            ), f"test failed for {(x, y, z)}: expected {expected}, got {ret[i, j, s]}"
+
+
+def test_test_consistent_with_pgmpy(df, queries):
+    for method, fun in [("chi_square", chi_square), ("g_sq", g_sq)]:
+        ci = ContingencyTest(df, method=method)
+        for x, y, z in queries:
+            names = df.columns
+            expected = fun(
+                names[x], names[y], [names[v] for v in z], data=df, boolean=False
+            )[:2]
+            ret = ci.test(x, y, z)
+            assert np.allclose(
+                ret, expected, equal_nan=True
+            ), f"test failed for {(x, y, z)} with {method}: expected {expected}, got {ret}"
+
+
+def test_cache_shared_by_variable_set(df):
+    ci = ContingencyTest(df)
+    expected = ci.counts(0, 1, (2, 3))
+    for x, y, z in [(1, 0, (3, 2)), (0, 2, (1, 3)), (3, 2, (0, 1))]:
+        ret = ci.counts(x, y, z)
+        assert ret.sum() == expected.sum(), f"test failed for {(x, y, z)}"
+    info = ci.cache_info()
+    assert info["misses"] == 1, f"expected 1 miss, got {info}"
+    assert info["hits"] == 3, f"expected 3 hits, got {info}"
+    assert np.all(ci.counts(1, 0, (2, 3)) == expected.transpose(1, 0, 2))
+
+
+def test_cache_eviction(df):
+    ci = ContingencyTest(df, cache_bytes=8 * 2**3)
+    ci.counts(0, 1, (2,))
+    ci.counts(0, 1, (3,))
+    info = ci.cache_info()
+    assert info["entries"] == 1, f"expected 1 entry, got {info}"
+    assert info["nbytes"] <= 8 * 2**3, f"cache exceeds the ceiling: {info}"
+    ci.counts(0, 1, (2,))
+    assert ci.cache_info()["misses"] == 3, f"LRU entry was not evicted: {info}"
+    ci = ContingencyTest(df, cache_bytes=0)
+    ci.counts(0, 1, ())
+    ci.counts(0, 1, ())
+    assert ci.cache_info()["entries"] == 0
+    assert ci.cache_info()["hits"] == 0
+
+
+def test_update_same_as_whole_data(df, queries):
+    ci = ContingencyTest(df.iloc[:70])
+    ci.test(0, 2, (1,))
+    ci.update(df.iloc[70:])
+    expected = ContingencyTest(df)
+    assert ci.n_samples == len(df)
+    assert ci.cache_info()["entries"] == 0
+    for x, y, z in queries:
+        assert np.all(ci.counts(x, y, z) == expected.counts(x, y, z)), f"{x}, {y}, {z}"
+    with pytest.raises(AssertionError):
+        ci.update(df.iloc[:, ::-1])
+
+
+def test_init_rows_same_as_gathered(df, queries):
+    rows = np.random.default_rng(0).choice(len(df), size=300, replace=True)
+    ci = ContingencyTest(df, rows=rows)
+    expected = ContingencyTest(df.iloc[rows])
+    assert ci.n_samples == 300
+    for x, y, z in queries:
+        assert np.all(ci.counts(x, y, z) == expected.counts(x, y, z)), f"{x}, {y}, {z}"
+
+
+def test_marginal_pvalues_same_as_test(df):
+    for method in ["chi_square", "g_sq"]:
+        ci = ContingencyTest(df, method=method)
+        x, y = np.array([0, 2, 4, 6]), np.array([1, 3, 5, 6])
+        ret = ci.marginal_pvalues(x, y)
+        for i, u in enumerate(x):
+            for j, v in enumerate(y):
+                if u != v:
+                    assert np.isclose(
+                        ret[i, j], ci.test(u, v)[1]
+                    ), f"test failed for {method}: {u}, {v}"
+
+
+def test_store_same_as_in_memory(df, queries, tmp_path):
+    ci = ContingencyTest(df.iloc[:70], store=str(tmp_path))
+    ci.update(df.iloc[70:])
+    expected = ContingencyTest(df)
+    assert isinstance(ci.bits, np.memmap)
+    restored = pickle.loads(pickle.dumps(ci))
+    assert isinstance(restored.bits, np.memmap)
+    for x, y, z in queries:
+        assert np.all(ci.counts(x, y, z) == expected.counts(x, y, z)), f"{x}, {y}, {z}"
+        assert np.all(restored.counts(x, y, z) == expected.counts(x, y, z))
+
+
+def test_mutual_information_matches_counts():
+    rng = np.random.default_rng(0)
+    x = (rng.random((300, 4)) < [0.2, 0.5, 0.7, 0.0]).astype(int)
+    x[:, 1] |= x[:, 0]
+    ci_test = ContingencyTest(pd.DataFrame(x, columns=list("abcd")))
+    idx = np.arange(4)
+    info = ci_test.mutual_information(idx, idx)
+    for i in range(4):
+        for j in set(range(4)) - {i}:
+            table = ci_test.counts(i, j)[:, :, 0] / 300
+            outer = np.outer(table.sum(axis=1), table.sum(axis=0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                expected = np.nansum(table * np.log(table / outer))
+            assert np.isclose(info[i, j], max(expected, 0)), f"test failed for {i, j}"
+    assert np.all(info[3] == 0)
+
+
+def test_permutation_pvalues_match_loop(df, queries):
+    ci = ContingencyTest(df, permutations=1000, significance_level=None)
+    rng = np.random.default_rng(0)
+    data = df.to_numpy()
+    for x, y, z in queries[:4]:
+        observed, p_value = ci.test(x, y, z)
+        assert np.allclose(ci.test(y, x, z), (observed, p_value))
+        strata = data[:, list(z)] @ (2 ** np.arange(len(z)))
+        exceed = 0
+        for _ in range(1000):
+            permuted = data.copy()
+            for s in np.unique(strata):
+                permuted[strata == s, x] = rng.permutation(data[strata == s, x])
+            table = ContingencyTest(pd.DataFrame(permuted)).counts(x, y, z)
+            exceed += ci._statistic(table)[0] >= observed - 1e-9
+        assert abs(p_value - (exceed + 1) / 1001) < 0.05, f"{x}, {y}, {z}"
+    ret = ci.marginal_pvalues(np.arange(7), np.arange(7))
+    expected = ContingencyTest(df).marginal_pvalues(np.arange(7), np.arange(7))
+    assert np.all(ret[6] == 1.0) and np.all((ret < 0.01) == (expected < 0.01))
+
+
+def test_conditional_pvalues_same_as_test(df):
+    ci_test = ContingencyTest(df)
+    x, y = np.array([0, 2, 3, 6, 4]), np.array([2, 5, 4, 2, 0])
+    for z in [(), (1,), (1, 5)]:
+        keep = [k for k in range(len(x)) if x[k] not in z and y[k] not in z]
+        expected = [ci_test.test(x[k], y[k], z)[1] for k in keep]
+        ret = ci_test.conditional_pvalues(x[keep], y[keep], z)
+        assert np.allclose(ret, expected, equal_nan=True), f"test failed for {z}"
+
+
+def test_conditional_pvalues_share_cache(df):
+    x, y = np.array([0, 3, 4]), np.array([2, 6, 0])
+    for z in [(), (1, 5)]:
+        ci_test = ContingencyTest(df)
+        expected = ContingencyTest(df)
+        ret = ci_test.conditional_pvalues(x, y, z)
+        info = ci_test.cache_info()
+        assert info["misses"] == info["entries"] == len(x) and info["hits"] == 0
+        for i, j in zip(x.tolist(), y.tolist()):
+            assert np.array_equal(ci_test.counts(j, i, z), expected.counts(j, i, z))
+        assert ci_test.cache_info()["hits"] == len(x)
+        assert np.allclose(ci_test.conditional_pvalues(x, y, z), ret, equal_nan=True)
+        assert ci_test.cache_info()["hits"] == 2 * len(x)
@@ -0,0 +1,63 @@
+"""
+Test module for SharedMemoryPool
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.engines import (
+    ContingencyTest,
+    PartialCorrelationTest,
+    SharedMemoryPool,
+    SkeletonSearch,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(300, 10))
+    for j in range(1, 10):
+        x[:, j] += 0.7 * x[:, j - 1]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(10)])
+
+
+def test_init_invalid_value_n_jobs(df):
+    for v in [0, -2]:
+        with pytest.raises(AssertionError) as e:
+            SharedMemoryPool(PartialCorrelationTest(df), n_jobs=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_search_consistent_with_serial(df):
+    for ci_test in [PartialCorrelationTest(df), ContingencyTest(df > 0)]:
+        serial = SkeletonSearch(ci_test, n_jobs=1).run()
+        parallel = SkeletonSearch(ci_test, n_jobs=2).run()
+        assert np.all(
+            serial.adjacency == parallel.adjacency
+        ), f"test failed for {type(ci_test)}"
+        assert (
+            serial.separating_sets == parallel.separating_sets
+        ), f"test failed for {type(ci_test)}"
+        assert serial.n_tests == parallel.n_tests, f"test failed for {type(ci_test)}"
+
+
+def test_worker_cache_counts(df):
+    search = SkeletonSearch(ContingencyTest(df > 0), n_jobs=2, screening=False).run()
+    info = search.cache_info()
+    assert (
+        info["hits"] + info["misses"] == search.n_tests
+    ), f"lookups in workers should be counted, got {info}"
+
+
+def test_close_releases_shared_memory(df):
+    with SharedMemoryPool(PartialCorrelationTest(df), n_jobs=1) as pool:
+        names = [shm.name for shm in pool._shm]
+        removed, n_tests = pool.search([(0, 5)], np.ones((10, 10), dtype=bool), 0, 0.01)
+    assert n_tests == 1
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
@@ -0,0 +1,252 @@
+"""
+Test module for PartialCorrelationTest
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from pgmpy.estimators.CITests import pearsonr
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typemolds
+from grnet.engines import PartialCorrelationTest
+from grnet.engines._permutation import _permutation_pvalues
+
+
+@pytest.fixture
+def not_df():
+    return typemolds(pd.core.frame.DataFrame)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(100, 6))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    return pd.DataFrame(x + 2, columns=[f"g{i}" for i in range(6)])
+
+
+@pytest.fixture
+def df_high_mean(df):
+    # raw moments of such data cancel in float32
+    return 0.2 * (df - 2) + 12
+
+
+@pytest.fixture
+def queries():
+    return [(0, 1, ()), (0, 2, ()), (0, 2, (1,)), (3, 4, (0, 5)), (2, 5, (4, 1, 3))]
+
+
+def test_init_invalid_dtype_data(not_df):
+    for i, v in enumerate(not_df):
+        with pytest.raises(AssertionError) as e:
+            PartialCorrelationTest(data=v)
+        assert f"{v}" in f"{e.value}", f"test failed for {i}-th input: {e.value}"
+
+
+def test_init_invalid_value_method(df):
+    for v in ["pearson", "chi_square", ""]:
+        with pytest.raises(AssertionError) as e:
+            PartialCorrelationTest(data=df, method=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_pearsonr_consistent_with_pgmpy(df, queries):
+    ci = PartialCorrelationTest(df)
+    for x, y, z in queries:
+        names = df.columns
+        expected = pearsonr(
+            names[x], names[y], [names[v] for v in z], data=df, boolean=False
+        )
+        ret = ci.test(x, y, z)
+        assert np.allclose(
+            ret, expected
+        ), f"test failed for {(x, y, z)}: expected {expected}, got {ret}"
+
+
+def test_centered_pearsonr_consistent_with_pgmpy(df, df_high_mean, queries):
+    for data in [df, df_high_mean]:
+        centered = data - data.mean()
+        for dtype in ["float64", "float32"]:
+            ci = PartialCorrelationTest(data, dtype=dtype, center=True)
+            for x, y, z in queries:
+                names = data.columns
+                expected = pearsonr(
+                    names[x], names[y], [names[v] for v in z], data=centered, boolean=False
+                )
+                ret = ci.test(x, y, z)
+                assert np.allclose(
+                    ret, expected, rtol=1e-4
+                ), f"test failed for {(x, y, z)} ({dtype}): expected {expected}, got {ret}"
+    # pgmpy's pearsonr regresses without intercept, so that the data are not centered
+    ret = PartialCorrelationTest(df).test(3, 4, (0, 5))
+    assert not np.allclose(ret, PartialCorrelationTest(df, center=True).test(3, 4, (0, 5)))
+
+
+def test_fisher_z_consistent_with_regression(df, queries):
+    ci = PartialCorrelationTest(df, method="fisher_z")
+    values = df.values
+    for x, y, z in queries:
+        design = np.hstack([values[:, list(z)], np.ones((len(df), 1))])
+        res = [
+            v - design @ np.linalg.lstsq(design, v, rcond=None)[0]
+            for v in (values[:, x], values[:, y])
+        ]
+        expected = np.corrcoef(*res)[0, 1]
+        coef, p_value = ci.test(x, y, z)
+        assert np.isclose(
+            coef, expected
+        ), f"test failed for {(x, y, z)}: expected {expected}, got {coef}"
+        assert 0 <= p_value <= 1, f"test failed for {(x, y, z)}: got {p_value}"
+
+
+def test_symmetry(df, queries):
+    for method in ["pearsonr", "fisher_z"]:
+        ci = PartialCorrelationTest(df, method=method)
+        for x, y, z in queries:
+            assert np.allclose(
+                ci.test(x, y, z), ci.test(y, x, z[::-1])
+            ), f"test failed for {(x, y, z)} with {method}"
+
+
+def test_update_same_as_whole_data(df, queries):
+    ci = PartialCorrelationTest(df.iloc[:40], method="fisher_z")
+    ci.test(0, 2, (1,))
+    ci.update(df.iloc[40:])
+    expected = PartialCorrelationTest(df, method="fisher_z")
+    assert ci.n_samples == len(df)
+    for x, y, z in queries:
+        assert np.allclose(ci.test(x, y, z), expected.test(x, y, z)), f"{x}, {y}, {z}"
+    with pytest.raises(AssertionError):
+        ci.update(df.iloc[:, ::-1])
+
+
+def test_init_rows_same_as_gathered(df, queries):
+    rows = np.random.default_rng(0).choice(len(df), size=150, replace=True)
+    ci = PartialCorrelationTest(df, rows=rows)
+    expected = PartialCorrelationTest(df.iloc[rows])
+    assert ci.n_samples == 150
+    assert np.allclose(ci.moments, expected.moments)
+    for x, y, z in queries:
+        assert np.allclose(ci.test(x, y, z), expected.test(x, y, z)), f"{x}, {y}, {z}"
+
+
+def test_marginal_pvalues_same_as_test(df):
+    df = df.assign(g6=1.0)
+    for method in ["pearsonr", "fisher_z"]:
+        ci = PartialCorrelationTest(df, method=method)
+        x, y = np.array([0, 2, 4, 6]), np.array([1, 3, 5, 6])
+        ret = ci.marginal_pvalues(x, y)
+        for i, u in enumerate(x):
+            for j, v in enumerate(y):
+                if u != v:
+                    assert np.allclose(
+                        ret[i, j], ci.test(u, v)[1], equal_nan=True
+                    ), f"test failed for {method}: {u}, {v}"
+
+
+def test_store_same_as_in_memory(df, queries, tmp_path):
+    rows = np.random.default_rng(0).choice(len(df), size=150, replace=True)
+    ci = PartialCorrelationTest(df, rows=rows, store=str(tmp_path), block_size=2)
+    expected = PartialCorrelationTest(df, rows=rows)
+    assert isinstance(ci.moments, np.memmap)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert np.allclose(ci.moments, expected.moments)
+    ci.update(df)
+    expected.update(df)
+    restored = pickle.loads(pickle.dumps(ci))
+    assert isinstance(restored.moments, np.memmap)
+    for x, y, z in queries:
+        assert np.allclose(ci.test(x, y, z), expected.test(x, y, z)), f"{x}, {y}, {z}"
+        assert np.allclose(restored.test(x, y, z), expected.test(x, y, z))
+    with pytest.raises(AssertionError):
+        PartialCorrelationTest(df, store=str(tmp_path / "missing"))
+
+
+def test_sparse_data_same_as_dense(df):
+    rows = np.random.default_rng(0).choice(len(df), size=150, replace=True)
+    sparse_df = pd.DataFrame.sparse.from_spmatrix(
+        csr_matrix(df.to_numpy()), columns=df.columns
+    )
+    ci = PartialCorrelationTest(sparse_df, rows=rows, block_size=4)
+    expected = PartialCorrelationTest(df, rows=rows)
+    assert np.allclose(ci.moments, expected.moments)
+
+
+def test_permutation_pvalues_close_to_asymptotic(df, queries):
+    for method in ["pearsonr", "fisher_z"]:
+        expected = PartialCorrelationTest(df, method=method)
+        ci = PartialCorrelationTest(
+            df, method=method, permutations=2000, significance_level=None
+        )
+        assert ci.values.shape == df.shape and "values" in ci.shared_arrays
+        for x, y, z in queries:
+            coef, p_value = ci.test(x, y, z)
+            assert np.isclose(coef, expected.test(x, y, z)[0])
+            assert np.allclose(ci.test(y, x, z), (coef, p_value))
+            assert abs(p_value - expected.test(x, y, z)[1]) < 0.05, f"{x}, {y}, {z}"
+        x = y = np.arange(df.shape[1])
+        ret = ci.marginal_pvalues(x, y)
+        assert np.all(np.abs(ret - expected.marginal_pvalues(x, y)) < 0.05)
+        restored = pickle.loads(pickle.dumps(ci))
+        assert restored.test(3, 4, (0, 5)) == ci.test(3, 4, (0, 5))
+
+
+def test_permutation_early_stopping(df):
+    ci = PartialCorrelationTest(df, permutations=10000)
+    assert ci.test(3, 4)[1] > 0.1
+    assert ci.test(0, 1)[1] < 0.01
+    rng = np.random.default_rng(0)
+    residuals = df.to_numpy()[:, [3, 4]] - df.to_numpy()[:, [3, 4]].mean(axis=0)
+    x, y = (residuals / np.linalg.norm(residuals, axis=0)).T
+    for level in [0.01, None]:
+        _, ret = _permutation_pvalues(
+            lambda perm: np.abs(x[perm] @ y), abs(x @ y), 100, 10000, rng, None, level
+        )
+        # a clearly independent pair stops after a few batches
+        assert ret < 10000 if level is not None else ret == 10000
+    with pytest.raises(AssertionError):
+        PartialCorrelationTest(df, permutations=0)
+
+
+def test_float32_same_decisions(df_high_mean, queries):
+    df = df_high_mean
+    with pytest.raises(AssertionError):
+        PartialCorrelationTest(df, dtype="float16")
+    for method in ["pearsonr", "fisher_z"]:
+        expected = PartialCorrelationTest(df, method=method)
+        ci = PartialCorrelationTest(df, method=method, dtype="float32")
+        assert ci.moments.dtype == np.float32
+        for x, y, z in queries:
+            coef, p_value = ci.test(x, y, z)
+            assert np.isclose(coef, expected.test(x, y, z)[0], atol=1e-4)
+            assert (p_value < 0.01) == (expected.test(x, y, z)[1] < 0.01)
+        x, y = np.array([0, 0, 3]), np.array([2, 4, 4])
+        ret = ci.conditional_pvalues(x, y, (1, 5))
+        assert np.allclose(ret, expected.conditional_pvalues(x, y, (1, 5)), atol=1e-6)
+        x = y = np.arange(df.shape[1])
+        ret = ci.marginal_pvalues(x, y)
+        assert ret.dtype == np.float64
+        assert np.allclose(ret, expected.marginal_pvalues(x, y), rtol=1e-3, atol=1e-6)
+    # p-values near the significance level are recomputed in float64,
+    # so that they only differ by the rounding of the stored moments
+    errors = []
+    p_value = expected.test(3, 4)[1]
+    for significance_level in [None, p_value]:
+        ci.significance_level = significance_level
+        errors.append(abs(ci.test(3, 4)[1] - p_value))
+    assert errors[1] < errors[0] and errors[1] < 1e-5 * p_value
+
+
+def test_conditional_pvalues_same_as_test(df):
+    for method in ["pearsonr", "fisher_z"]:
+        ci_test = PartialCorrelationTest(df, method=method)
+        x, y = np.array([0, 0, 3, 4]), np.array([2, 3, 4, 5])
+        for z in [(), (1,), (1, 2)]:
+            keep = [k for k in range(len(x)) if x[k] not in z and y[k] not in z]
+            expected = [ci_test.test(x[k], y[k], z)[1] for k in keep]
+            ret = ci_test.conditional_pvalues(x[keep], y[keep], z)
+            assert np.allclose(ret, expected), f"test failed for {method} and {z}"
@@ -0,0 +1,64 @@
+"""
+Test module for PartitionedSearch
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pgmpy.base import DAG
+
+from grnet.engines import (
+    PartialCorrelationTest,
+    PartitionedSearch,
+    SkeletonSearch,
+    orient_skeleton,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(400, 40))
+    for m in range(4):
+        for j in range(1, 10):
+            x[:, m * 10 + j] += 0.8 * x[:, m * 10 + j - 1]
+    x[:, 15] += 0.7 * x[:, 5]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(40)])
+
+
+def test_init_invalid_value_max_block_size(df):
+    for v in [0, 1, -1]:
+        with pytest.raises(AssertionError) as e:
+            PartitionedSearch(PartialCorrelationTest(df), max_block_size=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_run_correct_blocks(df):
+    search = PartitionedSearch(PartialCorrelationTest(df), max_block_size=8).run()
+    assert all(len(v) <= 8 for v in search.blocks)
+    cores = np.concatenate(search.blocks)
+    assert len(cores) == len(np.unique(cores))
+    for core, extended in zip(search.blocks, search.extended_blocks):
+        assert set(core) <= set(extended)
+    pairs = np.argwhere(np.triu(search.candidates, 1))
+    for x, y in pairs:
+        assert any(x in v and y in v for v in search.extended_blocks), f"{x}, {y}"
+
+
+def test_run_same_as_skeleton_search(df):
+    expected = SkeletonSearch(PartialCorrelationTest(df)).run()
+    for max_block_size in [8, 15, 40]:
+        for n_jobs in [1, 2]:
+            search = PartitionedSearch(
+                PartialCorrelationTest(df), max_block_size=max_block_size, n_jobs=n_jobs
+            ).run()
+            assert np.all(
+                search.adjacency == expected.adjacency
+            ), f"test failed for {max_block_size} with n_jobs={n_jobs}"
+
+
+def test_orient_skeleton(df):
+    search = PartitionedSearch(PartialCorrelationTest(df), max_block_size=8).run()
+    skel, separating_sets = search.skeleton()
+    assert separating_sets[frozenset(("g0", "g39"))] == ()
+    assert isinstance(orient_skeleton(search, "dag"), DAG)
@@ -0,0 +1,65 @@
+"""
+Test module for rank_transform
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from scipy.sparse import csr_matrix
+
+from grnet.dev import typemolds
+from grnet.engines import PartialCorrelationTest, rank_transform
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.poisson(0.7, size=(120, 5)).astype(float)
+    x[:, 1] += x[:, 0]
+    x[:, 3] -= rng.poisson(0.5, size=120)
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(5)])
+
+
+def test_invalid_dtype_data():
+    for i, v in enumerate(typemolds(pd.core.frame.DataFrame)):
+        with pytest.raises(AssertionError) as e:
+            rank_transform(v)
+        assert f"{v}" in f"{e.value}", f"test failed for {i}-th input: {e.value}"
+
+
+def test_invalid_value_dtype(df):
+    with pytest.raises(AssertionError) as e:
+        rank_transform(df, dtype="int64")
+    assert "Invalid" in f"{e.value}", f"test failed: {e.value}"
+
+
+def test_dense_ranks(df):
+    ranks = rank_transform(df)
+    expected = stats.rankdata(df.to_numpy(), axis=0) - (len(df) + 1) / 2
+    assert np.allclose(ranks.to_numpy(), expected)
+    assert ranks.columns.equals(df.columns)
+
+
+def test_sparse_ranks_keep_zeros(df):
+    sp = pd.DataFrame.sparse.from_spmatrix(
+        csr_matrix(df.to_numpy()), columns=df.columns
+    )
+    ranks = rank_transform(sp)
+    assert all(isinstance(v, pd.SparseDtype) for v in ranks.dtypes)
+    assert ranks.sparse.density == sp.sparse.density
+    dense = ranks.sparse.to_dense().to_numpy()
+    expected = rank_transform(df).to_numpy()
+    assert np.allclose(dense - dense.mean(axis=0), expected)
+
+
+def test_rows(df):
+    rows = np.array([5, 5, 0, 17, 42, 99])
+    ranks = rank_transform(df, rows, dtype="float32")
+    assert ranks.dtypes.eq(np.float32).all()
+    assert np.allclose(ranks.to_numpy(), rank_transform(df.iloc[rows]).to_numpy())
+
+
+def test_spearman_correlation(df):
+    ci_test = PartialCorrelationTest(rank_transform(df), method="fisher_z")
+    assert np.allclose(ci_test.correlation(), stats.spearmanr(df).statistic)
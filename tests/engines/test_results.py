@@ -0,0 +1,79 @@
+"""
+Test module for ResultStore
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.engines import (
+    ContingencyTest,
+    PartialCorrelationTest,
+    ResultStore,
+    SkeletonSearch,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(200, 6))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(6)])
+
+
+def test_init_invalid_value_path(tmp_path):
+    with pytest.raises(AssertionError):
+        ResultStore(str(tmp_path / "missing" / "results.db"), "key")
+    with pytest.raises(AssertionError):
+        ResultStore(str(tmp_path / "results.db"), "key", flush_every=0)
+
+
+def test_put_get_persistent(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = ResultStore(path, "key", flush_every=2)
+    assert store.get(0, 1, ()) is None
+    store.put(1, 0, (3, 2), (1.5, 0.25))
+    store.put(0, 2, (), (np.nan, np.nan))
+    assert store.get(0, 1, (2, 3)) == (1.5, 0.25)
+    assert store.info() == {"hits": 1, "misses": 1, "entries": 2, "pending": 0}
+    store.put(4, 5, (), (0.0, 1.0))
+    restored = ResultStore(path, "key")
+    assert restored.get(1, 0, (3, 2)) == (1.5, 0.25)
+    assert np.all(np.isnan(restored.get(2, 0, ())))
+    assert restored.get(4, 5, ()) is None
+    store.flush()
+    assert ResultStore(path, "key").get(5, 4, ()) == (0.0, 1.0)
+    assert ResultStore(path, "other").get(0, 1, (2, 3)) is None
+
+
+def test_ci_tests_reuse_results(df, tmp_path):
+    path = str(tmp_path / "results.db")
+    binary = (df > 0).astype(int)
+    for cls, data in [(PartialCorrelationTest, df), (ContingencyTest, binary)]:
+        expected = cls(data)
+        ci = cls(data, result_cache=path)
+        search = SkeletonSearch(ci, n_jobs=2).run()
+        assert search.stats is not None and ci.result_cache.info()["pending"] == 0
+        again = cls(data, result_cache=path)
+        assert again.result_cache.fingerprint == ci.result_cache.fingerprint
+        for (x, y), z in search.separating_sets.items():
+            assert np.allclose(again.test(y, x, z), expected.test(x, y, z))
+        assert again.result_cache.info()["misses"] == 0
+        assert cls(data.iloc[1:], result_cache=path).result_cache.info()["entries"] == 0
+        again.update(data.iloc[:10])
+        assert again.result_cache.info()["entries"] == 0
+
+
+def test_float32_results_depend_on_significance_level(df, tmp_path):
+    path = str(tmp_path / "results.db")
+    fingerprints = {
+        PartialCorrelationTest(
+            df, result_cache=path, dtype=dtype, significance_level=level
+        ).result_cache.fingerprint
+        for dtype in ["float64", "float32"]
+        for level in [0.01, 0.05]
+    }
+    # float32 p-values near the significance level are refined
+    assert len(fingerprints) == 3
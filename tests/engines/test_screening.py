@@ -0,0 +1,38 @@
+"""
+Test module for marginal_screen
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.engines import ContingencyTest, PartialCorrelationTest, marginal_screen
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(150, 11))
+    x[:, 1] += x[:, 0]
+    x[:, 7] += x[:, 1]
+    x[:, 9] = 0
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(11)])
+
+
+def test_invalid_value_block_size(df):
+    for v in [0, -3]:
+        with pytest.raises(AssertionError) as e:
+            marginal_screen(PartialCorrelationTest(df), block_size=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_same_as_level_zero(df):
+    for ci in [PartialCorrelationTest(df), ContingencyTest(df.clip(lower=0))]:
+        expected = np.zeros((11, 11), dtype=bool)
+        for x in range(11):
+            for y in range(11):
+                if x != y:
+                    expected[x, y] = not ci.test(x, y)[1] >= 0.01
+        for block_size in [1, 3, 4, 1024]:
+            ret = marginal_screen(ci, 0.01, block_size=block_size)
+            assert np.all(ret == expected), f"test failed for {block_size}"
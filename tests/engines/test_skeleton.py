@@ -0,0 +1,212 @@
+"""
+Test module for SkeletonSearch and orient_skeleton
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pgmpy.base import DAG, PDAG
+from pgmpy.estimators import PC as PGMPYPC
+from pgmpy.estimators.CITests import pearsonr
+
+from grnet.engines import (
+    ContingencyTest,
+    PartialCorrelationTest,
+    SkeletonSearch,
+    orient_skeleton,
+)
+
+
+@pytest.fixture
+def dfs():
+    ret = []
+    for seed in range(4):
+        rng = np.random.default_rng(seed)
+        x = rng.normal(size=(200, 8))
+        for j in range(1, 8):
+            for i in range(j):
+                if rng.random() < 0.25:
+                    x[:, j] += 0.6 * x[:, i]
+        ret.append(pd.DataFrame(x, columns=[f"g{i}" for i in range(8)]))
+    return ret
+
+
+def _edges(graph):
+    return {frozenset(e) for e in graph.edges}
+
+
+def test_init_invalid_value_variant(dfs):
+    for v in ["original", "", "Stable"]:
+        with pytest.raises(AssertionError) as e:
+            SkeletonSearch(PartialCorrelationTest(dfs[0]), variant=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_run_consistent_with_pgmpy(dfs):
+    for i, v in enumerate(dfs):
+        for variant, pgmpy_variant in [("orig", "orig"), ("stable", "parallel")]:
+            search = SkeletonSearch(PartialCorrelationTest(v), variant=variant).run()
+            expected, _ = PGMPYPC(v).build_skeleton(
+                variant=pgmpy_variant,
+                ci_test=pearsonr,
+                max_cond_vars=v.shape[1],
+                n_jobs=1,
+                show_progress=False,
+            )
+            ret, _ = search.skeleton()
+            assert _edges(ret) == _edges(
+                expected
+            ), f"test failed for {i}-th input with {variant}: got {ret.edges}"
+
+
+def test_run_correct_separating_sets(dfs):
+    for i, v in enumerate(dfs):
+        search = SkeletonSearch(PartialCorrelationTest(v)).run()
+        for k, z in search.separating_sets.items():
+            x, y = sorted(k)
+            assert not search.adjacency[x, y], f"test failed for {i}-th input: {k}"
+            assert x not in z and y not in z, f"test failed for {i}-th input: {k}, {z}"
+
+
+def test_max_cond_vars(dfs):
+    for i, v in enumerate(dfs):
+        search = SkeletonSearch(PartialCorrelationTest(v), max_cond_vars=0).run()
+        assert search.level == 0, f"test failed for {i}-th input: got {search.level}"
+        for z in search.separating_sets.values():
+            assert z == (), f"test failed for {i}-th input: got {z}"
+
+
+def test_orient_skeleton_correct_return(dfs):
+    search = SkeletonSearch(PartialCorrelationTest(dfs[0])).run()
+    assert isinstance(orient_skeleton(search, "dag"), DAG)
+    assert isinstance(orient_skeleton(search, "pdag"), PDAG)
+    skel, separating_sets = orient_skeleton(search, "skeleton")
+    assert _edges(skel) == _edges(search.skeleton()[0])
+    assert set(skel.nodes) == set(dfs[0].columns)
+    with pytest.raises(AssertionError):
+        orient_skeleton(search, "graph")
+
+
+def test_sparse_adjacency_and_edges(dfs):
+    search = SkeletonSearch(PartialCorrelationTest(dfs[0])).run()
+    adjacency = search.sparse_adjacency()
+    assert np.all(adjacency.toarray() == search.adjacency)
+    assert _edges(search.skeleton()[0]) == {frozenset(e) for e in search.edges()}
+
+
+def test_refit_after_update(dfs):
+    for i, v in enumerate(dfs):
+        search = SkeletonSearch(PartialCorrelationTest(v.iloc[:100])).run()
+        search.ci_test.update(v.iloc[100:])
+        search.refit()
+        for k, z in search.separating_sets.items():
+            x, y = sorted(k)
+            assert not search.adjacency[x, y], f"test failed for {i}-th input: {k}"
+            p_value = search.ci_test.test(x, y, z)[1]
+            assert p_value >= 0.01, f"test failed for {i}-th input: {k}, {z}"
+
+
+def test_screening_same_as_level_zero(dfs):
+    for i, v in enumerate(dfs):
+        for variant in ["orig", "stable"]:
+            expected = SkeletonSearch(
+                PartialCorrelationTest(v), variant=variant, screening=False
+            ).run()
+            search = SkeletonSearch(PartialCorrelationTest(v), variant=variant).run()
+            assert np.all(
+                search.adjacency == expected.adjacency
+            ), f"test failed for {i}-th input with {variant}"
+            assert np.all(search.adjacency <= search.candidates)
+            skel, separating_sets = search.skeleton()
+            for k, z in expected.skeleton()[1].items():
+                if len(z) == 0:
+                    assert separating_sets[k] == (), f"test failed for {i}-th input"
+
+
+def test_screening_invalid_ci_test(dfs):
+    ci_test = PartialCorrelationTest(dfs[0])
+    wrapper = type(
+        "Wrapper", (), {"variables": ci_test.variables, "test": ci_test.test}
+    )
+    with pytest.raises(AssertionError) as e:
+        SkeletonSearch(wrapper())
+    assert "Invalid" in f"{e.value}"
+    assert SkeletonSearch(wrapper(), screening=False).run().candidates is None
+
+
+def test_run_max_tests_stops_cleanly(dfs):
+    for i, v in enumerate(dfs):
+        expected = SkeletonSearch(PartialCorrelationTest(v)).run()
+        assert (
+            expected.stopped_by is None and expected.completed_level == expected.level
+        )
+        n_screened = v.shape[1] * (v.shape[1] - 1) // 2
+        for max_tests in [0, 3]:
+            search = SkeletonSearch(PartialCorrelationTest(v), max_tests=max_tests)
+            search.run()
+            assert search.n_tests - n_screened <= max_tests, f"test failed for {i}"
+            assert search.stopped_by == "max_tests", f"test failed for {i}"
+            assert search.completed_level < expected.level, f"test failed for {i}"
+            # edges that were not fully searched are kept
+            assert np.all(
+                search.adjacency >= expected.adjacency
+            ), f"test failed for {i}"
+
+
+def test_run_time_budget_stops_cleanly(dfs):
+    search = SkeletonSearch(PartialCorrelationTest(dfs[0]), time_budget=0.0).run()
+    assert search.stopped_by == "time_budget"
+    assert search.completed_level == 0
+    with pytest.raises(AssertionError):
+        SkeletonSearch(PartialCorrelationTest(dfs[0]), time_budget=-1.0)
+
+
+def test_checkpoint_resume(dfs, tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    for i, v in enumerate(dfs):
+        for variant in ["orig", "stable"]:
+            expected = SkeletonSearch(PartialCorrelationTest(v), variant=variant).run()
+            for max_tests in [0, 3]:
+                SkeletonSearch(
+                    PartialCorrelationTest(v),
+                    variant=variant,
+                    max_tests=max_tests,
+                    checkpoint=path,
+                    checkpoint_every=1,
+                ).run()
+                search = SkeletonSearch(PartialCorrelationTest(v), variant=variant)
+                search.load_checkpoint(path).run()
+                assert np.all(
+                    search.adjacency == expected.adjacency
+                ), f"test failed for {i}"
+                assert (
+                    search.separating_sets == expected.separating_sets
+                ), f"test failed for {i}"
+                assert search.completed_level == expected.completed_level
+    with pytest.raises(AssertionError):
+        SkeletonSearch(PartialCorrelationTest(dfs[0]), variant="orig").load_checkpoint(
+            path
+        )
+
+
+def test_batched_same_as_edge_by_edge(dfs):
+    for i, v in enumerate(dfs):
+        for ci_test in [
+            PartialCorrelationTest(v),
+            ContingencyTest((v > 0).astype(int)),
+        ]:
+            batched = SkeletonSearch(ci_test, screening=False).run()
+            expected = SkeletonSearch(ci_test, screening=False, batched=False).run()
+            assert np.array_equal(
+                batched.adjacency, expected.adjacency
+            ), f"test failed for {i}-th input"
+            assert batched.separating_sets == expected.separating_sets
+            assert batched.n_tests == expected.n_tests
+    # chunks of worker processes are searched in rounds of their own
+    ci_test = ContingencyTest((dfs[0] > 0).astype(int))
+    expected = SkeletonSearch(ci_test, screening=False, batched=False).run()
+    batched = SkeletonSearch(ci_test, screening=False, n_jobs=2).run()
+    assert np.array_equal(batched.adjacency, expected.adjacency)
+    assert batched.separating_sets == expected.separating_sets
+    assert batched.n_tests == expected.n_tests
+    assert batched.cache_info()["misses"] > 0
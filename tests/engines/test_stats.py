@@ -0,0 +1,62 @@
+"""
+Test module for EstimateStats
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.engines import (
+    EstimateStats,
+    PartialCorrelationTest,
+    PartitionedSearch,
+    SkeletonSearch,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(300, 10))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    x[:, 5] += x[:, 2] + x[:, 3]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(10)])
+
+
+def test_merge_sums_same_level():
+    stats, other = EstimateStats(), EstimateStats()
+    stats.add_level("search", 1, 3, 0.1, 0.1, 2, 0.5)
+    other.add_level("search", 1, 4, 0.2, 0.2, 1)
+    other.add_level("search", 2, 5, 0.3, 0.3, 0)
+    other._add_cache(3, 1)
+    stats.merge(other)
+    frame = stats.to_frame()
+    assert frame["level"].tolist() == [1, 2]
+    assert frame["n_tests"].tolist() == [7, 5]
+    assert frame["edges_removed"].tolist() == [3, 0]
+    assert stats.n_tests == 12
+    assert stats.cache_hit_rate == 0.75
+    assert stats.worker_utilization is None
+
+
+def test_search_stats_correct_levels(df):
+    for n_jobs in [1, 2]:
+        search = SkeletonSearch(PartialCorrelationTest(df), n_jobs=n_jobs).run()
+        stats = search.stats.to_dict()
+        assert stats["n_tests"] == search.n_tests
+        assert stats["levels"][0]["stage"] == "screening"
+        removed = sum(v["edges_removed"] for v in stats["levels"])
+        assert removed == 45 - search.adjacency.sum() // 2
+        assert stats["wall_time"] > 0 and stats["cpu_time"] > 0
+        assert (stats["worker_utilization"] is None) == (n_jobs == 1)
+        frame = search.stats.to_frame()
+        assert len(frame) == len(stats["levels"])
+        assert frame["level"].is_monotonic_increasing
+
+
+def test_partitioned_search_stats_correct_tests(df):
+    search = PartitionedSearch(PartialCorrelationTest(df), max_block_size=4).run()
+    stages = set(search.stats.to_frame()["stage"])
+    assert stages <= {"screening", "blocks", "boundary"}
+    assert search.stats.n_tests == search.n_tests
@@ -0,0 +1,69 @@
+"""
+Test module for thread_budget
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.engines import (
+    PartialCorrelationTest,
+    SharedMemoryPool,
+    get_thread_budget,
+    set_thread_budget,
+    thread_budget,
+)
+from grnet.engines._threads import _n_workers, _nested_kwargs, _worker_budget
+
+
+def _budget_in_worker(ci_test, item):
+    return get_thread_budget(), os.environ["OMP_NUM_THREADS"]
+
+
+def test_invalid_value_n_cores():
+    for v in [0, -2]:
+        with pytest.raises(AssertionError) as e:
+            set_thread_budget(n_cores=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+    assert get_thread_budget()["n_cores"] == os.cpu_count()
+
+
+def test_context_restores_budget():
+    default = get_thread_budget()
+    with thread_budget(n_cores=8, blas_threads=2):
+        assert get_thread_budget() == {"n_cores": 8, "blas_threads": 2}
+        with thread_budget(n_cores=3):
+            assert get_thread_budget() == {"n_cores": 3, "blas_threads": 3}
+        assert get_thread_budget() == {"n_cores": 8, "blas_threads": 2}
+    assert get_thread_budget() == default
+
+
+def test_split_between_workers():
+    with thread_budget(n_cores=8):
+        assert _n_workers(-1) == 8
+        assert _n_workers(3) == 3
+        assert _worker_budget(4) == {"n_cores": 2, "blas_threads": 2}
+        assert _worker_budget(16) == {"n_cores": 1, "blas_threads": 1}
+
+
+def test_nested_kwargs():
+    def with_n_jobs(n_jobs: int = -1, **kwargs):
+        pass
+
+    def without_n_jobs(alpha: float = 0.1):
+        pass
+
+    assert _nested_kwargs(with_n_jobs, {}) == {"n_jobs": 1}
+    assert _nested_kwargs(with_n_jobs, {"n_jobs": 2}) == {"n_jobs": 2}
+    assert _nested_kwargs(without_n_jobs, {"alpha": 0.2}) == {"alpha": 0.2}
+
+
+def test_worker_budget_applied():
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(30, 3)))
+    with thread_budget(n_cores=4):
+        with SharedMemoryPool(PartialCorrelationTest(df), n_jobs=-1) as pool:
+            assert pool.n_jobs == 4
+            ret = pool.map(_budget_in_worker, [0, 1])
+    assert all(v == ({"n_cores": 1, "blas_threads": 1}, "1") for v in ret)
@@ -0,0 +1,24 @@
+"""
+test for grnet.evaluations.whqpm
+"""
+
+import numpy as np
+import pandas as pd
+
+from grnet.abstract import Estimator
+from grnet.evaluations import whqpm
+
+
+def test_copy_free_resample_same_as_copy():
+    rng = np.random.default_rng(0)
+    x = rng.binomial(1, rng.uniform(0.2, 0.9, size=5), size=(200, 5))
+    df = pd.DataFrame(x, columns=[f"g{i}" for i in range(5)])
+    expected, models = [], []
+    for copy in [True, False]:
+        pair = [Estimator(df, n=50, random_state=i, copy=copy) for i in range(2)]
+        pair[0].edges = [("g0", "g1"), ("g2", "g3")]
+        pair[1].edges = [("g0", "g1")]
+        expected.append(whqpm(*pair))
+        models.append(pair)
+    assert models[1][0].rows is not None
+    assert np.isclose(expected[0], expected[1])
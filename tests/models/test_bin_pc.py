@@ -0,0 +1,118 @@
+"""
+Test module for BinPC
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csc_matrix, csr_matrix, issparse
+
+from grnet.abstract import Estimator
+from grnet.engines import BinaryMatrix, SkeletonSearch
+from grnet.models import BinPC
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.random((300, 6)) * (rng.random((300, 6)) < 0.5)
+    x[:, 1] *= x[:, 0] != 0
+    x[:, 2] *= x[:, 1] != 0
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(6)])
+
+
+def test_init_correct_subclass(df):
+    assert isinstance(BinPC(data=df), Estimator)
+
+
+def test_estimate_invalid_value_engine(df):
+    for v in ["numpy", "", "Native"]:
+        model = BinPC(data=df)
+        with pytest.raises(AssertionError) as e:
+            model.estimate(engine=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_estimate_native_engine(df):
+    for ci_test in ["chi_square", "g_sq"]:
+        native = BinPC(data=df)
+        native.estimate(ci_test=ci_test, variant="orig", engine="native")
+        assert isinstance(native.model, SkeletonSearch)
+        expected = BinPC(data=df)
+        expected.estimate(ci_test=ci_test, variant="orig", n_jobs=1)
+        assert np.all(
+            native.get_matrix() == expected.get_matrix()
+        ), f"test failed for {ci_test}: got {native.edges}, expected {expected.edges}"
+
+
+def test_estimate_cache_info(df):
+    model = BinPC(data=df)
+    model.estimate(engine="native")
+    assert set(model.cache_info) == {"hits", "misses", "entries", "nbytes"}
+    assert model.cache_info["misses"] > 0
+    model.estimate(engine="native", cache_bytes=0)
+    assert model.cache_info["entries"] == 0
+
+
+def test_estimate_skeleton_return_type(df):
+    expected = BinPC(data=df)
+    expected.estimate(variant="orig", return_type="skeleton", n_jobs=1)
+    native = BinPC(data=df)
+    native.estimate(variant="orig", return_type="skeleton", engine="native")
+    assert issparse(native.adjacency)
+    assert np.all(native.adjacency.toarray() == expected.adjacency.toarray())
+    assert np.all(native.get_matrix() == expected.get_matrix())
+
+
+def test_partial_fit(df):
+    model = BinPC(data=df.iloc[:100])
+    model.estimate(engine="native", return_type="skeleton")
+    model.partial_fit(df.iloc[100:])
+    expected = BinPC(data=df)
+    expected.estimate(engine="native", return_type="skeleton")
+    assert model.model.ci_test.n_samples == len(df)
+    assert np.all(model.get_matrix() == expected.get_matrix())
+
+
+def test_estimate_candidates(df):
+    model = BinPC(data=df)
+    model.estimate(engine="native", return_type="skeleton")
+    assert issparse(model.candidates)
+    assert np.all(model.adjacency.toarray() <= model.candidates.toarray())
+    expected = BinPC(data=df)
+    expected.estimate(engine="native", return_type="skeleton", screening=False)
+    assert expected.candidates is None
+    assert np.all(model.get_matrix() == expected.get_matrix())
+
+
+def test_estimate_sparse_input(df):
+    expected = BinPC(data=df)
+    expected.estimate(engine="native", n_jobs=1)
+    for v in [csr_matrix(df.to_numpy()), csc_matrix(df.to_numpy())]:
+        model = BinPC(data=v, genes=list(df.columns))
+        model.estimate(engine="native", n_jobs=1)
+        assert np.all(model.get_matrix() == expected.get_matrix())
+        model.partial_fit(csr_matrix(df.to_numpy()[:50]))
+        assert model.model.ci_test.n_samples == len(df) + 50
+
+
+def test_binary_shared_by_engines(df):
+    model = BinPC(data=df, n=200, copy=False)
+    assert isinstance(model.binary, BinaryMatrix)
+    assert np.allclose(model.coverage(), (df.iloc[model.rows] != 0).mean())
+    model.estimate(engine="native", n_jobs=1)
+    assert model.model.ci_test.bits is model.binary.bits
+    model.partial_fit(df.iloc[:50])
+    assert model.binary.n_samples == 250
+    assert np.allclose(model.coverage(), (model.data != 0).mean())
+
+
+def test_estimate_permutations(df):
+    expected = BinPC(data=df)
+    expected.estimate(engine="native", n_jobs=1, return_type="skeleton")
+    model = BinPC(data=df)
+    with pytest.raises(AssertionError):
+        model.estimate(permutations=100)
+    model.estimate(engine="native", n_jobs=1, return_type="skeleton", permutations=1000)
+    assert model.model.ci_test.permutations == 1000
+    assert set(model.edges) == set(expected.edges)
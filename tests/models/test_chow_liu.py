@@ -0,0 +1,56 @@
+"""
+Test module for ChowLiu
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.abstract import Estimator
+from grnet.models import ChowLiu
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    a = rng.random(n) < 0.5
+    b = np.where(rng.random(n) < 0.85, a, ~a)
+    c = np.where(rng.random(n) < 0.85, b, ~b)
+    d = rng.random(n) < 0.3
+    e = np.where(rng.random(n) < 0.9, d, ~d)
+    x = np.stack([a, b, c, d, e, rng.random(n) < 0.4], axis=1).astype(int)
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(6)])
+
+
+def test_init_correct_subclass(df):
+    assert isinstance(ChowLiu(df), Estimator)
+
+
+def test_estimate_correct_forest(df):
+    model = ChowLiu(df)
+    model.estimate()
+    assert model.edges == [("g0", "g1"), ("g1", "g2"), ("g3", "g4")]
+    info = model.mutual_information
+    assert np.allclose(info, info.T) and np.all(np.diag(info) == 0)
+    assert info.loc["g0", "g1"] > info.loc["g0", "g2"] > 0
+
+
+def test_estimate_spanning_tree_without_significance_level(df):
+    model = ChowLiu(df)
+    model.estimate(significance_level=None, block_size=2)
+    assert len(model.edges) == df.shape[1] - 1
+    matrix = model.get_matrix()
+    assert np.all(matrix == matrix.T)
+
+
+def test_estimate_stats_count_tests_of_tree_edges(df):
+    model = ChowLiu(df)
+    model.estimate()
+    levels = {v["stage"]: v for v in model.estimate_stats.levels}
+    assert levels["mutual_information"]["n_tests"] == 0
+    assert levels["mutual_information"]["edges_removed"] == 15 - 5
+    assert levels["screening"]["n_tests"] == 5
+    assert levels["screening"]["edges_removed"] == 5 - len(model.edges)
+    model.estimate(significance_level=None)
+    assert [v["stage"] for v in model.estimate_stats.levels] == ["mutual_information"]
@@ -0,0 +1,93 @@
+"""
+Test module for BootstrapEnsemble
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+
+from grnet.abstract import Estimator
+from grnet.models import PC, BinPC, BootstrapEnsemble, _bin_pc
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(200, 5))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(5)])
+
+
+def test_init_correct_subclass(df):
+    assert isinstance(BootstrapEnsemble(data=df), Estimator)
+
+
+def test_init_invalid_value_estimator(df):
+    for v in [PC(df), "PC", pd.DataFrame]:
+        with pytest.raises(AssertionError) as e:
+            BootstrapEnsemble(data=df, estimator=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_estimate_correct_frequency(df):
+    model = BootstrapEnsemble(data=df, n_estimators=10)
+    model.estimate(threshold=0.5, n_jobs=1, engine="native")
+    freq = model.frequency
+    assert freq.shape == (5, 5)
+    assert np.all(freq.index == df.columns) and np.all(freq.columns == df.columns)
+    assert np.all((freq >= 0) & (freq <= 1)) and np.all(np.diag(freq) == 1)
+    assert np.all(freq == freq.T)
+    assert np.all((freq >= 0.5).astype(float) == model.get_matrix())
+    assert freq.loc["g0", "g1"] == 1 and freq.loc["g1", "g2"] == 1
+
+
+def test_estimate_reproducible_for_n_jobs(df):
+    ret, stats = [], []
+    for n_jobs in [1, 2]:
+        model = BootstrapEnsemble(
+            data=df, estimator=BinPC, n_estimators=6, n=100, replace=False
+        )
+        model.estimate(n_jobs=n_jobs, engine="native")
+        ret.append(model.frequency)
+        stats.append(model.estimate_stats)
+    assert np.all(ret[0] == ret[1])
+    assert stats[0].n_tests == stats[1].n_tests > 0
+    assert stats[0].worker_utilization is None
+    assert stats[1].worker_utilization is not None
+
+
+def test_estimate_packs_resamples_only(df, monkeypatch):
+    sizes = []
+
+    class Recorder(_bin_pc.BinaryMatrix):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            sizes.append(self.n_samples)
+
+    monkeypatch.setattr(_bin_pc, "BinaryMatrix", Recorder)
+    model = BootstrapEnsemble(data=df, estimator=BinPC, n_estimators=3, n=50)
+    model.estimate(n_jobs=1, engine="native")
+    assert sizes == [50] * 3
+
+
+def test_init_sparse_input(df):
+    model = BootstrapEnsemble(data=csr_matrix(df.to_numpy()), n_estimators=4)
+    assert model.n == len(df)
+    model.estimate(n_jobs=1, engine="native")
+    expected = BootstrapEnsemble(data=df, n_estimators=4)
+    expected.estimate(n_jobs=1, engine="native")
+    assert np.all(model.frequency.to_numpy() == expected.frequency.to_numpy())
+
+
+def test_estimate_n_jobs_only_for_workers(df, monkeypatch):
+    calls, estimate = [], PC.estimate
+
+    def recorder(self, n_jobs: int = -1, **kwargs) -> None:
+        calls.append(n_jobs)
+        estimate(self, n_jobs=n_jobs, **kwargs)
+
+    monkeypatch.setattr(PC, "estimate", recorder)
+    BootstrapEnsemble(data=df, n_estimators=2).estimate(n_jobs=1, engine="native")
+    assert calls == [-1, -1]
@@ -0,0 +1,87 @@
+"""
+Test module for GraphicalLasso
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from grnet.abstract import Estimator
+from grnet.clusters import estimate_by_group
+from grnet.engines import graphical_lasso, neighborhood_selection
+from grnet.evaluations import d_asterisk
+from grnet.models import GraphicalLasso
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(500, 6))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    x[:, 4] += x[:, 3]
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(6)])
+
+
+def test_init_correct_subclass(df):
+    assert isinstance(GraphicalLasso(df), Estimator)
+
+
+def test_estimate_correct_edges(df):
+    for method in ["glasso", "neighborhood"]:
+        model = GraphicalLasso(df)
+        model.estimate(alpha=0.1, method=method)
+        edges = {frozenset(v) for v in model.edges}
+        assert frozenset(("g0", "g1")) in edges, f"test failed for {method}"
+        assert frozenset(("g1", "g2")) in edges, f"test failed for {method}"
+        assert frozenset(("g3", "g4")) in edges, f"test failed for {method}"
+        assert frozenset(("g0", "g5")) not in edges, f"test failed for {method}"
+        matrix = model.get_matrix()
+        assert np.all(matrix == matrix.T) and np.all(np.diag(matrix) == 1)
+        assert np.all(np.diag(model.strength) == 0)
+
+
+def test_estimate_threshold_and_rule(df):
+    model = GraphicalLasso(df)
+    model.estimate(method="neighborhood", rule="or")
+    n_or = len(model.edges)
+    model.estimate(method="neighborhood", rule="and")
+    assert len(model.edges) <= n_or
+    model.estimate(threshold=0.99)
+    assert model.edges == []
+    with pytest.raises(AssertionError):
+        model.estimate(method="lasso")
+    with pytest.raises(AssertionError):
+        model.estimate(alpha=0)
+
+
+def test_estimate_sparse_input_same_as_dense(df):
+    dense = GraphicalLasso(df)
+    dense.estimate()
+    model = GraphicalLasso(sparse.csr_matrix(df.to_numpy()), genes=list(df.columns))
+    model.estimate()
+    assert np.allclose(model.precision, dense.precision)
+    assert model.edges == dense.edges
+
+
+def test_solvers_optimality(df):
+    x = (df - df.mean()) / df.std(ddof=0)
+    corr = (x.T @ x).to_numpy() / len(x)
+    alpha = 0.1
+    precision, _ = graphical_lasso(corr, alpha, max_iter=500, tol=1e-8)
+    # subgradient condition: |(S - P^-1)_ij| <= alpha, equality on the support
+    grad = corr - np.linalg.inv(precision)
+    off = ~np.eye(len(corr), dtype=bool)
+    assert np.all(np.abs(grad[off]) <= alpha + 1e-4)
+    support = off & (precision != 0)
+    assert np.allclose(grad[support], -alpha * np.sign(precision[support]), atol=1e-4)
+    coef, _ = neighborhood_selection(corr, alpha, max_iter=5000, tol=1e-10)
+    grad = corr @ coef - corr
+    assert np.all(np.abs(grad[off]) <= alpha + 1e-6)
+
+
+def test_compatible_with_evaluations(df):
+    classes = estimate_by_group(df, ["a", "b"] * 250, model=GraphicalLasso, n_jobs=1)
+    models = [classes.fetch(i)["model"] for i in range(2)]
+    assert 0 <= d_asterisk(models[0], models[1])
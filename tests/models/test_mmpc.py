@@ -0,0 +1,50 @@
+"""
+Test module for MMPC
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grnet.abstract import Estimator
+from grnet.models import MMPC, BinPC
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    a = rng.random(n) < 0.5
+    b = np.where(rng.random(n) < 0.85, a, ~a)
+    c = np.where(rng.random(n) < 0.85, b, ~b)
+    d = rng.random(n) < 0.3
+    e = np.where(rng.random(n) < 0.9, d, ~d)
+    x = np.stack([a, b, c, d, e, rng.random(n) < 0.4], axis=1).astype(int)
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(6)])
+
+
+def test_init_correct_subclass(df):
+    assert isinstance(MMPC(df), Estimator)
+
+
+def test_estimate_same_skeleton_as_bin_pc(df):
+    model = MMPC(df)
+    model.estimate()
+    expected = BinPC(df)
+    expected.estimate(engine="native", return_type="skeleton", n_jobs=1)
+    assert model.edges == expected.edges
+    assert model.parents_children["g1"] == ["g0", "g2"]
+    frame = model.estimate_stats.to_frame()
+    assert frame["stage"].tolist()[0] == "screening"
+    assert model.estimate_stats.n_tests >= 15
+
+
+def test_estimate_reproducible_for_n_jobs(df):
+    ret = []
+    for n_jobs in [1, 2]:
+        model = MMPC(df)
+        model.estimate(n_jobs=n_jobs, rule="or")
+        ret.append(model.edges)
+    assert ret[0] == ret[1]
+    with pytest.raises(AssertionError):
+        MMPC(df).estimate(rule="xor")
@@ -2,13 +2,16 @@
 Test module for PC
 """
 
+import anndata as ad
 import numpy as np
 import pandas as pd
 import pytest
 from pgmpy.estimators import PC as PGMPYPC
+from scipy.sparse import csr_matrix, issparse
 
 from grnet.abstract import Estimator
 from grnet.dev import typemolds
+from grnet.engines import PartitionedSearch, SkeletonSearch
 from grnet.models import PC
 
 
@@ -35,6 +38,33 @@ def dfs():
     return [df]
 
 
+def chain_data(n, d=6):
+    # g0 -> g1 -> g2, and the other genes are independent
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(n, d))
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    return x
+
+
+def as_frame(x):
+    return pd.DataFrame(x, columns=[f"g{i}" for i in range(x.shape[1])])
+
+
+def random_dag_data(seed, n=120, d=10):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, d))
+    for j in range(1, d):
+        for i in range(j):
+            if rng.random() < 0.3:
+                x[:, j] += 0.8 * x[:, i]
+    return as_frame(x)
+
+
+def skeleton_of(edges):
+    return {frozenset(e) for e in edges}
+
+
 def test_init_invalid_dtype_data(not_df):
     for i, v in enumerate(not_df):
         with pytest.raises(AssertionError) as e:
@@ -183,3 +213,250 @@ def test_get_matrix_correct_return_rows_cols():
         assert np.all(
             ret.columns == cols
         ), f"test failed for {i}-th input: got {ret} while required cols name is {cols}"
+
+
+def test_estimate_invalid_value_engine(dfs):
+    for v in ["numpy", "", "Native"]:
+        model = PC(data=dfs[0])
+        with pytest.raises(AssertionError) as e:
+            model.estimate(engine=v)
+        assert "Invalid" in f"{e.value}", f"test failed for {v}: {e.value}"
+
+
+def test_estimate_native_engine():
+    df = as_frame(chain_data(200))
+    for variant in ["orig", "stable"]:
+        native = PC(data=df)
+        native.estimate(variant=variant, engine="native")
+        assert isinstance(native.model, SkeletonSearch)
+        expected = PC(data=df)
+        expected.estimate(variant=variant, n_jobs=1)
+        assert np.all(
+            native.get_matrix() == expected.get_matrix()
+        ), f"test failed for {variant}: got {native.edges}, expected {expected.edges}"
+
+
+@pytest.mark.parametrize("seed", [12, 13, 14])
+def test_estimate_native_skeleton_per_variant(seed):
+    df = random_dag_data(seed)
+    for variant, reference in [
+        ("orig", "orig"), ("parallel", "parallel"), ("stable", "parallel")
+    ]:
+        native = PC(data=df)
+        native.estimate(variant=variant, engine="native", return_type="skeleton")
+        expected = PC(data=df)
+        expected.estimate(variant=reference, return_type="skeleton", n_jobs=1)
+        assert skeleton_of(native.edges) == skeleton_of(expected.edges), \
+            f"test failed for {variant} (seed {seed})"
+
+
+@pytest.mark.parametrize("seed", [12, 13, 14])
+def test_estimate_native_dag_keeps_skeleton(seed):
+    df = random_dag_data(seed)
+    for variant in ["orig", "stable", "parallel"]:
+        model = PC(data=df)
+        model.estimate(variant=variant, engine="native", return_type="skeleton")
+        skeleton = skeleton_of(model.edges)
+        model.estimate(variant=variant, engine="native")
+        assert skeleton_of(model.edges) == skeleton, \
+            f"test failed for {variant} (seed {seed})"
+        assert len(model.edges) == len(skeleton), f"test failed for {variant}"
+
+
+def test_estimate_skeleton_return_type():
+    x = chain_data(200)
+    # high mean and low variance, so that raw moments cancel in float32
+    df = as_frame(0.2 * x + 8)
+    for engine in ["pgmpy", "native"]:
+        model = PC(data=df)
+        model.estimate(return_type="skeleton", engine=engine, n_jobs=1)
+        assert issparse(model.adjacency), f"test failed for {engine}"
+        assert np.all(
+            model.adjacency.toarray() + np.eye(6) == model.get_matrix().to_numpy()
+        ), f"test failed for {engine}: got {model.edges}"
+        model.estimate(engine=engine, n_jobs=1)
+        assert model.adjacency is None, f"test failed for {engine}"
+
+
+def test_partial_fit():
+    df = as_frame(chain_data(400))
+    model = PC(data=df.iloc[:150])
+    model.estimate(engine="native", n_jobs=1)
+    model.partial_fit(df.iloc[150:])
+    expected = PC(data=df)
+    expected.estimate(engine="native", n_jobs=1)
+    assert model.data.shape == df.shape
+    assert np.all(model.get_matrix() == expected.get_matrix())
+    with pytest.raises(AssertionError):
+        model.partial_fit(df.iloc[:, 1:])
+
+
+def test_estimate_copy_free_resampling(dfs):
+    for i, v in enumerate(dfs):
+        copied = PC(data=v, n=10, random_state=i)
+        copied.estimate(engine="native", n_jobs=1)
+        shared = PC(data=v, n=10, random_state=i, copy=False)
+        shared.estimate(engine="native", n_jobs=1)
+        assert shared.data is v
+        assert np.all(
+            copied.get_matrix() == shared.get_matrix()
+        ), f"test failed for {i}-th input: got {shared.edges}, expected {copied.edges}"
+
+
+def test_estimate_max_block_size():
+    x = chain_data(300, 12)
+    x[:, 8] += x[:, 7]
+    df = as_frame(x)
+    model = PC(data=df)
+    with pytest.raises(AssertionError):
+        model.estimate(max_block_size=4)
+    model.estimate(engine="native", max_block_size=4, n_jobs=1)
+    assert isinstance(model.model, PartitionedSearch)
+    expected = PC(data=df)
+    expected.estimate(engine="native", n_jobs=1)
+    assert np.all(model.get_matrix() == expected.get_matrix())
+
+
+def test_estimate_store(dfs, tmp_path):
+    for i, v in enumerate(dfs):
+        model = PC(data=v)
+        model.estimate(engine="native", n_jobs=1, store=str(tmp_path), block_size=2)
+        expected = PC(data=v)
+        expected.estimate(engine="native", n_jobs=1)
+        assert isinstance(model.model.ci_test.moments, np.memmap)
+        assert np.all(
+            model.get_matrix() == expected.get_matrix()
+        ), f"test failed for {i}-th input: got {model.edges}, expected {expected.edges}"
+    with pytest.raises(AssertionError):
+        PC(data=dfs[0]).estimate(store=str(tmp_path))
+
+
+def test_estimate_anndata_input():
+    rng = np.random.default_rng(0)
+    x = rng.poisson(0.7, size=(300, 6)).astype(float)
+    x[:, 1] += x[:, 0]
+    x[:, 2] += x[:, 1]
+    adata = ad.AnnData(csr_matrix(x))
+    adata.var_names = [f"g{i}" for i in range(6)]
+    expected = PC(data=adata.to_df())
+    expected.estimate(engine="native", n_jobs=1)
+    for engine in ["native", "pgmpy"]:
+        model = PC(data=adata)
+        model.estimate(engine=engine, n_jobs=1)
+        assert np.all(model.get_matrix() == expected.get_matrix()), engine
+
+
+def test_estimate_max_tests():
+    df = as_frame(chain_data(300))
+    model = PC(data=df)
+    with pytest.raises(AssertionError):
+        model.estimate(max_tests=10)
+    model.estimate(engine="native", n_jobs=1, max_tests=0, return_type="skeleton")
+    assert model.stopped_by == "max_tests"
+    assert model.completed_level == 0
+    assert model.adjacency[0, 2] == 1
+    model.estimate(engine="native", n_jobs=1)
+    assert model.stopped_by is None and model.completed_level >= 1
+
+
+def test_estimate_resume_from(tmp_path):
+    df = as_frame(chain_data(300))
+    path = str(tmp_path / "checkpoint.npz")
+    expected = PC(data=df)
+    expected.estimate(engine="native", n_jobs=1, return_type="skeleton")
+    model = PC(data=df)
+    with pytest.raises(AssertionError):
+        model.estimate(checkpoint=path)
+    model.estimate(
+        engine="native", n_jobs=1, max_tests=1, checkpoint=path, return_type="skeleton"
+    )
+    assert model.stopped_by == "max_tests"
+    model.estimate(engine="native", n_jobs=1, resume_from=path, return_type="skeleton")
+    assert model.stopped_by is None
+    assert (model.adjacency != expected.adjacency).nnz == 0
+
+
+def test_estimate_stats():
+    df = as_frame(chain_data(300))
+    model = PC(data=df)
+    assert model.estimate_stats is None
+    model.estimate(engine="native", n_jobs=1)
+    assert model.estimate_stats is model.model.stats
+    assert model.estimate_stats.n_tests == model.model.n_tests
+    assert len(model.estimate_stats.to_frame()) >= 2
+    model.estimate(n_jobs=1)
+    assert len(model.estimate_stats.levels) == 0
+    assert model.estimate_stats.wall_time > 0
+
+
+def test_estimate_permutations():
+    df = as_frame(chain_data(40, 5))
+    expected = PC(data=df)
+    expected.estimate(engine="native", n_jobs=1, return_type="skeleton")
+    for n_jobs in [1, 2]:
+        model = PC(data=df)
+        model.estimate(
+            engine="native", n_jobs=n_jobs, return_type="skeleton", permutations=1000
+        )
+        assert model.model.ci_test.values.shape == df.shape
+        assert set(model.edges) == set(expected.edges), f"test failed for {n_jobs}"
+
+
+def test_estimate_result_cache(tmp_path):
+    df = as_frame(chain_data(300))
+    path = str(tmp_path / "results.db")
+    model = PC(data=df)
+    with pytest.raises(AssertionError):
+        model.estimate(result_cache=path)
+    for significance_level in [0.01, 0.05]:
+        expected = PC(data=df)
+        expected.estimate(
+            engine="native", n_jobs=1, significance_level=significance_level
+        )
+        model.estimate(
+            engine="native",
+            n_jobs=1,
+            significance_level=significance_level,
+            screening=False,
+            result_cache=path,
+        )
+        assert set(model.edges) == set(expected.edges)
+    # the second call reuses the tests of the first one
+    assert model.model.ci_test.result_cache.info()["hits"] > 0
+
+
+def test_init_dtype_float32():
+    x = chain_data(300)
+    # high mean and low variance, so that raw moments cancel in float32
+    df = as_frame(0.2 * x + 8)
+    for engine in ["pgmpy", "native"]:
+        expected = PC(data=df)
+        expected.estimate(engine=engine, n_jobs=1, return_type="skeleton")
+        model = PC(data=df, dtype="float32")
+        assert all(model.data.dtypes == np.float32)
+        model.estimate(engine=engine, n_jobs=1, return_type="skeleton")
+        assert set(model.edges) == set(expected.edges), f"test failed for {engine}"
+    assert model.model.ci_test.moments.dtype == np.float32
+
+
+def test_estimate_spearman():
+    x = chain_data(300)
+    df = as_frame(np.exp(3 * x))
+    expected = PC(data=as_frame(x))
+    expected.estimate(
+        engine="native", ci_test="fisher_z", n_jobs=1, return_type="skeleton"
+    )
+    for engine in ["pgmpy", "native"]:
+        model = PC(data=df)
+        model.estimate(
+            engine=engine, ci_test="spearman", n_jobs=1, return_type="skeleton"
+        )
+        assert model.ranks is not None
+        assert set(map(frozenset, model.edges)) == set(
+            map(frozenset, expected.edges)
+        ), f"test failed for {engine}"
+    ranks = model.ranks
+    model.estimate(engine="native", ci_test="spearman", n_jobs=1)
+    assert model.ranks is ranks
+    model.partial_fit(df.iloc[:50])
+    assert model.ranks.shape[0] == 350